@@ -0,0 +1,102 @@
+"""
+Benchmarks of the play loop, run with pytest-benchmark, on CPU and without ComfyUI:
+
+    pytest benchmarks/ --benchmark-autosave
+    pytest benchmarks/ --benchmark-compare --benchmark-compare-fail=mean:10%
+
+The extension is imported as the package `fot_play_traversal`, without its
+__init__ (which registers the routes on the ComfyUI server). The ComfyUI
+modules it needs are replaced by stand-ins when ComfyUI is not importable.
+"""
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import mock_executor
+
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "fot_play_traversal"
+
+# the loop logs every batch at INFO, keep it out of the timings
+os.environ.setdefault("FOT_LOG_LEVEL", "WARNING")
+
+def install_comfyui_stand_ins(output_dir):
+    def missing(name):
+        try:
+            importlib.import_module(name)
+            return False
+        except ImportError:
+            return True
+
+    if missing("folder_paths"):
+        folder_paths = types.ModuleType("folder_paths")
+        folder_paths.get_output_directory = lambda: output_dir
+        sys.modules["folder_paths"] = folder_paths
+    if missing("nodes"):
+        nodes = types.ModuleType("nodes")
+        nodes.NODE_CLASS_MAPPINGS = {}
+        sys.modules["nodes"] = nodes
+    if missing("node_helpers"):
+        node_helpers = types.ModuleType("node_helpers")
+        node_helpers.pillow = lambda fn, arg: fn(arg)
+        sys.modules["node_helpers"] = node_helpers
+    if missing("comfy_execution.graph_utils"):
+        comfy_execution = types.ModuleType("comfy_execution")
+        graph_utils = types.ModuleType("comfy_execution.graph_utils")
+        graph_utils.GraphBuilder = mock_executor.GraphBuilder
+        graph_utils.is_link = mock_executor.is_link
+        comfy_execution.graph_utils = graph_utils
+        sys.modules["comfy_execution"] = comfy_execution
+        sys.modules["comfy_execution.graph_utils"] = graph_utils
+
+def import_extension_module(name):
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [REPOSITORY_DIR]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+
+@pytest.fixture(scope="session")
+def output_dir():
+    return tempfile.mkdtemp(prefix="fot_benchmarks_")
+
+@pytest.fixture(scope="session")
+def extension(output_dir):
+    install_comfyui_stand_ins(output_dir)
+    return types.SimpleNamespace(
+        planner=import_extension_module("py.core.planner"),
+        play_definition=import_extension_module("py.core.play_definition"),
+        image_io=import_extension_module("py.libs.image_io"),
+        nodes=import_extension_module("py.nodes.nodes"),
+    )
+
+@pytest.fixture
+def play_loop(extension, monkeypatch):
+    """
+    The Play (Start) and Play (Continue) nodes, wired to the mock executor.
+    """
+    nodes = extension.nodes
+    monkeypatch.setattr(nodes, "GraphBuilder", mock_executor.GraphBuilder)
+    monkeypatch.setattr(nodes, "is_link", mock_executor.is_link)
+    monkeypatch.setattr(nodes, "ALL_NODE_CLASS_MAPPINGS", {**nodes.NODE_CLASS_MAPPINGS, **mock_executor.MOCK_NODE_CLASS_MAPPINGS})
+    return nodes.fot_PlayStart().play_start, nodes.fot_PlayContinue().play_continue
+
+@pytest.fixture(scope="session")
+def make_play(extension):
+    """
+    Builds a play of beats_count beats: returns its settings, and its acts as built by the Play-Act node.
+    """
+    def make_play(beats_count, beats_per_scene=10, scenes_per_act=10, duration_secs=4.0):
+        scenes = [{
+            "title": f"Scene {i}",
+            "beats": [{"title": f"Beat {j}", "duration_secs": duration_secs} for j in range(i, min(i + beats_per_scene, beats_count))],
+        } for i in range(0, beats_count, beats_per_scene)]
+        acts = [{"title": f"Act {i}", "scenes": scenes[i:i + scenes_per_act]} for i in range(0, len(scenes), scenes_per_act)]
+        return extension.play_definition.parse_play({"acts": acts})
+    return make_play
@@ -0,0 +1,225 @@
+"""
+Lightweight stand-ins for the parts of the ComfyUI executor the play loop relies on:
+DynamicPrompt, GraphBuilder and is_link (after comfy_execution.graph and
+comfy_execution.graph_utils), and an executor driving fot_PlayStart and
+fot_PlayContinue through their graph expansions, without running the loop body.
+"""
+
+class Node:
+
+    def __init__(self, id, class_type, inputs):
+        self.id = id
+        self.class_type = class_type
+        self.inputs = inputs
+        self.override_display_id = None
+
+    def out(self, index):
+        return [self.id, index]
+
+    def set_input(self, key, value):
+        if value is None:
+            self.inputs.pop(key, None)
+        else:
+            self.inputs[key] = value
+
+    def get_input(self, key):
+        return self.inputs.get(key)
+
+    def set_override_display_id(self, override_display_id):
+        self.override_display_id = override_display_id
+
+    def serialize(self):
+        serialized = {"class_type": self.class_type, "inputs": self.inputs}
+        if self.override_display_id is not None:
+            serialized["override_display_id"] = self.override_display_id
+        return serialized
+
+class GraphBuilder:
+    _prefix_root = ""
+    _prefix_index = 0
+
+    def __init__(self, prefix=None):
+        self.prefix = prefix if prefix is not None else GraphBuilder.alloc_prefix()
+        self.nodes = {}
+        self.id_gen = 1
+
+    @classmethod
+    def set_default_prefix(cls, prefix_root):
+        cls._prefix_root = prefix_root
+        cls._prefix_index = 0
+
+    @classmethod
+    def alloc_prefix(cls):
+        prefix = f"{cls._prefix_root}.{cls._prefix_index}."
+        cls._prefix_index += 1
+        return prefix
+
+    def node(self, class_type, id=None, **kwargs):
+        if id is None:
+            id = str(self.id_gen)
+            self.id_gen += 1
+        id = self.prefix + id
+        if id not in self.nodes:
+            self.nodes[id] = Node(id, class_type, kwargs)
+        return self.nodes[id]
+
+    def lookup_node(self, id):
+        return self.nodes.get(self.prefix + id)
+
+    def finalize(self):
+        return {node_id: node.serialize() for node_id, node in self.nodes.items()}
+
+def is_link(obj):
+    return isinstance(obj, list) and len(obj) == 2 and isinstance(obj[0], str) and isinstance(obj[1], (int, float))
+
+class DynamicPrompt:
+
+    def __init__(self, original_prompt):
+        self.original_prompt = original_prompt
+        self.ephemeral_prompt = {}
+        self.ephemeral_display = {}
+
+    def get_node(self, node_id):
+        if node_id in self.ephemeral_prompt:
+            return self.ephemeral_prompt[node_id]
+        return self.original_prompt[node_id]
+
+    def add_ephemeral_node(self, node_id, node_info, parent_id, display_id):
+        self.ephemeral_prompt[node_id] = node_info
+        self.ephemeral_display[node_id] = display_id
+
+    def get_display_node_id(self, node_id):
+        while True:
+            display_node_id = self.ephemeral_display.get(node_id)
+            if display_node_id is None or display_node_id == node_id:
+                return node_id
+            node_id = display_node_id
+
+    def get_original_prompt(self):
+        return self.original_prompt
+
+# #############################################################################
+# synthetic workflows
+
+class Passthrough:
+    """
+    Stands for any node of the loop body.
+    """
+    RETURN_TYPES = ("*",)
+
+class Sink:
+    """
+    Stands for an output node of the loop body (e.g. Save Image).
+    """
+    RETURN_TYPES = ()
+    OUTPUT_NODE = True
+
+class ModelLoader:
+    RETURN_TYPES = ("MODEL", "CLIP", "VAE",)
+
+MOCK_NODE_CLASS_MAPPINGS = {
+    "Passthrough": Passthrough,
+    "Sink": Sink,
+    "ModelLoader": ModelLoader,
+}
+
+START_ID = "1"
+CONTINUE_ID = "2"
+LOADER_ID = "3"
+MERGE_ID = "4"
+
+# the loop exploration recurses along the links, keep the chains well under the recursion limit
+CHAIN_LENGTH = 20
+
+def make_workflow(body_nodes_count, play_inputs, chain_length=CHAIN_LENGTH):
+    """
+    An API-format workflow: model loader -> Play (Start) -> the loop body -> Play (Continue).
+    The body is body_nodes_count nodes in chains of chain_length, each chain also feeding
+    an output node (e.g. Save Image), all chains merged into the data of Play (Continue).
+    """
+    workflow = {
+        LOADER_ID: {"class_type": "ModelLoader", "inputs": {}},
+        START_ID: {"class_type": "fot_PlayStart", "inputs": {
+            **play_inputs,
+            "model": [LOADER_ID, 0],
+            "clip": [LOADER_ID, 1],
+            "vae": [LOADER_ID, 2],
+        }},
+    }
+    merge_inputs = {}
+    for first in range(0, body_nodes_count, chain_length):
+        previous = [START_ID, 10] # batch_current
+        for i in range(first, min(first + chain_length, body_nodes_count)):
+            node_id = str(100 + i)
+            workflow[node_id] = {"class_type": "Passthrough", "inputs": {"value": previous}}
+            previous = [node_id, 0]
+        workflow[f"s{first}"] = {"class_type": "Sink", "inputs": {"value": previous}}
+        merge_inputs[f"value_{len(merge_inputs)}"] = previous
+    workflow[MERGE_ID] = {"class_type": "Passthrough", "inputs": merge_inputs}
+    workflow[CONTINUE_ID] = {"class_type": "fot_PlayContinue", "inputs": {
+        "flow": [START_ID, 0],
+        "sequence_batches": [START_ID, 1],
+        "data": [MERGE_ID, 0],
+    }}
+    return workflow
+
+class MockExecutor:
+    """
+    Runs the loop of a synthetic workflow like ComfyUI would: each expansion of
+    Play (Continue) is added to the dynamic prompt, and the next iteration runs
+    the expanded Play (Start) and Play (Continue). The body nodes are not executed.
+    """
+
+    def __init__(self, workflow, play_start, play_continue, first_inputs=None):
+        self.dynprompt = DynamicPrompt(workflow)
+        self.play_start = play_start
+        self.play_continue = play_continue
+        # inputs of the first Play (Start), overriding its links (e.g. the acts)
+        self.first_inputs = first_inputs or {}
+        self.start_id = START_ID
+        self.continue_id = CONTINUE_ID
+        self.iterations = 0
+        self.done = False
+
+    def _resolve(self, inputs):
+        # links to nodes outside the loop (models, acts) resolve to nothing, models are not used by planning
+        return {key: (None if is_link(value) else value) for key, value in inputs.items()}
+
+    def start(self):
+        """
+        Runs Play (Start) of the next iteration, returns its sequence_batches output.
+        """
+        inputs = self._resolve(self.dynprompt.get_node(self.start_id)["inputs"])
+        if self.iterations == 0:
+            inputs.update(self.first_inputs)
+        outputs = self.play_start(**inputs, dynprompt=self.dynprompt, unique_id=self.start_id)
+        self.iterations += 1
+        return outputs[1]
+
+    def step(self):
+        """
+        Runs one iteration: Play (Start), then Play (Continue) and its expansion.
+        """
+        return self.expand(self.start())
+
+    def expand(self, sequence_batches):
+        GraphBuilder.set_default_prefix(self.continue_id)
+        result = self.play_continue(flow=[self.start_id, 0], sequence_batches=sequence_batches, dynprompt=self.dynprompt, unique_id=self.continue_id)
+        if not isinstance(result, dict):
+            self.done = True
+            return result
+
+        for node_id, node_info in result["expand"].items():
+            self.dynprompt.add_ephemeral_node(node_id, node_info, self.continue_id, node_info.get("override_display_id", self.continue_id))
+        recurse_id = result["result"][0][0]
+        flow = self.dynprompt.get_node(recurse_id)["inputs"]["flow"]
+        self.start_id = flow[0]
+        self.continue_id = recurse_id
+        return result
+
+    def run(self, iterations=None):
+        while not self.done and (iterations is None or iterations > 0):
+            self.step()
+            if iterations is not None:
+                iterations -= 1
+        return self.iterations
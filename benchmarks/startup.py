@@ -0,0 +1,78 @@
+"""
+Startup time of the extension.
+
+With a ComfyUI install, boots it repeatedly (`main.py --quick-test-for-ci --cpu`)
+and reports the import time ComfyUI measures for this extension, and the whole boot:
+
+    python benchmarks/startup.py --comfyui ~/ComfyUI [--runs 5]
+
+Without one, only the modules importable without ComfyUI are timed, each in a
+fresh interpreter:
+
+    python benchmarks/startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXTENSION_NAME = os.path.basename(REPOSITORY_DIR)
+
+STANDALONE_MODULES = ["py.core.planner", "py.core.play_definition", "py.core.cli", "py.libs.dispatcher", "py.libs.workspace_manifest", "py.libs.asset_store"]
+
+# e.g. "   0.1 seconds: /ComfyUI/custom_nodes/comfyui_play_traversal"
+IMPORT_TIME_PATTERN = re.compile(r"^\s*([0-9.]+) seconds(?: \(IMPORT FAILED\))?: (.+)$")
+
+def time_comfyui_boot(comfyui_dir):
+    started_at = time.perf_counter()
+    result = subprocess.run([sys.executable, "main.py", "--quick-test-for-ci", "--cpu"], cwd=comfyui_dir, capture_output=True, text=True)
+    boot_secs = time.perf_counter() - started_at
+    import_secs = None
+    for line in (result.stdout + result.stderr).splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match and os.path.basename(match.group(2).rstrip("/\\")) == EXTENSION_NAME:
+            if "IMPORT FAILED" in line:
+                raise RuntimeError(f"ComfyUI failed to import {EXTENSION_NAME}:\n{result.stderr[-2000:]}")
+            import_secs = float(match.group(1))
+    if import_secs is None:
+        raise RuntimeError(f"{EXTENSION_NAME} not found in the ComfyUI import times, is it installed under custom_nodes/?")
+    return {"boot_secs": boot_secs, "import_secs": import_secs}
+
+def time_module_import(module):
+    code = f"import time; started_at = time.perf_counter(); import {module}; print(time.perf_counter() - started_at)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPOSITORY_DIR, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+def summarize(samples):
+    return {"median": statistics.median(samples), "min": min(samples), "max": max(samples)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the startup time of the extension.")
+    parser.add_argument("--comfyui", help="ComfyUI folder, with the extension installed under custom_nodes/")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also save the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.comfyui:
+        runs = [time_comfyui_boot(args.comfyui) for _ in range(args.runs)]
+        results["comfyui_boot_secs"] = summarize([run["boot_secs"] for run in runs])
+        results["extension_import_secs"] = summarize([run["import_secs"] for run in runs])
+    else:
+        for module in STANDALONE_MODULES:
+            results[module] = summarize([time_module_import(module) for _ in range(args.runs)])
+
+    for name, summary in results.items():
+        print(f"{name}: {summary['median'] * 1000:.1f} ms (min {summary['min'] * 1000:.1f}, max {summary['max'] * 1000:.1f}, {args.runs} runs)")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Throughput of the image and latent files read and written by the nodes.
+"""
+import os
+
+import numpy as np
+import pytest
+
+SIZES = [(512, 512), (832, 480), (1024, 1024)]
+
+def random_image(torch, width, height):
+    generator = torch.Generator().manual_seed(0)
+    return torch.rand((1, height, width, 3), generator=generator)
+
+@pytest.mark.parametrize("width,height", SIZES)
+def test_store_image(benchmark, extension, output_dir, width, height):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("PIL")
+    image = random_image(torch, width, height)
+    image_path = os.path.join(output_dir, f"store_{width}x{height}.png")
+    benchmark.extra_info["megapixels"] = width * height / 1e6
+    benchmark(extension.image_io.storeImage, image, image_path)
+
+@pytest.mark.parametrize("width,height", SIZES)
+def test_load_image(benchmark, extension, output_dir, width, height):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("PIL")
+    image_path = os.path.join(output_dir, f"load_{width}x{height}.png")
+    extension.image_io.storeImage(random_image(torch, width, height), image_path)
+    benchmark.extra_info["megapixels"] = width * height / 1e6
+    images, masks = benchmark(extension.image_io.loadImage, image_path)
+    assert images.shape == (1, height, width, 3)
+
+@pytest.mark.parametrize("width,height", SIZES)
+def test_store_thumbnail(benchmark, extension, output_dir, width, height):
+    Image = pytest.importorskip("PIL.Image")
+    image_path = os.path.join(output_dir, f"thumbnail_source_{width}x{height}.png")
+    Image.fromarray(np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)).save(image_path)
+    thumbnail_path = os.path.join(output_dir, f"thumbnail_{width}x{height}.jpg")
+    benchmark(extension.image_io.storeThumbnail, image_path, thumbnail_path)
+
+@pytest.mark.parametrize("frames_count", [1, 41, 81])
+def test_store_load_latent(benchmark, extension, output_dir, frames_count):
+    torch = pytest.importorskip("torch")
+    # a 832x480 video latent: 16 channels, 4x temporal and 8x spatial compression
+    latent = {"samples": torch.randn((1, 16, (frames_count - 1) // 4 + 1, 104, 60))}
+    file_path = os.path.join(output_dir, f"latent_{frames_count}.latent")
+
+    def store_load():
+        extension.image_io.storeImageLatent(latent, file_path)
+        return extension.image_io.loadImageLatent(file_path)
+
+    benchmark.extra_info["bytes"] = latent["samples"].numel() * latent["samples"].element_size()
+    loaded = benchmark(store_load)
+    assert loaded["samples"].shape == latent["samples"].shape
@@ -0,0 +1,42 @@
+"""
+Cost of a loop iteration: Play (Continue) exploring the workflow and expanding the
+loop body, by workflow size and by iteration (the dynamic prompt grows with each expansion).
+"""
+import pytest
+
+from mock_executor import MockExecutor, make_workflow
+
+BODY_NODES_COUNTS = [10, 100, 1000]
+ITERATIONS = [1, 10, 100]
+
+def make_executor(play_loop, make_play, body_nodes_count, beats_count):
+    # Play (Start) takes two acts, keep the whole play in the first one
+    settings, acts = make_play(beats_count, scenes_per_act=beats_count)
+    # one batch per beat
+    settings["frames_count_per_batch"] = 1000
+    settings["filename_base"] = "fot_benchmark"
+    workflow = make_workflow(body_nodes_count, {**settings, "telemetry": False})
+    play_start, play_continue = play_loop
+    return MockExecutor(workflow, play_start, play_continue, first_inputs={"act_1": acts[0]})
+
+@pytest.mark.parametrize("iteration", ITERATIONS)
+@pytest.mark.parametrize("body_nodes_count", BODY_NODES_COUNTS)
+def test_expansion(benchmark, play_loop, make_play, body_nodes_count, iteration):
+    def setup():
+        executor = make_executor(play_loop, make_play, body_nodes_count, max(ITERATIONS) + 1)
+        executor.run(iteration - 1)
+        return (executor, executor.start()), {}
+
+    result = benchmark.pedantic(lambda executor, sequence_batches: executor.expand(sequence_batches), setup=setup, rounds=5)
+    benchmark.extra_info["nodes_count"] = len(result["expand"])
+    assert isinstance(result, dict)
+
+@pytest.mark.parametrize("body_nodes_count", BODY_NODES_COUNTS)
+def test_whole_loop(benchmark, play_loop, make_play, body_nodes_count):
+    beats_count = 20
+
+    def setup():
+        return (make_executor(play_loop, make_play, body_nodes_count, beats_count),), {}
+
+    iterations = benchmark.pedantic(lambda executor: executor.run(), setup=setup, rounds=3)
+    assert iterations == beats_count
@@ -0,0 +1,32 @@
+"""
+Planning cost: construct_sequence_batches, and the whole planning of Play (Start), by play size.
+"""
+import pytest
+
+BEATS_COUNTS = [10, 100, 1000, 10000, 100000]
+
+def rounds_for(beats_count):
+    # the largest plays take seconds per round
+    return 3 if beats_count >= 10000 else 20
+
+@pytest.mark.parametrize("beats_count", BEATS_COUNTS)
+def test_construct_sequence_batches(benchmark, extension, make_play, beats_count):
+    settings, acts = make_play(beats_count)
+    benchmark.extra_info["beats_count"] = beats_count
+
+    def construct():
+        return extension.planner.construct_sequence_batches(None, None, None, settings["title"], settings["positive"], settings["negative"], settings["seed"], settings["filename_base"], settings["fps"], settings["width"], settings["height"], settings["frames_count_per_batch"], acts)
+
+    sequence_batches = benchmark.pedantic(construct, rounds=rounds_for(beats_count), iterations=1, warmup_rounds=1)
+    benchmark.extra_info["batches_count"] = len(sequence_batches)
+    assert len(sequence_batches) >= beats_count
+
+@pytest.mark.parametrize("beats_count", BEATS_COUNTS)
+def test_plan_play_with_variants(benchmark, extension, make_play, beats_count):
+    settings, acts = make_play(beats_count)
+    settings["variant_seeds"] = "1, 2"
+    benchmark.extra_info["beats_count"] = beats_count
+
+    sequence_batches = benchmark.pedantic(lambda: extension.planner.plan_play(play_acts=acts, **settings), rounds=rounds_for(beats_count), iterations=1, warmup_rounds=1)
+    benchmark.extra_info["batches_count"] = len(sequence_batches)
+    assert len(sequence_batches.plays) == 2
@@ -3,7 +3,7 @@ import { app } from "../../scripts/app.js";
 const WIDGET_NAME_BACKDROP = "backdrop_name";
 
 
-const refreshBackdrops = async function (node) {
+const resolveWorkspaceCodename = async function (node) {
     // console.log("updateFolders, node: ", node);
     // Find the folder widget and change it to dropdown
     const folderWidget = node.widgets.find(w => w.name === WIDGET_NAME_BACKDROP);
@@ -18,7 +18,7 @@ const refreshBackdrops = async function (node) {
     }
     else {
         console.log("refreshBackdrops, node.workspace_codename is not set!");
-        return;
+        return undefined;
     }
 
     // console.log("refreshBackdrops, findUpstreamWorkspace: ", node.id);
@@ -33,6 +33,20 @@ const refreshBackdrops = async function (node) {
 
     // console.log("(", node.id, ") update folders, workspace_codename: ", workspace_codename);
     node.workspace_codename = workspace_codename;
+    return workspace_codename;
+};
+
+const applyBackdrops = function (node, backdrop_names) {
+    const widget = node.widgets.find(w => w.name === WIDGET_NAME_BACKDROP);
+    // console.log("(", node.id, ") got backdrops: ", backdrop_names)
+    const currentValue = widget.value;
+    widget.options.values = [...backdrop_names].sort((a, b) => a.localeCompare(b, undefined, { numeric: true }));
+    selectBackdrop(node, currentValue);
+};
+
+// the server answers with an ETag, the browser revalidates and gets a 304 when nothing changed
+const refreshBackdrops = async function (node) {
+    const workspace_codename = await resolveWorkspaceCodename(node);
     if (workspace_codename == undefined) {
         return;
     }
@@ -43,11 +57,7 @@ const refreshBackdrops = async function (node) {
         const data = await response.json();
 
         if (response.ok) {
-            const widget = node.widgets.find(w => w.name === WIDGET_NAME_BACKDROP);
-            // console.log("(", node.id, ") got backdrops: ", data.value)
-            const currentValue = widget.value;
-            widget.options.values = data.value.sort((a, b) => a.localeCompare(b, undefined, { numeric: true }));
-            selectBackdrop(node, currentValue);
+            applyBackdrops(node, data.value);
         }
         else {
             console.error("Server error:", data.error);
@@ -59,6 +69,39 @@ const refreshBackdrops = async function (node) {
 
 };
 
+// refreshes several backdrop nodes with a single request
+const refreshAllBackdrops = async function (nodes) {
+    const nodesByCodename = {};
+    for (const node of nodes) {
+        const workspace_codename = await resolveWorkspaceCodename(node);
+        if (workspace_codename == undefined) continue;
+        (nodesByCodename[workspace_codename] ||= []).push(node);
+    }
+
+    const codenames = Object.keys(nodesByCodename);
+    if (codenames.length === 0) return;
+
+    try {
+        const query = codenames.map(codename => `workspace_codename=${encodeURIComponent(codename)}`).join("&");
+        const response = await fetch(`/comfyui_play_traversal/get_backdrops_batch?${query}`);
+        const data = await response.json();
+
+        if (response.ok) {
+            for (const codename of codenames) {
+                for (const node of nodesByCodename[codename]) {
+                    applyBackdrops(node, data.value[codename] || []);
+                }
+            }
+        }
+        else {
+            console.error("Server error:", data.error);
+        }
+    }
+    catch (error) {
+        console.error("Failed to fetch workspace folders:", error);
+    }
+};
+
 const selectBackdrop = function (node, backdrop_name) {
     // console.log("(", node.id, ") will select backdrop: ", backdrop_name);
     // console.log("(", node.id, ")   - node: ", node);
@@ -112,13 +155,15 @@ app.registerExtension({
 
             // setup existing nodes
             if (DEBUG) console.log("##### setup existing nodes: ", graph);
+            const backdropNodes = [];
             for (var i = 0, l = graph.nodes.length; i < l; i++) {
                 var node = graph.nodes[i];
                 if (node.type !== "fot_SceneBackdropData") continue;
                 const fullNode = app.graph.getNodeById(node.id);
                 if (DEBUG) console.log("setup existing node, refresh backdrops: ", fullNode.id);
-                await refreshBackdrops(fullNode);
+                backdropNodes.push(fullNode);
             }
+            await refreshAllBackdrops(backdropNodes);
 
             return original_app_graph_configure_result;
         };
@@ -186,3 +231,68 @@ app.registerExtension({
 
     }
 });
+
+// comyui_play_traversal.fot_PlayStart
+const formatDuration = function (secs) {
+    if (secs == null) return "?";
+    secs = Math.round(secs);
+    const hours = Math.floor(secs / 3600);
+    const minutes = Math.floor((secs % 3600) / 60);
+    const seconds = secs % 60;
+    return (hours > 0 ? `${hours}h` : "") + (hours > 0 || minutes > 0 ? `${minutes}m` : "") + `${seconds}s`;
+};
+
+const formatProgress = function (event) {
+    const percent = event.frames_count > 0 ? Math.floor(100 * event.frames_done / event.frames_count) : 0;
+    let text = `${event.frames_done}/${event.frames_count} frames (${percent}%)`;
+    if (event.type === "finished") {
+        return text + " - done";
+    }
+    if (event.fps != null) {
+        text += ` - ${event.fps.toFixed(2)} fps, ETA ${formatDuration(event.eta_secs)}`;
+    }
+    if (event.type === "batch_started") {
+        text += ` - #${event.index_play} ${event.act} / ${event.scene} / ${event.beat}`;
+    }
+    return text;
+};
+
+app.registerExtension({
+    name: "comyui_play_traversal.fot_PlayStart",
+
+    // the server pushes progress events, nothing is polled
+    async setup() {
+        const source = new EventSource("/comfyui_play_traversal/progress");
+        source.onmessage = function (message) {
+            const event = JSON.parse(message.data);
+            const node = app.graph.getNodeById(Number(event.node));
+            if (!node || node.type !== "fot_PlayStart") return;
+            node.fot_progress = event;
+            node.setDirtyCanvas(true, false);
+        };
+    },
+
+    async beforeRegisterNodeDef(nodeType, nodeSpecs, app) {
+        if (nodeSpecs.name !== "fot_PlayStart") return;
+
+        const onDrawForeground = nodeType.prototype.onDrawForeground;
+        nodeType.prototype.onDrawForeground = function (ctx) {
+            const result = onDrawForeground?.apply(this, arguments);
+            if (!this.fot_progress || this.flags?.collapsed) return result;
+
+            const event = this.fot_progress;
+            const titleHeight = LiteGraph.NODE_TITLE_HEIGHT;
+            const ratio = event.frames_count > 0 ? event.frames_done / event.frames_count : 0;
+            ctx.save();
+            ctx.fillStyle = "#333";
+            ctx.fillRect(0, -titleHeight - 22, this.size[0], 18);
+            ctx.fillStyle = event.type === "finished" ? "#3a6" : "#365";
+            ctx.fillRect(0, -titleHeight - 22, this.size[0] * ratio, 18);
+            ctx.fillStyle = "#ddd";
+            ctx.font = "12px sans-serif";
+            ctx.fillText(formatProgress(event), 6, -titleHeight - 9, this.size[0] - 12);
+            ctx.restore();
+            return result;
+        };
+    }
+});
@@ -0,0 +1,137 @@
+"""
+Fits a play into a wall-clock deadline: lowers the sampler steps of beats and the
+resolution of independent chains, greedily, where it saves the most predicted time
+per unit of beat priority, until the predicted render time fits.
+
+Resolution is lowered per chain, not per beat: batches continuing from each other
+pass latents along, which must keep their size.
+"""
+import heapq
+
+from .cost_model import DEFAULT_SECS_PER_KEYFRAME, batch_features
+from .play_definition import DEFAULT_STEPS, DEFAULT_PRIORITY
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+# quality ladders, from the full quality down
+STEPS_FACTORS = [1.0, 0.8, 0.6, 0.45]
+SCALES = [1.0, 0.85, 0.7, 0.5]
+
+# previews are for a quick look, they get fewer steps too
+PREVIEW_STEPS_FACTOR = 0.5
+
+def scale_size(size, scale):
+    # latent sizes go by 8 pixels
+    return max(8, int(round(size * scale / 8)) * 8)
+
+def scale_steps(steps, steps_factor):
+    return max(1, int(round(steps * steps_factor)))
+
+def estimate_batch_secs(batch, cost_model=None, scale=None, steps_factor=None):
+    """
+    Predicted wall time of a batch, by default at its own scale and steps; without
+    a fitted cost model, from the time per keyframe, in proportion to the pixels.
+    """
+    scale = batch.get("scale", 1.0) if scale is None else scale
+    steps_factor = batch.get("steps_factor", 1.0) if steps_factor is None else steps_factor
+    play = batch["play"]
+    if cost_model is not None and cost_model.fitted:
+        features = batch_features(batch)
+        features["megapixel_frames"] = scale_size(play["width"], scale) * scale_size(play["height"], scale) * batch["frames_count"] / 1e6
+        # the cost model predicts at full steps
+        return cost_model.predict_features(features) * steps_factor
+    secs_per_keyframe = DEFAULT_SECS_PER_KEYFRAME if cost_model is None else cost_model.secs_per_keyframe
+    return batch["frames_count"] * secs_per_keyframe * scale * scale * steps_factor
+
+def set_batch_quality(batch, steps, scale, steps_factor):
+    play = batch["play"]
+    batch["scale"] = scale
+    batch["width"] = scale_size(play["width"], scale)
+    batch["height"] = scale_size(play["height"], scale)
+    batch["steps_factor"] = steps_factor
+    batch["steps"] = scale_steps(steps, steps_factor)
+
+def assign_quality(plan, chains, steps=DEFAULT_STEPS, deadline_secs=0, cost_model=None):
+    """
+    Sets the steps (and the resolution, see set_batch_quality) of each batch of a plan.
+
+    Without a deadline, full batches get all the steps, at the play resolution. With one,
+    the beats and chains are lowered step by step down their quality ladder (STEPS_FACTORS,
+    SCALES), each time taking the move saving the most predicted seconds per unit of
+    priority (the beats' "priority", 1 by default), until the plan fits in deadline_secs.
+
+    Args:
+        plan (list): The batches.
+        chains (list): The independent chains of full batches (see partition_segments).
+        steps (int): The sampler steps at full quality.
+        deadline_secs (float): The time budget, 0 for none.
+        cost_model (CostModel): Predicts the batch times, or None for the default time per keyframe.
+
+    Returns:
+        float: The predicted render time of the plan.
+    """
+    for batch in plan:
+        if batch["pass"] == "preview":
+            set_batch_quality(batch, steps, batch["scale"], PREVIEW_STEPS_FACTOR)
+        else:
+            set_batch_quality(batch, steps, 1.0, 1.0)
+    predicted_secs = sum(estimate_batch_secs(batch, cost_model) for batch in plan)
+    if deadline_secs <= 0 or predicted_secs <= deadline_secs:
+        return predicted_secs
+
+    # beats (per variant) take steps moves, chains take scale moves
+    beats = {}
+    for chain in chains:
+        for batch in chain:
+            beats.setdefault((batch.get("variant"), id(batch["beat"])), []).append(batch)
+
+    def priority(batches):
+        return max(max(batch["beat"].get("priority", DEFAULT_PRIORITY) for batch in batches), 1e-6)
+
+    units = [("steps", batches, STEPS_FACTORS) for batches in beats.values()] + [("scale", chain, SCALES) for chain in chains]
+    levels = [0] * len(units)
+    priorities = [priority(batches) for _, batches, _ in units]
+
+    def saving(u):
+        kind, batches, ladder = units[u]
+        if levels[u] + 1 >= len(ladder):
+            return None
+        lowered = ladder[levels[u] + 1]
+        if kind == "steps":
+            return sum(estimate_batch_secs(batch, cost_model) - estimate_batch_secs(batch, cost_model, steps_factor=lowered) for batch in batches)
+        return sum(estimate_batch_secs(batch, cost_model) - estimate_batch_secs(batch, cost_model, scale=lowered) for batch in batches)
+
+    # lazy greedy: savings change as other moves apply, they are checked again when popped
+    heap = []
+    for u in range(len(units)):
+        secs = saving(u)
+        if secs is not None and secs > 0:
+            heapq.heappush(heap, (-secs / priorities[u], u, secs))
+    moves = 0
+    while predicted_secs > deadline_secs and heap:
+        _, u, secs = heapq.heappop(heap)
+        current = saving(u)
+        if current is None or current <= 0:
+            continue
+        if abs(current - secs) > 1e-9:
+            heapq.heappush(heap, (-current / priorities[u], u, current))
+            continue
+        kind, batches, ladder = units[u]
+        levels[u] += 1
+        for batch in batches:
+            if kind == "steps":
+                set_batch_quality(batch, steps, batch["scale"], ladder[levels[u]])
+            else:
+                set_batch_quality(batch, steps, ladder[levels[u]], batch["steps_factor"])
+        predicted_secs -= current
+        moves += 1
+        following = saving(u)
+        if following is not None and following > 0:
+            heapq.heappush(heap, (-following / priorities[u], u, following))
+
+    if predicted_secs > deadline_secs:
+        logger.warning(f"The play cannot fit in {deadline_secs:.0f}s: {predicted_secs:.0f}s predicted at the lowest quality")
+    else:
+        logger.info(f"budget: {moves} quality step(s) down to fit in {deadline_secs:.0f}s, {predicted_secs:.0f}s predicted")
+    return predicted_secs
@@ -0,0 +1,158 @@
+"""
+Plans, validates and estimates play definitions without ComfyUI.
+
+From the repository folder:
+
+    python -m py.core.cli validate play.yaml
+    python -m py.core.cli plan play.yaml [--json]
+    python -m py.core.cli estimate play.yaml --telemetry output/fot_play_telemetry.jsonl
+    python -m py.core.cli estimate play.yaml --cost-model output/workspaces/<codename>/cost_model.json --workers 4
+    python -m py.core.cli plan play.yaml --deadline-secs 3600 --cost-model output/workspaces/<codename>/cost_model.json
+"""
+import argparse
+import json
+import sys
+
+from .play_definition import PLAY_DEFAULTS, SCHEDULES, PlayDefinitionError, read_play_definition
+from .planner import partition_segments, plan_play, summarize_plan
+from .cost_model import DEFAULT_SECS_PER_KEYFRAME, CostModel, schedule_longest_first
+from .budget import estimate_batch_secs
+
+def plan_definition(file_path, variant_seeds=None, batch_range=None, schedule=None, deadline_secs=None, cost_model=None):
+    definition = read_play_definition(file_path)
+    settings = {**PLAY_DEFAULTS, **definition["settings"]}
+    if variant_seeds is not None:
+        settings["variant_seeds"] = variant_seeds
+    if batch_range is not None:
+        settings["batch_range"] = batch_range
+    if schedule is not None:
+        settings["schedule"] = schedule
+    if deadline_secs is not None:
+        settings["deadline_secs"] = deadline_secs
+    return plan_play(play_acts=definition["acts"], cost_model=cost_model, **settings)
+
+def format_secs(secs):
+    secs = int(round(secs))
+    return f"{secs // 3600}:{secs // 60 % 60:02d}:{secs % 60:02d}"
+
+def read_secs_per_keyframe(telemetry_paths):
+    """
+    Average batch wall time per rendered keyframe, over the records of telemetry files.
+    """
+    wall_secs = 0.0
+    keyframes = 0
+    for telemetry_path in telemetry_paths:
+        with open(telemetry_path, 'r') as f:
+            for line in f:
+                if line.strip() == "":
+                    continue
+                record = json.loads(line)
+                wall_secs += record["wall_secs"]
+                keyframes += record["frames_count"]
+    if keyframes == 0:
+        raise ValueError(f"No batch recorded in {', '.join(telemetry_paths)}")
+    return wall_secs / keyframes
+
+def validate(args):
+    failed = 0
+    for file_path in args.files:
+        try:
+            definition = read_play_definition(file_path)
+        except (OSError, PlayDefinitionError) as e:
+            print(f"{file_path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        scenes = [scene for act in definition["acts"] for scene in act["scenes"]]
+        beats_count = sum(len(scene["scene_beats"]) for scene in scenes)
+        print(f"{file_path}: ok, {len(definition['acts'])} act(s), {len(scenes)} scene(s), {beats_count} beat(s)")
+    return 1 if failed else 0
+
+def load_cost_model(args):
+    """
+    The cost model of --cost-model, or fitted from --telemetry; None if neither (or older telemetry, without the batch features).
+    """
+    if args.cost_model:
+        return CostModel.load(args.cost_model)
+    if args.telemetry:
+        try:
+            return CostModel.from_telemetry(args.telemetry)
+        except ValueError:
+            return None
+    return None
+
+def plan(args):
+    summary = summarize_plan(plan_definition(args.file, args.variant_seeds, args.batch_range, args.schedule, args.deadline_secs, load_cost_model(args)))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    for beat in summary["beats"]:
+        variant = "" if beat["variant"] is None else f" (v{beat['variant']})"
+        print(f"{beat['act']} / {beat['scene']} / {beat['beat']}{variant}: frames {beat['play_frames_first']}-{beat['play_frames_last']}, {beat['batches_count']} batch(es), {beat['transition_in']}")
+    totals = summary["totals"]
+    previews = f" (first {totals['preview_batches']} preview batches)" if totals["preview_batches"] else ""
+    print(f"{totals['batches']} batches{previews}, {totals['frames']} frames ({totals['keyframes']} rendered), {totals['duration_secs']}s, {totals['chains']} independent chain(s)")
+    if totals["degraded_batches"]:
+        print(f"{totals['degraded_batches']} batch(es) with fewer steps or a lower resolution, to fit the deadline")
+    return 0
+
+def estimate(args):
+    cost_model = load_cost_model(args)
+    sequence_batches = plan_definition(args.file, args.variant_seeds, args.batch_range, args.schedule, args.deadline_secs, cost_model)
+    secs_per_keyframe = args.secs_per_keyframe
+    if cost_model is None and args.telemetry:
+        secs_per_keyframe = read_secs_per_keyframe(args.telemetry)
+
+    def batch_secs(batch):
+        if cost_model is not None:
+            return estimate_batch_secs(batch, cost_model) + args.secs_per_batch
+        return batch["frames_count"] * secs_per_keyframe * batch["scale"] ** 2 * batch["steps_factor"] + args.secs_per_batch
+
+    total_secs = sum(batch_secs(batch) for batch in sequence_batches.plan)
+    chains_secs = [sum(batch_secs(batch) for batch in segment) for segment in partition_segments(sequence_batches.plan)]
+    keyframes = sum(batch["frames_count"] for batch in sequence_batches.plan)
+    if cost_model is not None:
+        fit = "fitted" if cost_model.fitted else f"not fitted yet, {cost_model.secs_per_keyframe:.2f}s per keyframe"
+        print(f"{len(sequence_batches.plan)} batches, {keyframes} keyframes, cost model of {cost_model.count} batch(es) ({fit})")
+    else:
+        print(f"{len(sequence_batches.plan)} batches, {keyframes} keyframes at {secs_per_keyframe:.2f}s each")
+    print(f"estimated: {format_secs(total_secs)} in one loop, {format_secs(max(chains_secs, default=0))} with one worker per independent chain ({len(chains_secs)})")
+    if args.workers:
+        _, makespan = schedule_longest_first(chains_secs, args.workers)
+        print(f"estimated: {format_secs(makespan)} on {args.workers} worker(s), longest chains dispatched first")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m py.core.cli", description="Plan play definitions without ComfyUI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    validate_parser = subparsers.add_parser("validate", help="check play definitions")
+    validate_parser.add_argument("files", nargs="+", help="play definitions (.yaml, .yml or .json)")
+    validate_parser.set_defaults(run=validate)
+
+    for name, run, help in [("plan", plan, "print the batch plan of a play definition"), ("estimate", estimate, "estimate the rendering time of a play definition")]:
+        subparser = subparsers.add_parser(name, help=help)
+        subparser.add_argument("file", help="play definition (.yaml, .yml or .json)")
+        subparser.add_argument("--variant-seeds", help="override the variant seeds, e.g. '1,2,3'")
+        subparser.add_argument("--batch-range", help="override the batch range, e.g. '0-3,7'")
+        subparser.add_argument("--schedule", choices=SCHEDULES, help="override the schedule")
+        subparser.add_argument("--deadline-secs", type=float, help="override the deadline, lowering the steps and resolution of the least important beats to fit (0 for none)")
+        subparser.add_argument("--telemetry", nargs="+", help="telemetry files of earlier runs (<filename_base>_telemetry.jsonl), to fit a cost model (or measure the time per keyframe)")
+        subparser.add_argument("--cost-model", help="cost model of a workspace (cost_model.json), kept by Play (Start)")
+        subparser.set_defaults(run=run)
+        if name == "plan":
+            subparser.add_argument("--json", action="store_true", help="print the whole plan, as JSON")
+        else:
+            subparser.add_argument("--secs-per-keyframe", type=float, default=DEFAULT_SECS_PER_KEYFRAME, help="time to render a keyframe")
+            subparser.add_argument("--secs-per-batch", type=float, default=0.0, help="fixed time per batch (e.g. loop expansion, VAE decode)")
+            subparser.add_argument("--workers", type=int, help="also estimate the time on this many Play Dispatch workers")
+
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+A per-batch cost model: a least-squares regression of the batch wall time on
+features of the plan (keyframes, pixels, beat/scene starts, latent continuity),
+fitted from the telemetry of completed batches.
+
+Keeps only the sufficient statistics of the regression (X'X, X'y), so it can be
+updated after each batch and saved as a small JSON file per workspace.
+"""
+import json
+import os
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+COST_MODEL_FILENAME = "cost_model.json"
+COST_MODEL_VERSION = 1
+
+FEATURES = ["batch", "frames_count", "megapixel_frames", "beat_start", "scene_start", "continues"]
+
+# below as many batches as features, the fit is not determined: predict from the time per keyframe
+DEFAULT_SECS_PER_KEYFRAME = 2.0
+RIDGE = 1e-3
+
+def batch_features(batch):
+    """
+    The regression features of a planned batch.
+    """
+    frames_count = batch["frames_count"]
+    beat_start = batch["index"] == 0
+    scene_beats = batch["scene"].get("scene_beats") or []
+    return {
+        "batch": 1.0,
+        "frames_count": float(frames_count),
+        "megapixel_frames": batch["width"] * batch["height"] * frames_count / 1e6,
+        "beat_start": 1.0 if beat_start else 0.0,
+        "scene_start": 1.0 if beat_start and scene_beats and batch["beat"] is scene_beats[0] else 0.0,
+        "continues": 1.0 if batch["depends_on"] else 0.0,
+    }
+
+def solve(matrix, vector):
+    """
+    Solves matrix x = vector by Gaussian elimination with partial pivoting.
+    """
+    size = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        if abs(rows[pivot][column]) < 1e-12:
+            raise ValueError("Singular cost model system")
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for row in range(column + 1, size):
+            factor = rows[row][column] / rows[column][column]
+            if factor != 0.0:
+                for k in range(column, size + 1):
+                    rows[row][k] -= factor * rows[column][k]
+    solution = [0.0] * size
+    for row in reversed(range(size)):
+        solution[row] = (rows[row][size] - sum(rows[row][k] * solution[k] for k in range(row + 1, size))) / rows[row][row]
+    return solution
+
+class CostModel:
+    """
+    Predicts the wall time of batches. Observe completed batches with observe(),
+    predict with predict() / predict_plan().
+    """
+
+    def __init__(self):
+        size = len(FEATURES)
+        self.count = 0
+        self.xtx = [[0.0] * size for _ in range(size)]
+        self.xty = [0.0] * size
+        self.secs_total = 0.0
+        self.frames_total = 0.0
+        self._coefficients = None
+
+    @property
+    def fitted(self):
+        return self.count >= len(FEATURES)
+
+    def observe_features(self, features, wall_secs):
+        x = [features[name] for name in FEATURES]
+        for i, xi in enumerate(x):
+            self.xty[i] += xi * wall_secs
+            for j, xj in enumerate(x):
+                self.xtx[i][j] += xi * xj
+        self.count += 1
+        self.secs_total += wall_secs
+        self.frames_total += features["frames_count"]
+        self._coefficients = None
+
+    def observe(self, batch, wall_secs):
+        # the model predicts at full steps, sampling time goes with the steps
+        self.observe_features(batch_features(batch), wall_secs / batch.get("steps_factor", 1.0))
+
+    @property
+    def coefficients(self):
+        if not self.fitted:
+            return None
+        if self._coefficients is None:
+            # a small ridge keeps features that did not vary yet (e.g. a single resolution) from making it singular
+            matrix = [[value + (RIDGE * self.count if i == j and i > 0 else 0.0) for j, value in enumerate(row)] for i, row in enumerate(self.xtx)]
+            try:
+                self._coefficients = dict(zip(FEATURES, solve(matrix, self.xty)))
+            except ValueError:
+                return None
+        return self._coefficients
+
+    @property
+    def secs_per_keyframe(self):
+        if self.frames_total <= 0:
+            return DEFAULT_SECS_PER_KEYFRAME
+        return self.secs_total / self.frames_total
+
+    def predict_features(self, features):
+        coefficients = self.coefficients
+        if coefficients is None:
+            return features["frames_count"] * self.secs_per_keyframe
+        return max(0.0, sum(coefficients[name] * features[name] for name in FEATURES))
+
+    def predict(self, batch):
+        return self.predict_features(batch_features(batch)) * batch.get("steps_factor", 1.0)
+
+    def predict_plan(self, plan):
+        return sum(self.predict(batch) for batch in plan)
+
+    def to_dict(self):
+        return {
+            "version": COST_MODEL_VERSION,
+            "features": FEATURES,
+            "count": self.count,
+            "xtx": self.xtx,
+            "xty": self.xty,
+            "secs_total": self.secs_total,
+            "frames_total": self.frames_total,
+            # for reading only, refitted when loaded
+            "coefficients": self.coefficients,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        model = cls()
+        if data.get("version") != COST_MODEL_VERSION or data.get("features") != FEATURES:
+            logger.warning("Cost model saved by another version, starting over")
+            return model
+        model.count = data["count"]
+        model.xtx = data["xtx"]
+        model.xty = data["xty"]
+        model.secs_total = data["secs_total"]
+        model.frames_total = data["frames_total"]
+        return model
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Loads a saved cost model, or returns an empty one if there is none (or it is unreadable).
+        """
+        try:
+            with open(file_path, 'r') as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not read cost model {file_path}: {e}, starting over")
+            return cls()
+
+    def save(self, file_path):
+        temp_path = file_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temp_path, file_path)
+
+    @classmethod
+    def from_telemetry(cls, telemetry_paths):
+        """
+        Fits a cost model from telemetry files (<filename_base>_telemetry.jsonl); their records
+        must have their features (recorded since the cost model exists).
+        """
+        model = cls()
+        for telemetry_path in telemetry_paths:
+            with open(telemetry_path, 'r') as f:
+                for line in f:
+                    if line.strip() == "":
+                        continue
+                    record = json.loads(line)
+                    if record.get("features") is None:
+                        raise ValueError(f"{telemetry_path}: records without features, recorded by an older version")
+                    model.observe_features(record["features"], record["wall_secs"] / record.get("steps_factor", 1.0))
+        if model.count == 0:
+            raise ValueError(f"No batch recorded in {', '.join(telemetry_paths)}")
+        return model
+
+def schedule_longest_first(costs, workers_count):
+    """
+    Longest processing time first: assigns work items, by decreasing cost, each to the
+    least loaded worker.
+
+    Args:
+        costs (list): Cost of each work item.
+        workers_count (int): Number of workers.
+
+    Returns:
+        (list, float): The item indices in dispatch order, and the predicted makespan.
+    """
+    order = sorted(range(len(costs)), key=lambda i: -costs[i])
+    loads = [0.0] * max(1, workers_count)
+    for i in order:
+        worker = min(range(len(loads)), key=lambda w: loads[w])
+        loads[worker] += costs[i]
+    return order, max(loads)
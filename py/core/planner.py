@@ -0,0 +1,583 @@
+"""
+The play model and the batch planner.
+
+Only uses the standard library: plays can be planned, checked and estimated
+without ComfyUI (see cli.py), the nodes only hand their models over.
+"""
+import math
+
+from .play_definition import DEFAULT_TRANSITION_SECS, DEFAULT_PREVIEW_SCALE, DEFAULT_PREVIEW_FRAMES_COUNT, DEFAULT_STEPS
+from .budget import scale_size, assign_quality
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+def merge_prompts(*prompts):
+    """
+    Merges the prompts of the play tree levels, outermost first, skipping the empty ones.
+    """
+    parts = [prompt.strip() for prompt in prompts if prompt is not None and prompt.strip() != ""]
+    return ", ".join(parts)
+
+def partition_segments(plan):
+    """
+    Splits a plan into independent segments, following the batches' depends_on.
+
+    Returns:
+        list: Segments (lists of batches, in plan order), ordered by their first index_play.
+    """
+    segment_of = {}
+    segments = []
+    for batch in plan:
+        segment = None
+        for index in batch["depends_on"]:
+            if index in segment_of:
+                segment = segment_of[index]
+                break
+        if segment is None:
+            segment = []
+            segments.append(segment)
+        segment.append(batch)
+        segment_of[batch["index_play"]] = segment
+    return segments
+
+def format_batch_range(indices):
+    """
+    Formats index_play values as a compact range list, e.g. "0-3,7,9-10".
+    """
+    ranges = []
+    for index in sorted(indices):
+        if ranges and ranges[-1][1] == index - 1:
+            ranges[-1][1] = index
+        else:
+            ranges.append([index, index])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+def parse_batch_range(batch_range):
+    """
+    Parses a range list as produced by format_batch_range, returns a set of index_play values.
+    """
+    indices = set()
+    for part in batch_range.replace(" ", "").split(","):
+        if part == "":
+            continue
+        try:
+            if "-" in part:
+                first, last = part.split("-", 1)
+                indices.update(range(int(first), int(last) + 1))
+            else:
+                indices.add(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid batch range: '{batch_range}', expecting e.g. '0-3,7,9-10'")
+    return indices
+
+def remove_nones(list, name):
+    # ignoring trailing Nones
+    while list and list[-1] is None:
+        list.pop()
+    # need at least one remaining
+    if len(list) == 0:
+        raise ValueError(f"At least one {name} is required")
+    # Check for gaps (no Nones in the middle)
+    if None in list:
+        raise ValueError(f"Found gap in {name}s, please defragment!")
+    return list
+
+class SequenceBatches(list):
+    """
+    The batches of a play that remain to be rendered.
+
+    Also keeps the play, the full plan and the batch currently running, so that
+    fot_PlayContinue can still reach them once all the batches are popped.
+    """
+    def __init__(self, batches=(), play=None, transitions=()):
+        super().__init__(batches)
+        self.play = play
+        self.plays = [play]
+        self.plan = list(batches)
+        self.transitions = list(transitions)
+        self.batch_running = None
+        self.telemetry = None
+        self.profiler = None
+        self.progress = None
+        self.memory_governor = None
+        self.cost_model = None
+        self.cost_model_path = None
+        self.predicted_secs = None
+
+    def dag(self):
+        """
+        The dependency DAG of the plan.
+
+        Returns:
+            dict: "batches": the batches each batch continues from (by index_play),
+                "transitions": the compositing steps between scenes/beats, with their own dependencies,
+                "chains": the independent chains of batches, which can be rendered in any order.
+        """
+        return {
+            "batches": {batch["index_play"]: list(batch["depends_on"]) for batch in self.plan},
+            "transitions": self.transitions,
+            "chains": [[batch["index_play"] for batch in segment] for segment in partition_segments(self.plan)],
+        }
+
+    def get_batch(self, index_play):
+        if not hasattr(self, "_by_index"):
+            self._by_index = {batch["index_play"]: batch for batch in self.plan}
+        return self._by_index.get(index_play)
+
+    def take_latent_previous(self, batch):
+        """
+        Returns the output latent of the batch this one continues from, if any.
+
+        A batch output is released once all the batches depending on it got it.
+        """
+        if not batch["depends_on"]:
+            return None
+        batch_previous = self.get_batch(batch["depends_on"][0])
+        if batch_previous is None:
+            # left out by a batch range
+            return None
+        latent_previous = batch_previous.get("latent_output")
+        batch_previous["dependents_count"] -= 1
+        if batch_previous["dependents_count"] <= 0:
+            batch_previous["latent_output"] = None
+        return latent_previous
+
+def parse_seeds(seeds):
+    try:
+        return [int(seed) for seed in seeds.replace(",", " ").split()]
+    except ValueError:
+        raise ValueError(f"Invalid seed list: '{seeds}', expecting integers separated by commas")
+
+def interleave_variants(sequence_batches, seeds):
+    """
+    Turns a plan into one plan per seed, interleaved batch by batch.
+
+    Each variant gets its own play (sharing the base play's models and caches),
+    and its batches only continue from the batches of the same variant.
+    """
+    play = sequence_batches.play
+    variants = {"seeds": seeds}
+    plays = []
+    for v, seed in enumerate(seeds):
+        variant_play = dict(play)
+        variant_play["seed"] = seed
+        variant_play["variant"] = v
+        variant_play["variants"] = variants
+        variant_play["filename_base"] = play["filename_base"] + "_v" + str(v)
+        variant_play["finalizers"] = {}
+        plays.append(variant_play)
+
+    batches = []
+    index_map = {}
+    for batch in sequence_batches.plan:
+        for v, variant_play in enumerate(plays):
+            variant_batch = dict(batch)
+            variant_batch["play"] = variant_play
+            variant_batch["variant"] = v
+            variant_batch["index_play"] = len(batches)
+            variant_batch["filename"] = batch["filename"] + "_v" + str(v)
+            variant_batch["depends_on"] = [index_map[(index, v)] for index in batch["depends_on"]]
+            index_map[(batch["index_play"], v)] = variant_batch["index_play"]
+            batches.append(variant_batch)
+
+    transitions = []
+    for transition in sequence_batches.transitions:
+        for v in range(len(plays)):
+            variant_transition = dict(transition)
+            variant_transition["from"] = index_map[(transition["from"], v)]
+            variant_transition["to"] = index_map[(transition["to"], v)]
+            variant_transition["depends_on"] = [index_map[(index, v)] for index in transition["depends_on"]]
+            transitions.append(variant_transition)
+
+    variant_batches = SequenceBatches(batches, plays[0], transitions)
+    variant_batches.plays = plays
+    return variant_batches
+
+def schedule_preview_first(sequence_batches, preview_scale=DEFAULT_PREVIEW_SCALE, preview_frames_count=DEFAULT_PREVIEW_FRAMES_COUNT):
+    """
+    Puts a preview pass ahead of the plan: one short batch per beat (its first
+    preview_frames_count keyframes), at preview_scale of the play resolution,
+    independent of any other batch. The full batches follow, renumbered.
+
+    Preview batches have "pass" set to "preview", and "preview_frames_first": their
+    position in the preview pass, which plays the previews one after the other.
+    """
+    previews = []
+    # previews play one after the other, per play (variant)
+    preview_frames = {id(play): 0 for play in sequence_batches.plays}
+    for batch in sequence_batches.plan:
+        if batch["index"] != 0:
+            continue
+        beat = batch["beat"]
+        play = batch["play"]
+        frames_count = min(preview_frames_count, batch["frames_count"])
+        frames_last = min((frames_count - 1) * batch["interpolation_factor"], beat["frames_count"] - 1) + 1
+        preview = dict(batch)
+        preview.update({
+            "index_play": len(previews),
+            "filename": batch["filename"] + "_preview",
+            "frames_count": frames_count,
+            "frames_last": frames_last,
+            "output_frames_count": frames_last - batch["frames_first"] + 1,
+            "play_frames_last": batch["play_frames_first"] + frames_last - batch["frames_first"],
+            "transition_in": "cut",
+            "depends_on": [],
+            "pass": "preview",
+            "width": scale_size(play["width"], preview_scale),
+            "height": scale_size(play["height"], preview_scale),
+            "scale": preview_scale,
+            "preview_frames_first": preview_frames[id(play)] + 1,
+        })
+        preview_frames[id(play)] += preview["output_frames_count"]
+        derived = dict(batch["derived"])
+        secs_shortened = (batch["frames_last"] - frames_last) / play["fps"]
+        derived["duration_secs"] = preview["output_frames_count"] / play["fps"]
+        for key in ["secs_to_beat_end", "secs_to_scene_end", "secs_to_play_end"]:
+            derived[key] += secs_shortened
+        if derived["frame_weights"] is not None:
+            derived["frame_weights"] = derived["frame_weights"][:frames_count]
+        preview["derived"] = derived
+        previews.append(preview)
+
+    offset = len(previews)
+    batches = []
+    for batch in sequence_batches.plan:
+        full = dict(batch)
+        full["index_play"] = batch["index_play"] + offset
+        full["depends_on"] = [index + offset for index in batch["depends_on"]]
+        batches.append(full)
+    transitions = [dict(transition, **{
+        "from": transition["from"] + offset,
+        "to": transition["to"] + offset,
+        "depends_on": [index + offset for index in transition["depends_on"]],
+    }) for transition in sequence_batches.transitions]
+
+    scheduled = SequenceBatches(previews + batches, sequence_batches.play, transitions)
+    scheduled.plays = sequence_batches.plays
+    for play in scheduled.plays:
+        play["preview_frames_count"] = preview_frames[id(play)]
+    return scheduled
+
+def count_dependents(sequence_batches):
+    for batch in sequence_batches.plan:
+        batch["dependents_count"] = 0
+    for batch in sequence_batches.plan:
+        for index in batch["depends_on"]:
+            batch_previous = sequence_batches.get_batch(index)
+            if batch_previous is not None:
+                batch_previous["dependents_count"] += 1
+
+def select_batch_range(sequence_batches, batch_range):
+    """
+    Keeps only the batches of a range list (e.g. "0-3,7"), as dispatched to a worker.
+    """
+    indices = parse_batch_range(batch_range)
+    selected = SequenceBatches(
+        [batch for batch in sequence_batches.plan if batch["index_play"] in indices],
+        sequence_batches.play,
+        [transition for transition in sequence_batches.transitions if transition["to"] in indices])
+    selected.plays = sequence_batches.plays
+    if len(selected) == 0:
+        raise ValueError(f"No batch in range '{batch_range}'")
+    for play in selected.plays:
+        frames_first = [batch["play_frames_first"] for batch in selected if batch["play"] is play and batch["pass"] == "full"]
+        if frames_first:
+            play["frames_first"] = min(frames_first)
+    return selected
+
+def ramp(position, length):
+    # 0 at position 0, 1 from length on
+    if length <= 0:
+        return 1.0
+    return min(1.0, max(0.0, position / length))
+
+def derive_batch_values(batches):
+    """
+    Precomputes batch["derived"], the values loop bodies would otherwise compute from the
+    batch position with math nodes, every iteration:
+
+    * time_secs, duration_secs: where the batch output frames start in the play, and how long they last;
+    * beat_progress, scene_progress, play_progress: how far into its beat, scene and play the batch starts (0 to 1);
+    * secs_to_beat_end, secs_to_scene_end, secs_to_play_end: time left after the batch last frame;
+    * frame_weights: one weight per rendered keyframe, the opacity of the beat over the previous one
+      during a crossfade into it, and its brightness during a fade to black (out over the first half,
+      in over the second half); None when all the weights are 1.
+    """
+    if not batches:
+        return
+    fps = batches[0]["play"]["fps"]
+    frames_count_per_batch = batches[0]["play"]["frames_count_per_batch"]
+    play_frames = batches[-1]["play_frames_last"]
+
+    # beats in play order, to find the transition out of each one
+    beats = []
+    for batch in batches:
+        if not beats or beats[-1] is not batch["beat"]:
+            beats.append(batch["beat"])
+    transition_out = {}
+    for beat, beat_next in zip(beats, beats[1:]):
+        transition_out[id(beat)] = (beat_next["transition_in"], beat_next.get("transition_in_secs", 0))
+
+    scene_offsets = {}
+    for batch in batches:
+        beat = batch["beat"]
+        beat_frames = beat["frames_count"]
+        # play frames before the beat, and before its scene
+        beat_offset = batch["play_frames_first"] - batch["frames_first"]
+        scene_offset = scene_offsets.setdefault(id(batch["scene"]), beat_offset)
+        scene_frames = batch["scene"].get("frames_count") or beat_frames
+        frame_first = batch["frames_first"] - 1
+
+        weights = None
+        transition_in, transition_in_secs = beat["transition_in"], beat.get("transition_in_secs", 0)
+        transition_next, transition_next_secs = transition_out.get(id(beat), ("continuous", 0))
+        if transition_in in ("crossfade", "fade_to_black") or transition_next == "fade_to_black":
+            weights = []
+            keyframe_first = batch["index"] * frames_count_per_batch
+            for k in range(batch["frames_count"]):
+                frame = min((keyframe_first + k) * batch["interpolation_factor"], beat_frames - 1)
+                secs_in = frame / fps
+                secs_out = (beat_frames - 1 - frame) / fps
+                weight = 1.0
+                if transition_in == "crossfade":
+                    weight *= ramp(secs_in, transition_in_secs)
+                elif transition_in == "fade_to_black":
+                    weight *= ramp(secs_in, transition_in_secs / 2)
+                if transition_next == "fade_to_black":
+                    weight *= ramp(secs_out, transition_next_secs / 2)
+                weights.append(weight)
+            if all(weight == 1.0 for weight in weights):
+                weights = None
+
+        batch["derived"] = {
+            "time_secs": (batch["play_frames_first"] - 1) / fps,
+            "duration_secs": batch["output_frames_count"] / fps,
+            "beat_progress": frame_first / beat_frames if beat_frames else 0.0,
+            "scene_progress": (beat_offset - scene_offset + frame_first) / scene_frames if scene_frames else 0.0,
+            "play_progress": (batch["play_frames_first"] - 1) / play_frames if play_frames else 0.0,
+            "secs_to_beat_end": (beat_frames - batch["frames_last"]) / fps,
+            "secs_to_scene_end": (scene_offset + scene_frames - batch["play_frames_last"]) / fps,
+            "secs_to_play_end": (play_frames - batch["play_frames_last"]) / fps,
+            "frame_weights": None if weights is None else tuple(weights),
+        }
+
+def construct_sequence_batches(model, clip, vae, title, positive, negative, seed, filename_base, fps, width, height, frames_count_per_batch, play_acts, data=None, interpolation_factor=1):
+    play = {
+        "data": data,
+        "model": model,
+        "clip": clip,
+        "vae": vae,
+        "title": title,
+        "filename_base": filename_base,
+        "fps": fps,
+        "width": width,
+        "height": height,
+        "frames_count_per_batch": frames_count_per_batch,
+        "interpolation_factor": interpolation_factor,
+        "positive": positive,
+        "negative": negative,
+        "seed": seed,
+    }
+    
+    play_acts = remove_nones(play_acts, "act")
+
+    logger.debug(" == traversing tree for sequencing")
+
+    sequence_batches = []
+    transitions = []
+    duration_secs_play = 0
+    index_play = 0
+    frames_play = 0
+
+    for play_act in play_acts:
+        logger.debug(f"  - act: {play_act['title']}")
+        play_act["filename_base"] = filename_base + "_" + play_act["filename_part"]
+        scenes = play_act.get("scenes", [])
+        for scene in scenes:
+            logger.debug(f"    - scene: {scene['title']}")
+
+            scene["filename_base"] = play_act["filename_base"] + "_" + scene["filename_part"]
+
+            scene_beats_list = scene.get("scene_beats", [])
+            frames_count_scene = 0
+            for j, scene_beat in enumerate(scene_beats_list):
+                logger.debug(f"      * beat: {scene_beat['title']}")
+                logger.debug(f"        length: {scene_beat['duration_secs']}")
+
+                scene_beat["filename_base"] = scene["filename_base"] + "_" + scene_beat["filename_part"]
+                scene_beat["prompt_positive"] = merge_prompts(positive, play_act["positive"], scene["positive"], scene_beat["positive"])
+                scene_beat["prompt_negative"] = merge_prompts(negative, play_act["negative"], scene["negative"], scene_beat["negative"])
+                # the transition into the first beat of a scene is the scene's, unless the beat sets its own
+                transition = scene_beat.get("transition", "continuous")
+                transition_secs = scene_beat.get("transition_secs") or scene.get("transition_secs", DEFAULT_TRANSITION_SECS)
+                if j == 0 and transition == "continuous":
+                    transition = scene.get("transition", "continuous")
+                    transition_secs = scene.get("transition_secs", DEFAULT_TRANSITION_SECS)
+                if index_play == 0:
+                    transition = "cut"
+                scene_beat["transition_in"] = transition
+                scene_beat["transition_in_secs"] = transition_secs
+                if transition != "continuous":
+                    logger.debug(f"        transition: {transition}")
+                duration_secs_play += scene_beat["duration_secs"]
+                logger.debug(f"        duration: {scene_beat['duration_secs']}")
+                scene_beat["frames_count"] = int(fps * scene_beat["duration_secs"])
+                logger.debug(f"        frames: {scene_beat['frames_count']}")
+                if scene_beat["frames_count"] == 0:
+                    # shorter than a frame: nothing to render, and no keyframe to interpolate to
+                    logger.debug("        skipped: no frame")
+                    continue
+                interpolation = scene_beat.get("interpolation_factor") or interpolation_factor
+                # rendered keyframes are `interpolation` frames apart, the first and last beat frames included
+                keyframes_count = math.ceil((scene_beat["frames_count"] - 1) / interpolation) + 1
+                if interpolation > 1:
+                    logger.debug(f"        keyframes: {keyframes_count} (x{interpolation})")
+                batch_count = math.ceil(keyframes_count / frames_count_per_batch)
+                logger.debug(f"        batches: {batch_count}")
+                for i in range(0, batch_count):
+                    keyframe_first = i * frames_count_per_batch
+                    keyframe_last = min(keyframe_first + frames_count_per_batch, keyframes_count) - 1
+                    sequence_batch = {
+                        "play": play,
+                        "act": play_act,
+                        "scene": scene,
+                        "beat": scene_beat,
+                        "index_play": index_play,
+                        "index": i,
+                        "filename": scene_beat["filename_base"] + "_" + str(i) + "_" + str(index_play),
+                        "frames_count": keyframe_last - keyframe_first + 1,
+                        "interpolation_factor": interpolation,
+                        "transition_in": transition if i == 0 else "continuous",
+                        "pass": "full",
+                        "width": width,
+                        "height": height,
+                        "scale": 1.0,
+                        # only a continuous transition carries the latent chain over
+                        "depends_on": [index_play - 1] if i > 0 or transition == "continuous" else [],
+                    }
+                    if i == 0 and index_play > 0 and transition != "continuous":
+                        transitions.append({
+                            "kind": transition,
+                            "from": index_play - 1,
+                            "to": index_play,
+                            # compositing a crossfade or a fade needs both sides, a cut needs nothing
+                            "depends_on": [] if transition == "cut" else [index_play - 1, index_play],
+                            "duration_secs": transition_secs,
+                        })
+                    index_play += 1
+                    # output frames: the in-betweens leading to the batch keyframes, up to its last keyframe
+                    sequence_batch["frames_first"] = 1 if keyframe_first == 0 else (keyframe_first - 1) * interpolation + 2
+                    sequence_batch["frames_last"] = min(keyframe_last * interpolation, scene_beat["frames_count"] - 1) + 1
+                    sequence_batch["output_frames_count"] = sequence_batch["frames_last"] - sequence_batch["frames_first"] + 1
+                    sequence_batch["play_frames_first"] = frames_play + sequence_batch["frames_first"]
+                    sequence_batch["play_frames_last"] = frames_play + sequence_batch["frames_last"]
+
+                    sequence_batches.append(sequence_batch)
+                    if sequence_batch["frames_count"] == frames_count_per_batch:
+                        logger.debug(f"          -> {sequence_batch['filename']}: {sequence_batch['frames_first']} , {sequence_batch['frames_last']}")
+                    else:
+                        logger.debug(f"          +> {sequence_batch['filename']}: {sequence_batch['frames_first']} , {sequence_batch['frames_last']} ({sequence_batch['frames_count']} frames)")
+
+                frames_count_scene += scene_beat["frames_count"]
+                frames_play += scene_beat["frames_count"]
+
+            scene["frames_count"] = frames_count_scene
+        # play_act[""] = 
+
+    frames_count_total = int(fps * duration_secs_play)
+
+    play["duration_secs"] = duration_secs_play
+    play["frames_count"] = frames_count_total
+    play["frames_first"] = sequence_batches[0]["play_frames_first"] if sequence_batches else 1
+    derive_batch_values(sequence_batches)
+
+    return SequenceBatches(sequence_batches, play, transitions)
+
+def plan_play(title, positive, negative, seed, filename_base, fps, width, height, frames_count_per_batch, play_acts, interpolation_factor=1, variant_seeds="", batch_range="", schedule="sequential", preview_scale=DEFAULT_PREVIEW_SCALE, preview_frames_count=DEFAULT_PREVIEW_FRAMES_COUNT, steps=DEFAULT_STEPS, deadline_secs=0, cost_model=None, model=None, clip=None, vae=None, data=None):
+    """
+    Plans the batches of a play: its variants, in the order of the schedule, restricted to a batch range, with their steps and
+    resolution fitting the deadline (see budget.assign_quality), with their dependents counted.
+
+    Models are only handed over to the play, planning does not use them.
+    """
+    sequence_batches = construct_sequence_batches(model, clip, vae, title, positive, negative, seed, filename_base, fps, width, height, frames_count_per_batch, play_acts, data=data, interpolation_factor=interpolation_factor)
+
+    seeds = parse_seeds(variant_seeds)
+    if len(seeds) > 0:
+        logger.debug(f"* will render {len(seeds)} variants: {seeds}")
+        sequence_batches = interleave_variants(sequence_batches, seeds)
+    if schedule == "preview_first":
+        logger.debug(f"* will render a preview pass first, at x{preview_scale}")
+        sequence_batches = schedule_preview_first(sequence_batches, preview_scale, preview_frames_count)
+    if batch_range.strip() != "":
+        logger.debug(f"* will only render batches {batch_range}")
+        sequence_batches = select_batch_range(sequence_batches, batch_range)
+    chains = partition_segments([batch for batch in sequence_batches.plan if batch["pass"] == "full"])
+    sequence_batches.predicted_secs = assign_quality(sequence_batches.plan, chains, steps, deadline_secs, cost_model)
+    count_dependents(sequence_batches)
+    return sequence_batches
+
+def summarize_plan(sequence_batches):
+    """
+    A JSON-serializable summary of a plan: its totals, its beats (with their play frame ranges) and its batches.
+    """
+    plays = sequence_batches.plays
+    # variants interleave their batches, group them by (variant, beat)
+    beats = {}
+    for batch in sequence_batches.plan:
+        if batch["pass"] != "full":
+            continue
+        key = (batch.get("variant"), id(batch["beat"]))
+        beat = beats.get(key)
+        if beat is None:
+            beat = {
+                "variant": batch.get("variant"),
+                "act": batch["act"]["title"],
+                "scene": batch["scene"]["title"],
+                "beat": batch["beat"]["title"],
+                "transition_in": batch["transition_in"],
+                "play_frames_first": batch["play_frames_first"],
+                "batches_count": 0,
+            }
+            beats[key] = beat
+        beat["play_frames_last"] = batch["play_frames_last"]
+        beat["batches_count"] += 1
+    beats = list(beats.values())
+
+    return {
+        "totals": {
+            "plays": len(plays),
+            "batches": len(sequence_batches.plan),
+            "beats": len(beats),
+            "frames": sum(batch["output_frames_count"] for batch in sequence_batches.plan if batch["pass"] == "full"),
+            "keyframes": sum(batch["frames_count"] for batch in sequence_batches.plan),
+            "preview_batches": sum(1 for batch in sequence_batches.plan if batch["pass"] == "preview"),
+            "degraded_batches": sum(1 for batch in sequence_batches.plan if batch["pass"] == "full" and (batch["scale"] < 1.0 or batch["steps_factor"] < 1.0)),
+            "duration_secs": sequence_batches.play["duration_secs"],
+            "chains": len(partition_segments(sequence_batches.plan)),
+        },
+        "plays": [{"title": play["title"], "filename_base": play["filename_base"], "seed": play["seed"], "frames_count": play["frames_count"]} for play in plays],
+        "beats": beats,
+        "batches": [{
+            "index_play": batch["index_play"],
+            "variant": batch.get("variant"),
+            "beat": batch["beat"]["title"],
+            "index": batch["index"],
+            "filename": batch["filename"],
+            "pass": batch["pass"],
+            "width": batch["width"],
+            "height": batch["height"],
+            "steps": batch["steps"],
+            "frames_count": batch["frames_count"],
+            "frames_first": batch["frames_first"],
+            "frames_last": batch["frames_last"],
+            "play_frames_first": batch["play_frames_first"],
+            "play_frames_last": batch["play_frames_last"],
+            "output_frames_count": batch["output_frames_count"],
+            "interpolation_factor": batch["interpolation_factor"],
+            "transition_in": batch["transition_in"],
+            "depends_on": batch["depends_on"],
+        } for batch in sequence_batches.plan],
+        "transitions": sequence_batches.transitions,
+    }
@@ -0,0 +1,261 @@
+"""
+Play trees as plain data (JSON/YAML), turned into the dicts built by the
+Play-Act, Scene and Scene-Beat nodes.
+
+A definition looks like:
+
+    title: My play
+    fps: 20
+    acts:
+      - title: Act 1
+        scenes:
+          - title: Opening
+            transition: cut
+            beats:
+              - title: Sunrise
+                duration_secs: 4
+                positive: sun rising over the hills
+
+Only duration_secs is required; everything else defaults like the node widgets.
+
+In a YAML file, acts can also follow as separate documents (after `---`), so that
+long plays are parsed and validated one act at a time.
+"""
+import json
+import os
+import threading
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+TRANSITIONS = ["continuous", "cut", "crossfade", "fade_to_black"]
+DEFAULT_TRANSITION_SECS = 1.0
+
+SCHEDULES = ["sequential", "preview_first"]
+DEFAULT_PREVIEW_SCALE = 0.5
+DEFAULT_PREVIEW_FRAMES_COUNT = 9
+
+DEFAULT_STEPS = 20
+DEFAULT_PRIORITY = 1.0
+
+PLAY_DEFAULTS = {
+    "title": "Play title",
+    "positive": "",
+    "negative": "",
+    "seed": 0,
+    "filename_base": "fot_play",
+    "fps": 20,
+    "width": 480,
+    "height": 832,
+    "frames_count_per_batch": 41,
+    "interpolation_factor": 1,
+    "variant_seeds": "",
+    "batch_range": "",
+    "schedule": "sequential",
+    "preview_scale": DEFAULT_PREVIEW_SCALE,
+    "preview_frames_count": DEFAULT_PREVIEW_FRAMES_COUNT,
+    "steps": DEFAULT_STEPS,
+    "deadline_secs": 0,
+}
+
+class PlayDefinitionError(ValueError):
+    """
+    An invalid play definition; the message starts with the path of the offending value, e.g. acts[0].scenes[1].beats[2].duration_secs.
+    """
+
+    def __init__(self, path, message):
+        super().__init__(f"{path or 'play'}: {message}")
+        self.path = path
+        self.message = message
+
+def _join(path, key):
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else key
+
+def _check_mapping(value, path):
+    if not isinstance(value, dict):
+        raise PlayDefinitionError(path, f"expecting a mapping, got {type(value).__name__}")
+    return value
+
+def _check_list(value, path):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise PlayDefinitionError(path, f"expecting a list, got {type(value).__name__}")
+    return value
+
+def _get(mapping, key, path, default, kind, minimum=None, choices=None):
+    value = mapping.get(key, default)
+    value_path = _join(path, key)
+    if value is None:
+        value = default
+    if kind is str:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            raise PlayDefinitionError(value_path, f"expecting a string, got {type(value).__name__}")
+    elif kind is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise PlayDefinitionError(value_path, f"expecting an integer, got {value!r}")
+    elif kind is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise PlayDefinitionError(value_path, f"expecting a number, got {value!r}")
+        value = float(value)
+    if minimum is not None and value < minimum:
+        raise PlayDefinitionError(value_path, f"expecting at least {minimum}, got {value!r}")
+    if choices is not None and value not in choices:
+        raise PlayDefinitionError(value_path, f"expecting one of {', '.join(choices)}, got {value!r}")
+    return value
+
+def _get_seeds(mapping, path):
+    value = mapping.get("variant_seeds", "")
+    if isinstance(value, list):
+        for i, seed in enumerate(value):
+            if isinstance(seed, bool) or not isinstance(seed, int):
+                raise PlayDefinitionError(_join(_join(path, "variant_seeds"), i), f"expecting an integer, got {seed!r}")
+        return ", ".join(str(seed) for seed in value)
+    return _get(mapping, "variant_seeds", path, "", str)
+
+def _get_scale(mapping, key, path, default):
+    value = _get(mapping, key, path, default, float)
+    if not 0 < value <= 1:
+        raise PlayDefinitionError(_join(path, key), f"expecting a scale above 0 and up to 1, got {value!r}")
+    return value
+
+def parse_beat(beat, path, position=0):
+    _check_mapping(beat, path)
+    if "duration_secs" not in beat:
+        raise PlayDefinitionError(_join(path, "duration_secs"), "missing")
+    return {
+        "title": _get(beat, "title", path, f"Beat #{position + 1}", str),
+        "filename_part": _get(beat, "filename_part", path, f"b{position + 1}", str),
+        "duration_secs": _get(beat, "duration_secs", path, None, float, minimum=0),
+        "positive": _get(beat, "positive", path, "", str),
+        "negative": _get(beat, "negative", path, "", str),
+        "interpolation_factor": _get(beat, "interpolation_factor", path, 0, int, minimum=0),
+        "transition": _get(beat, "transition", path, "continuous", str, choices=TRANSITIONS),
+        "transition_secs": _get(beat, "transition_secs", path, 0, float, minimum=0),
+        "priority": _get(beat, "priority", path, DEFAULT_PRIORITY, float, minimum=0),
+    }
+
+def parse_scene(scene, path, position=0):
+    _check_mapping(scene, path)
+    beats_path = _join(path, "beats")
+    return {
+        "title": _get(scene, "title", path, f"Scene #{position + 1}", str),
+        "positive": _get(scene, "positive", path, "", str),
+        "negative": _get(scene, "negative", path, "", str),
+        "filename_part": _get(scene, "filename_part", path, f"#{position + 1}", str),
+        "scene_beats": [parse_beat(beat, _join(beats_path, i), i) for i, beat in enumerate(_check_list(scene.get("beats"), beats_path))],
+        "transition": _get(scene, "transition", path, "continuous", str, choices=TRANSITIONS),
+        "transition_secs": _get(scene, "transition_secs", path, DEFAULT_TRANSITION_SECS, float, minimum=0),
+    }
+
+def parse_act(act, path, position=0):
+    """
+    Validates an act of a definition, returns it as built by the Play-Act node.
+    """
+    _check_mapping(act, path)
+    scenes_path = _join(path, "scenes")
+    return {
+        "title": _get(act, "title", path, f"Act #{position + 1}", str),
+        "positive": _get(act, "positive", path, "", str),
+        "negative": _get(act, "negative", path, "", str),
+        "filename_part": _get(act, "filename_part", path, f"#{position + 1}", str),
+        "scenes": [parse_scene(scene, _join(scenes_path, i), i) for i, scene in enumerate(_check_list(act.get("scenes"), scenes_path))],
+    }
+
+def parse_play_settings(play, path="", defaults=PLAY_DEFAULTS):
+    """
+    Validates the play level keys of a definition (all but acts), filling in the defaults.
+    """
+    _check_mapping(play, path)
+    return {
+        "title": _get(play, "title", path, defaults["title"], str),
+        "positive": _get(play, "positive", path, defaults["positive"], str),
+        "negative": _get(play, "negative", path, defaults["negative"], str),
+        "seed": _get(play, "seed", path, defaults["seed"], int, minimum=0),
+        "filename_base": _get(play, "filename_base", path, defaults["filename_base"], str),
+        "fps": _get(play, "fps", path, defaults["fps"], float, minimum=1),
+        "width": _get(play, "width", path, defaults["width"], int, minimum=1),
+        "height": _get(play, "height", path, defaults["height"], int, minimum=1),
+        "frames_count_per_batch": _get(play, "frames_count_per_batch", path, defaults["frames_count_per_batch"], int, minimum=1),
+        "interpolation_factor": _get(play, "interpolation_factor", path, defaults["interpolation_factor"], int, minimum=1),
+        "variant_seeds": _get_seeds(play, path),
+        "batch_range": _get(play, "batch_range", path, defaults["batch_range"], str),
+        "schedule": _get(play, "schedule", path, defaults["schedule"], str, choices=SCHEDULES),
+        "preview_scale": _get_scale(play, "preview_scale", path, defaults["preview_scale"]),
+        "preview_frames_count": _get(play, "preview_frames_count", path, defaults["preview_frames_count"], int, minimum=1),
+        "steps": _get(play, "steps", path, defaults["steps"], int, minimum=1),
+        "deadline_secs": _get(play, "deadline_secs", path, defaults["deadline_secs"], float, minimum=0),
+    }
+
+def parse_play(play):
+    """
+    Validates a whole play definition.
+
+    Returns:
+        (dict, list): The play settings, and the acts as built by the Play-Act node.
+    """
+    settings = parse_play_settings(play)
+    acts = [parse_act(act, _join("acts", i), i) for i, act in enumerate(_check_list(play.get("acts"), "acts"))]
+    return settings, acts
+
+def read_play_definition(file_path):
+    """
+    Reads and validates a play definition file (.json, .yaml or .yml).
+
+    YAML documents are validated as they are parsed: the first one holds the play
+    (and possibly its first acts), each following one is an act.
+
+    Returns:
+        dict: "settings": the play settings given in the file, "acts": the acts as built by the Play-Act node.
+    """
+    name = os.path.basename(file_path)
+    if file_path.lower().endswith(".json"):
+        syntax, load_documents, syntax_errors = "JSON", lambda f: [json.load(f)], (json.JSONDecodeError,)
+    else:
+        # only needed for YAML definitions
+        import yaml
+        syntax, load_documents, syntax_errors = "YAML", yaml.safe_load_all, (yaml.YAMLError,)
+
+    try:
+        with open(file_path, 'r', encoding="utf-8") as f:
+            settings = None
+            acts = []
+            for i, document in enumerate(load_documents(f)):
+                if i == 0:
+                    document = document or {}
+                    settings = parse_play_settings(document)
+                    settings = {key: value for key, value in settings.items() if key in document}
+                    for j, act in enumerate(_check_list(document.get("acts"), "acts")):
+                        acts.append(parse_act(act, _join("acts", j), j))
+                else:
+                    acts.append(parse_act(document, _join("acts", len(acts)), len(acts)))
+    except PlayDefinitionError as e:
+        raise PlayDefinitionError(f"{name}: {e.path or 'play'}", e.message)
+    except syntax_errors as e:
+        raise PlayDefinitionError(name, f"invalid {syntax}: {e}")
+    if settings is None:
+        raise PlayDefinitionError(name, "empty file")
+    return {"path": file_path, "settings": settings, "acts": acts}
+
+# file_path -> (mtime_ns, size, definition)
+_definitions_cache = {}
+_definitions_lock = threading.Lock()
+
+def load_play_definition(file_path):
+    """
+    Returns the play definition of a file, only parsing it again when it changed (mtime or size).
+    """
+    stat = os.stat(file_path)
+    with _definitions_lock:
+        cached = _definitions_cache.get(file_path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+    definition = read_play_definition(file_path)
+    logger.info(f"play definition loaded: {file_path} ({len(definition['acts'])} act(s))")
+    with _definitions_lock:
+        _definitions_cache[file_path] = (stat.st_mtime_ns, stat.st_size, definition)
+    return definition
@@ -0,0 +1,155 @@
+"""
+Content-addressed store for the artifacts saved in workspaces.
+
+Artifacts are stored once, by SHA-256, in a blob directory shared by all the
+workspaces (`workspaces/.blobs/`), and hard-linked at their usual place in the
+backdrop folders. The hard link count of a blob is its reference count: a blob
+only linked from the store is garbage, and removed by gc.
+
+Collect unreferenced blobs (standard library only):
+
+    python py/libs/asset_store.py gc <ComfyUI output>/workspaces
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from collections import OrderedDict
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+BLOBS_DIRNAME = ".blobs"
+DECODE_CACHE_SIZE = 8
+
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class AssetStore:
+
+    def __init__(self, workspaces_dir):
+        self.blobs_dir = os.path.join(workspaces_dir, BLOBS_DIRNAME)
+
+    def blob_path(self, digest, extension):
+        return os.path.join(self.blobs_dir, digest[:2], digest + extension)
+
+    def store(self, write, target_path):
+        """
+        Stores an artifact by content and links it at target_path, with the current time as its mtime.
+
+        Args:
+            write (callable): Writes the artifact to the path it is given; the path keeps
+                the target extension, so format detection by extension still works.
+            target_path (str): Where the artifact is expected to be found.
+
+        Returns:
+            str: The SHA-256 of the artifact.
+        """
+        target_dir, target_name = os.path.split(target_path)
+        # a fresh directory, not a unique file name: some formats (e.g. torch.save) embed the file name
+        temp_dir = tempfile.mkdtemp(prefix=".store-", dir=target_dir)
+        temp_path = os.path.join(temp_dir, target_name)
+        try:
+            write(temp_path)
+            digest = file_digest(temp_path)
+            blob_path = self.blob_path(digest, os.path.splitext(target_name)[1])
+            # never write through an existing link: it would change the blob for every reference
+            if os.path.lexists(target_path):
+                os.remove(target_path)
+            while True:
+                if os.path.exists(blob_path):
+                    logger.debug(f"asset store: {target_name} is a duplicate of {digest[:12]}")
+                else:
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    self._link(temp_path, blob_path)
+                try:
+                    self._link(blob_path, target_path)
+                    # a link keeps the blob mtime, i.e. when its content was first stored: freshness
+                    # checks (e.g. thumbnail older than its image) must see when it was stored here
+                    os.utime(target_path)
+                    break
+                except FileNotFoundError:
+                    # gc removed the blob since it was checked, store it again
+                    logger.debug(f"asset store: blob {digest[:12]} collected meanwhile, storing it again")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return digest
+
+    def _link(self, source_path, link_path):
+        try:
+            os.link(source_path, link_path)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # no hard links here (e.g. another file system), fall back to a copy
+            shutil.copy2(source_path, link_path)
+
+    def gc(self):
+        """
+        Removes the blobs no longer linked from any workspace.
+
+        Returns:
+            (int, int): Number of blobs removed, and bytes freed.
+        """
+        removed = 0
+        freed = 0
+        if not os.path.isdir(self.blobs_dir):
+            return removed, freed
+        for dirpath, dirnames, filenames in os.walk(self.blobs_dir):
+            for filename in filenames:
+                blob_path = os.path.join(dirpath, filename)
+                stat = os.stat(blob_path)
+                if stat.st_nlink <= 1:
+                    os.remove(blob_path)
+                    removed += 1
+                    freed += stat.st_size
+        logger.info(f"asset store: removed {removed} unreferenced blob(s), {freed} bytes")
+        return removed, freed
+
+class DecodeCache:
+    """
+    Keeps the most recently decoded artifacts by content digest, so that backdrops
+    with identical content share their decoded tensors.
+    """
+
+    def __init__(self, max_size=DECODE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def load(self, digest, load, file_path):
+        if digest is None:
+            return load(file_path)
+        entry = self._entries.get(digest)
+        if entry is not None:
+            self._entries.move_to_end(digest)
+            return entry
+        entry = load(file_path)
+        self._entries[digest] = entry
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+decode_cache = DecodeCache()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed asset store of play traversal workspaces.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    gc_parser = subparsers.add_parser("gc", help="remove the blobs no longer referenced")
+    gc_parser.add_argument("workspaces_dir", help="the workspaces directory (<ComfyUI output>/workspaces)")
+    args = parser.parse_args(argv)
+
+    if args.command == "gc":
+        removed, freed = AssetStore(args.workspaces_dir).gc()
+        print(f"{removed} blob(s) removed, {freed} bytes freed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+DEFAULT_CACHE_SIZE = 16
+
+def encode_text(clip, text):
+    # start code from comfyui core:CLIPTextEncode
+    tokens = clip.tokenize(text)
+    if hasattr(clip, "encode_from_tokens_scheduled"):
+        return clip.encode_from_tokens_scheduled(tokens)
+    output = clip.encode_from_tokens(tokens, return_pooled=True, return_dict=True)
+    cond = output.pop("cond")
+    return [[cond, output]]
+    # end code from comfyui core:CLIPTextEncode
+
+class ConditioningCache:
+    """
+    Encodes each distinct (clip, text) pair once, keeping the most recently used conditionings.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def encode(self, clip, text):
+        key = (id(clip), text)
+        entry = self._entries.get(key)
+        # the clip is kept in the entry, so its id cannot be reused while cached
+        if entry is not None and entry[0] is clip:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        conditioning = encode_text(clip, text)
+        self._entries[key] = (clip, conditioning)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        logger.debug(f"conditioning cache: encoded ({self.hits} hits, {self.misses} misses, {len(self._entries)} entries)")
+        return conditioning
+
+    def clear(self):
+        self._entries.clear()
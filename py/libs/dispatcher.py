@@ -0,0 +1,262 @@
+"""
+Renders the independent segments of a play on several ComfyUI workers.
+
+A segment is a chain of batches linked by `depends_on`; segments start wherever
+the latent chain is broken (e.g. a scene starting with a cut), so they can be
+rendered in any order, on any worker. Each segment is queued on a worker through
+the ComfyUI HTTP prompt API, as a copy of an API-format workflow whose
+`fot_PlayStart` node gets the segment as its `batch_range`.
+
+Only uses the standard library, so that it can be exercised against the stub
+worker below without a ComfyUI install.
+"""
+import json
+import queue
+import threading
+import time
+import uuid
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..core.planner import format_batch_range
+from ..core.cost_model import schedule_longest_first
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+DEFAULT_RETRIES = 2
+DEFAULT_POLL_INTERVAL = 2.0
+# a segment still not done after this long counts as failed (e.g. a hung worker), 0 waits forever
+DEFAULT_SEGMENT_TIMEOUT = 6 * 3600
+
+def segment_workflow(workflow, batch_range):
+    workflow = json.loads(json.dumps(workflow))
+    play_starts = [node for node in workflow.values() if node.get("class_type") == "fot_PlayStart"]
+    if len(play_starts) != 1:
+        raise ValueError(f"The workflow must contain exactly one fot_PlayStart node, found {len(play_starts)}")
+    play_starts[0]["inputs"]["batch_range"] = batch_range
+    return workflow
+
+class ComfyWorker:
+    """
+    Minimal client of the ComfyUI prompt API of one worker.
+    """
+
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.client_id = uuid.uuid4().hex
+
+    def _request(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        request = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = response.read().decode("utf-8")
+        # /interrupt and /queue answer with an empty body
+        return json.loads(body) if body.strip() != "" else {}
+
+    def submit(self, workflow):
+        response = self._request("/prompt", {"prompt": workflow, "client_id": self.client_id})
+        if response.get("node_errors"):
+            raise RuntimeError(f"Workflow rejected by {self.url}: {response['node_errors']}")
+        return response["prompt_id"]
+
+    def wait(self, prompt_id, poll_interval=DEFAULT_POLL_INTERVAL, segment_timeout=DEFAULT_SEGMENT_TIMEOUT):
+        deadline = None if segment_timeout <= 0 else time.monotonic() + segment_timeout
+        while True:
+            history = self._request(f"/history/{prompt_id}")
+            entry = history.get(prompt_id)
+            if entry is not None:
+                status = entry.get("status", {})
+                if status.get("status_str") == "error":
+                    raise RuntimeError(f"Prompt {prompt_id} failed on {self.url}: {status.get('messages')}")
+                if status.get("completed", True):
+                    return entry.get("outputs", {})
+            if deadline is not None and time.monotonic() >= deadline:
+                # the retry must not queue behind it, on this worker
+                self.cancel(prompt_id)
+                raise TimeoutError(f"Prompt {prompt_id} not done on {self.url} after {segment_timeout:.0f}s")
+            time.sleep(poll_interval)
+
+    def cancel(self, prompt_id):
+        """
+        Interrupts the prompt if it is running, and removes it from the queue if it is pending; best effort.
+        """
+        for path, payload in [("/interrupt", {"prompt_id": prompt_id}), ("/queue", {"delete": [prompt_id]})]:
+            try:
+                self._request(path, payload)
+            except (OSError, ValueError) as e:
+                logger.warning(f" - Could not {path[1:]} prompt {prompt_id} on {self.url}: {e}")
+
+    def render(self, workflow, poll_interval=DEFAULT_POLL_INTERVAL, segment_timeout=DEFAULT_SEGMENT_TIMEOUT):
+        return self.wait(self.submit(workflow), poll_interval=poll_interval, segment_timeout=segment_timeout)
+
+def segment_cost(segment, cost_model=None):
+    """
+    Predicted wall time of a segment, or its keyframe count without a cost model.
+    """
+    if cost_model is None:
+        return sum(batch["frames_count"] for batch in segment)
+    return cost_model.predict_plan(segment)
+
+def dispatch_segments(workflow, segments, workers, retries=DEFAULT_RETRIES, poll_interval=DEFAULT_POLL_INTERVAL, cost_model=None, segment_timeout=DEFAULT_SEGMENT_TIMEOUT):
+    """
+    Renders the segments on the workers, one segment per worker at a time.
+
+    Segments are queued longest first (by the cost model predictions, if given), so that
+    the long ones do not end up last on a single worker. A failed segment, or one not
+    done after segment_timeout seconds, is queued again (possibly for another worker)
+    up to `retries` times.
+
+    Args:
+        workflow (dict): API-format workflow rendering the whole play.
+        segments (list): Segments, as returned by partition_segments.
+        workers (list): ComfyWorker instances.
+        cost_model (CostModel): Predicts the segments wall time.
+        segment_timeout (float): Seconds to wait for a segment, 0 for no limit.
+
+    Returns:
+        list: One result per segment, in index_play order: {"batch_range", "worker", "attempts", "outputs"}.
+    """
+    if len(workers) == 0:
+        raise ValueError("At least one worker is required")
+
+    order, makespan = schedule_longest_first([segment_cost(segment, cost_model) for segment in segments], len(workers))
+    if cost_model is not None:
+        logger.info(f"dispatch: predicted {makespan / 60:.1f} min on {len(workers)} worker(s)")
+    pending = queue.Queue()
+    for i in order:
+        pending.put((segments[i], 1))
+
+    results = {}
+    failures = {}
+    lock = threading.Lock()
+
+    def run(worker):
+        while True:
+            with lock:
+                if len(results) + len(failures) == len(segments):
+                    return
+            try:
+                segment, attempt = pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            first_index = segment[0]["index_play"]
+            batch_range = format_batch_range(batch["index_play"] for batch in segment)
+            logger.info(f"dispatch: segment {batch_range} -> {worker.url} (attempt {attempt})")
+            try:
+                outputs = worker.render(segment_workflow(workflow, batch_range), poll_interval=poll_interval, segment_timeout=segment_timeout)
+                with lock:
+                    results[first_index] = {"batch_range": batch_range, "worker": worker.url, "attempts": attempt, "outputs": outputs}
+            except Exception as e:
+                # whatever the failure (e.g. an unexpected /history payload), the segment must end up done or failed
+                logger.warning(f" - Segment {batch_range} failed on {worker.url}: {type(e).__name__}: {e}")
+                if attempt <= retries:
+                    pending.put((segment, attempt + 1))
+                else:
+                    with lock:
+                        failures[first_index] = f"{batch_range}: {e}"
+
+    threads = [threading.Thread(target=run, args=(worker,), name=f"fot_dispatch_{i}", daemon=True) for i, worker in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} segment(s) failed after {retries} retries: " + "; ".join(failures[k] for k in sorted(failures)))
+    return [results[k] for k in sorted(results)]
+
+# #############################################################################
+# stub worker, answering the prompt API like ComfyUI without rendering anything
+
+class StubWorker:
+    """
+    Local stand-in for a ComfyUI worker: completes each prompt immediately, echoing
+    the batch_range it was given as its output. The first `fail_count` prompts fail,
+    the next `malformed_count` ones get an unexpected history entry, the next `hang_count`
+    ones never complete (until deleted from the queue, see `interrupted` and `deleted`).
+
+    Usage:
+        with StubWorker() as stub:
+            dispatch_segments(workflow, segments, [ComfyWorker(stub.url)])
+    """
+
+    def __init__(self, fail_count=0, hang_count=0, malformed_count=0, host="127.0.0.1", port=0):
+        self.fail_count = fail_count
+        self.hang_count = hang_count
+        self.malformed_count = malformed_count
+        self.prompts = []
+        self.interrupted = []
+        self.deleted = []
+        self._history = {}
+        self._lock = threading.Lock()
+
+        stub = self
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/prompt":
+                    return self._reply({"prompt_id": stub._complete(payload["prompt"]), "number": 0, "node_errors": {}})
+                if self.path == "/interrupt":
+                    with stub._lock:
+                        stub.interrupted.append(payload.get("prompt_id"))
+                    return self._reply({})
+                if self.path == "/queue":
+                    with stub._lock:
+                        stub.deleted.extend(payload.get("delete", []))
+                    return self._reply({})
+                self._reply({"error": "not found"}, 404)
+
+            def do_GET(self):
+                if not self.path.startswith("/history/"):
+                    return self._reply({"error": "not found"}, 404)
+                prompt_id = self.path[len("/history/"):]
+                with stub._lock:
+                    entry = stub._history.get(prompt_id)
+                self._reply({} if entry is None else {prompt_id: entry})
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def _complete(self, workflow):
+        prompt_id = uuid.uuid4().hex
+        batch_range = next(node["inputs"].get("batch_range") for node in workflow.values() if node.get("class_type") == "fot_PlayStart")
+        with self._lock:
+            self.prompts.append(workflow)
+            if self.fail_count > 0:
+                self.fail_count -= 1
+                status = {"status_str": "error", "completed": False, "messages": ["stub failure"]}
+            elif self.malformed_count > 0:
+                self.malformed_count -= 1
+                self._history[prompt_id] = "malformed"
+                return prompt_id
+            elif self.hang_count > 0:
+                self.hang_count -= 1
+                # still queued, as far as the history tells
+                return prompt_id
+            else:
+                status = {"status_str": "success", "completed": True, "messages": []}
+            self._history[prompt_id] = {"status": status, "outputs": {"batch_range": batch_range}}
+        return prompt_id
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,95 @@
+import numpy as np
+
+INTERPOLATION_METHODS = ["blend", "optical_flow"]
+
+def blend_inbetweens(frames_from, frames_to, factor):
+    """
+    Linear blend, vectorized over all the keyframe pairs.
+
+    Args:
+        frames_from, frames_to: float32 keyframes (N, H, W, C), pair-wise.
+        factor (int): Output frames per pair; the last one is frames_to itself.
+
+    Returns:
+        np.ndarray: (N * factor, H, W, C)
+    """
+    weights = (np.arange(1, factor + 1, dtype=np.float32) / factor).reshape(1, factor, 1, 1, 1)
+    frames = frames_from[:, None] * (1.0 - weights) + frames_to[:, None] * weights
+    return frames.reshape(-1, *frames_from.shape[1:])
+
+def _warp(frame, flow, scale):
+    import cv2
+    height, width = flow.shape[:2]
+    grid_x, grid_y = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    map_x = grid_x + flow[..., 0] * scale
+    map_y = grid_y + flow[..., 1] * scale
+    return cv2.remap(frame, map_x, map_y, interpolation=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+def flow_inbetweens(frames_from, frames_to, factor):
+    """
+    Motion-compensated blend along the Farneback optical flow of each keyframe pair.
+    Same contract as blend_inbetweens.
+    """
+    import cv2
+    output = []
+    for frame_from, frame_to in zip(frames_from, frames_to):
+        gray_from = cv2.cvtColor((frame_from[..., :3] * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY)
+        gray_to = cv2.cvtColor((frame_to[..., :3] * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY)
+        flow = cv2.calcOpticalFlowFarneback(gray_from, gray_to, None, 0.5, 3, 15, 3, 5, 1.2, 0)
+        for j in range(1, factor):
+            t = j / factor
+            warped_from = _warp(frame_from, flow, -t)
+            warped_to = _warp(frame_to, flow, 1.0 - t)
+            output.append(warped_from * (1.0 - t) + warped_to * t)
+        output.append(frame_to)
+    return np.stack(output).reshape(-1, *frames_from.shape[1:])
+
+def interpolate_keyframes(keyframes, factor, frames_count, keyframe_previous=None, method="blend", continued=None):
+    """
+    Synthesizes the frames between rendered keyframes.
+
+    The last keyframe of a beat is the last beat frame, so the final gap of a batch may be
+    shorter than factor: its length is whatever frames_count leaves for it.
+
+    Args:
+        keyframes (np.ndarray): float32 keyframes (N, H, W, C).
+        factor (int): Keyframe spacing, in output frames.
+        frames_count (int): Number of output frames to return.
+        keyframe_previous (np.ndarray): Last keyframe of the previous batch of the beat, if any;
+            the in-betweens leading to the first keyframe are then produced as well.
+        method (str): One of INTERPOLATION_METHODS.
+        continued (bool): Whether the batch continues a previous batch of the beat, i.e. its output
+            starts with the in-betweens leading to its first keyframe; defaults to having keyframe_previous.
+
+    Returns:
+        np.ndarray: float32 frames (frames_count, H, W, C).
+    """
+    if factor <= 1:
+        return keyframes[:frames_count]
+    if continued is None:
+        continued = keyframe_previous is not None
+
+    if keyframe_previous is not None:
+        sequence = np.concatenate([keyframe_previous[None], keyframes])
+        head = sequence[:0]
+    else:
+        sequence = keyframes
+        head = keyframes[:1]
+
+    # frames_count = (first keyframe, unless continued) + factor per gap + the final gap
+    gaps_count = len(keyframes) if continued else len(keyframes) - 1
+    last_gap = min(max(frames_count - (0 if continued else 1) - (gaps_count - 1) * factor, 1), factor)
+
+    frames = [head]
+    if len(sequence) > 1:
+        inbetweens = flow_inbetweens if method == "optical_flow" else blend_inbetweens
+        if len(sequence) > 2:
+            frames.append(inbetweens(sequence[:-2], sequence[1:-1], factor))
+        frames.append(inbetweens(sequence[-2:-1], sequence[-1:], last_gap))
+    frames = np.concatenate(frames)
+
+    if len(frames) < frames_count:
+        # e.g. the previous keyframe was not available, hold the first frame
+        padding = np.repeat(frames[:1], frames_count - len(frames), axis=0)
+        frames = np.concatenate([padding, frames])
+    return frames[:frames_count]
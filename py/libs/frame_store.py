@@ -0,0 +1,80 @@
+import numpy as np
+import os
+import folder_paths
+
+from .play_hooks import register_play_finalizer
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+class FrameStore:
+    """
+    Disk-backed uint8 frames of a play, addressed by play frame index (1-based).
+
+    The frames live in a memory-mapped .npy file of shape (frames_count, height, width, 3),
+    so batches write their slice in place and readers get any range without loading the play.
+    """
+
+    def __init__(self, frames, store_path):
+        self.frames = frames
+        self.store_path = store_path
+
+    @classmethod
+    def create(cls, store_path, frames_count, width, height):
+        shape = (frames_count, height, width, 3)
+        if os.path.exists(store_path):
+            frames = np.load(store_path, mmap_mode='r+')
+            if frames.shape == shape and frames.dtype == np.uint8:
+                logger.info(f"Frame store reopened: {store_path} {shape}")
+                return cls(frames, store_path)
+            del frames
+            logger.info(f"Frame store shape changed, recreating: {store_path}")
+        frames = np.lib.format.open_memmap(store_path, mode='w+', dtype=np.uint8, shape=shape)
+        logger.info(f"Frame store created: {store_path} {shape}")
+        return cls(frames, store_path)
+
+    @classmethod
+    def open(cls, store_path, writable=False):
+        frames = np.load(store_path, mmap_mode='r+' if writable else 'r')
+        return cls(frames, store_path)
+
+    @property
+    def frames_count(self):
+        return self.frames.shape[0]
+
+    def _slice(self, frames_first, frames_last):
+        if frames_first < 1 or frames_last > self.frames_count or frames_last < frames_first:
+            raise IndexError(f"Frame range [{frames_first}, {frames_last}] is outside of [1, {self.frames_count}]")
+        return slice(frames_first - 1, frames_last)
+
+    def write(self, frames_first, frames):
+        """
+        Writes uint8 RGB frames (N, H, W, 3) in place, starting at play frame frames_first.
+        Frames past the end of the store are dropped.
+        """
+        frames_last = min(frames_first + len(frames) - 1, self.frames_count)
+        if frames_last < frames_first + len(frames) - 1:
+            logger.warning(f" - Frame store is full, dropping {frames_first + len(frames) - 1 - frames_last} frame(s)")
+        count = frames_last - frames_first + 1
+        self.frames[self._slice(frames_first, frames_last)] = frames[:count]
+
+    def read(self, frames_first, frames_last):
+        """
+        Returns a zero-copy view on play frames [frames_first, frames_last].
+        """
+        return self.frames[self._slice(frames_first, frames_last)]
+
+    def flush(self):
+        self.frames.flush()
+
+def create_play_frame_store(play):
+    """
+    Creates the frame store of a play, flushed when the play loop ends.
+    """
+    output_dir = folder_paths.get_output_directory()
+    os.makedirs(output_dir, exist_ok=True)
+    store_path = os.path.join(output_dir, play["filename_base"] + "_frames.npy")
+    store = FrameStore.create(store_path, play["frames_count"], play["width"], play["height"])
+    play["frame_store"] = store
+    register_play_finalizer(play, "frame_store", lambda play: store.flush())
+    return store
@@ -1,17 +1,23 @@
 
-import cv2
 import numpy as np
-import torch
 import os
 import folder_paths
-from pathlib import Path
-from PIL import Image, ImageOps, ImageSequence
 import json
-import node_helpers
+
+# torch, PIL and node_helpers are imported by the functions using them, so that
+# importing the extension stays cheap
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
 
 COMPRESS_LEVEL=4
+THUMBNAIL_SIZE=256
+THUMBNAIL_QUALITY=85
 
 def loadImage(image_path):
+    import torch
+    from PIL import Image, ImageOps, ImageSequence
+    import node_helpers
     # start code from comfyui core:LoadImage
     img = node_helpers.pillow(Image.open, image_path)
 
@@ -67,6 +73,7 @@ def storeImage(image, image_path, preserve_transparency=True):
         image_path: Output file path
         preserve_transparency: If True, maintains alpha channel for 4-channel images
     """
+    from PIL import Image
     # Extract first image if batch
     if len(image.shape) == 4:
         img_tensor = image[0]
@@ -95,7 +102,26 @@ def storeImage(image, image_path, preserve_transparency=True):
     img = Image.fromarray(img_np, mode=mode)
     img.save(image_path, compress_level=COMPRESS_LEVEL)
     
-    print(f"Image saved: {image_path} (mode: {mode})")
+    logger.info(f"Image saved: {image_path} (mode: {mode})")
+
+def storeThumbnail(image_path, thumbnail_path, max_size=THUMBNAIL_SIZE):
+    """
+    Save a small JPEG copy of an image file, fitting in max_size x max_size
+
+    Args:
+        image_path: Source image file path
+        thumbnail_path: Output file path
+        max_size: Largest side of the thumbnail, in pixels
+    """
+    from PIL import Image, ImageOps
+    with Image.open(image_path) as img:
+        img = ImageOps.exif_transpose(img)
+        img.draft('RGB', (max_size, max_size))
+        img = img.convert('RGB')
+        img.thumbnail((max_size, max_size), Image.LANCZOS)
+        img.save(thumbnail_path, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+
+    logger.info(f"Thumbnail saved: {thumbnail_path}")
 
 def loadMask(mask_path, invert=False, use_alpha_channel=True):
     """
@@ -109,8 +135,10 @@ def loadMask(mask_path, invert=False, use_alpha_channel=True):
     Returns:
         torch.Tensor: Mask tensor in (1, 1, H, W) format
     """
+    import torch
+    from PIL import Image
     try:
-        print(f"mask_path = ", mask_path)
+        logger.debug(f"mask_path = {mask_path}")
         # Check if file exists
         if not os.path.exists(mask_path):
             raise FileNotFoundError(f"Mask file not found: {mask_path}")
@@ -138,18 +166,19 @@ def loadMask(mask_path, invert=False, use_alpha_channel=True):
         # Convert to tensor with proper dimensions
         mask_tensor = torch.from_numpy(mask_np).unsqueeze(0)  # (1, H, W)
         
-        print(f"Mask loaded from: {mask_path}")
-        print(f"  - Dimensions: {mask_tensor.shape}")
-        print(f"  - Inverted: {invert}")
-        print(f"  - Value range: [{mask_tensor.min():.3f}, {mask_tensor.max():.3f}]")
+        logger.debug(f"Mask loaded from: {mask_path}")
+        logger.debug(f"  - Dimensions: {mask_tensor.shape}")
+        logger.debug(f"  - Inverted: {invert}")
+        logger.debug(f"  - Value range: [{mask_tensor.min():.3f}, {mask_tensor.max():.3f}]")
         
         return mask_tensor
         
     except Exception as e:
-        print(f"Error loading mask from {mask_path}: {e}")
+        logger.error(f"Error loading mask from {mask_path}: {e}")
         raise
 
 def storeMask(mask, mask_path, invert=False):
+    from PIL import Image
     # Ensure mask is 2D (H, W) or 3D (1, H, W)
     if len(mask.shape) == 4:
         mask = mask[0]  # Take first batch element
@@ -186,7 +215,7 @@ def storeMask(mask, mask_path, invert=False):
         
     image.save(mask_path, "PNG")
     
-    print(f"Mask saved as: {mask_path}")
+    logger.info(f"Mask saved as: {mask_path}")
 
 def storeImageLatent(latent, file_path):
     """
@@ -196,12 +225,13 @@ def storeImageLatent(latent, file_path):
         latent (dict): The ComfyUI LATENT object, expected to have a 'samples' key.
         file_path (str): The full path (including desired extension) where the latent should be saved.
     """
+    import torch
     if 'samples' not in latent:
         raise ValueError("The provided latent does not contain the required 'samples' key.")
     
     # Save the entire latent dictionary
     torch.save(latent, file_path)
-    print(f"Latent saved to: {file_path}")
+    logger.info(f"Latent saved to: {file_path}")
 
 def loadImageLatent(file_path):
     """
@@ -213,12 +243,13 @@ def loadImageLatent(file_path):
     Returns:
         dict: The loaded ComfyUI LATENT dictionary.
     """
+    import torch
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"The latent file was not found: {file_path}")
     
     # Load the latent dictionary. Map to CPU to avoid GPU loading issues.
     latent = torch.load(file_path, map_location='cpu')
-    print(f"Latent loaded from: {file_path}")
+    logger.debug(f"Latent loaded from: {file_path}")
     return latent
 
 def loadJson(element_json_filename):
@@ -228,6 +259,6 @@ def loadJson(element_json_filename):
                 character_pose_object = json.load(f)
             return character_pose_object
         except (json.JSONDecodeError, IOError) as e:
-            print(f" - Error loading workspace.json: {e}, creating new one")
+            logger.error(f" - Error loading workspace.json: {e}, creating new one")
     else:
         raise FileNotFoundError(f"Could not find element file: {element_json_filename}")
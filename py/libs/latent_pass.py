@@ -0,0 +1,127 @@
+import os
+import numpy as np
+import folder_paths
+
+from .image_io import storeImageLatent, loadImageLatent
+from .play_hooks import register_play_finalizer
+from .video_sink import get_play_video_sink, images_to_frames, resize_images
+from .frame_interpolation import interpolate_keyframes
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+RENDER_MODES = ["single_pass", "two_phase"]
+
+def get_play_latents_dir(play):
+    latents_dir = os.path.join(folder_paths.get_output_directory(), play["filename_base"] + "_latents")
+    os.makedirs(latents_dir, exist_ok=True)
+    return latents_dir
+
+def store_batch_latent(batch, latent):
+    """
+    Persists the sampled latent of a batch, for the decode phase of a two-phase play.
+
+    Preview batches are not decoded with the play, their latents are only kept for the full batches.
+    """
+    if batch.get("pass") == "preview":
+        store_preview_latent(batch, latent)
+        return None
+    play = batch["play"]
+    latent_path = os.path.join(get_play_latents_dir(play), batch["filename"] + ".pt")
+    storeImageLatent(latent, latent_path)
+
+    latent_files = play.get("latent_files")
+    if latent_files is None:
+        latent_files = {}
+        play["latent_files"] = latent_files
+    latent_files[batch["index_play"]] = {
+        "filename": batch["filename"],
+        "play_frames_first": batch["play_frames_first"],
+        "latent_path": latent_path,
+        "scale": batch.get("scale", 1.0),
+        "beat": batch["beat"]["filename_base"],
+        "index": batch["index"],
+        "interpolation_factor": batch["interpolation_factor"],
+        "output_frames_count": batch["output_frames_count"],
+    }
+    return latent_path
+
+def store_preview_latent(batch, latent):
+    """
+    Keeps the latent of a preview batch, for the full batches of its beat (see get_preview_latent).
+    """
+    play = batch["play"]
+    preview_latents = play.get("preview_latents")
+    if preview_latents is None:
+        preview_latents = {}
+        play["preview_latents"] = preview_latents
+        register_play_finalizer(play, "preview_latents", lambda play: play["preview_latents"].clear())
+    preview_latents[batch["beat"]["filename_base"]] = latent
+
+def get_preview_latent(batch):
+    """
+    The latent rendered by the preview pass for the beat of a full batch, if any: at the
+    preview resolution, to be upscaled by the loop body (e.g. as the start of img2img).
+    """
+    if batch.get("pass") != "full":
+        return None
+    return (batch["play"].get("preview_latents") or {}).get(batch["beat"]["filename_base"])
+
+def release_preview_latent(batch):
+    # once the last batch of its beat is done
+    if batch.get("pass") == "full" and batch["frames_last"] >= batch["beat"]["frames_count"]:
+        (batch["play"].get("preview_latents") or {}).pop(batch["beat"]["filename_base"], None)
+
+def setup_two_phase(play):
+    play["render_mode"] = "two_phase"
+    register_play_finalizer(play, "decode_latents", decode_play_latents)
+
+def decode_play_latents(play):
+    """
+    Second phase of a two-phase play: with the diffusion model unloaded, streams
+    the stored latents through the VAE in frame order, into the play outputs.
+
+    Like Frame Interpolate in a single pass, batches rendering one keyframe every
+    interpolation_factor frames get their in-betweens synthesized (by blending), continuing
+    from the last keyframe of the previous batch of their beat.
+    """
+    import comfy.model_management
+
+    latent_files = play.get("latent_files") or {}
+    logger.info(f"== decoding {len(latent_files)} stored latent batch(es) of '{play['title']}'")
+    if not latent_files:
+        return
+
+    comfy.model_management.unload_all_models()
+    comfy.model_management.soft_empty_cache()
+
+    vae = play["vae"]
+    frame_store = play.get("frame_store")
+    sink = get_play_video_sink(play)
+    tail = None
+    for entry in sorted(latent_files.values(), key=lambda entry: entry["play_frames_first"]):
+        latent = loadImageLatent(entry["latent_path"])
+        images = vae.decode(latent["samples"])
+        if len(images.shape) == 5:
+            # video VAEs decode to (B, T, H, W, C)
+            images = images.reshape(-1, images.shape[-3], images.shape[-2], images.shape[-1])
+        if entry["scale"] < 1.0:
+            # rendered at a lower resolution to fit the deadline
+            images = resize_images(images, play["width"], play["height"])
+        if entry["interpolation_factor"] > 1:
+            keyframes = images.float().cpu().numpy()
+            keyframe_previous = None
+            if tail is not None and tail["beat"] == entry["beat"] and tail["index"] == entry["index"] - 1:
+                keyframe_previous = tail["keyframe"]
+            tail = {"beat": entry["beat"], "index": entry["index"], "keyframe": keyframes[-1].copy()}
+            frames = interpolate_keyframes(keyframes, entry["interpolation_factor"], entry["output_frames_count"], keyframe_previous=keyframe_previous, continued=entry["index"] > 0)
+            frames = (np.clip(frames[..., :3], 0, 1) * 255).round().astype(np.uint8)
+            del keyframes
+        else:
+            frames = images_to_frames(images)
+        del latent, images
+
+        logger.debug(f"  - decoded {entry['filename']}: {len(frames)} frame(s)")
+        sink.append(entry["play_frames_first"], frames)
+        if frame_store is not None:
+            frame_store.write(entry["play_frames_first"], frames)
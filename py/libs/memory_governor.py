@@ -0,0 +1,121 @@
+import gc
+import os
+import sys
+
+from .telemetry import get_rss_bytes
+from .latent_pass import release_preview_latent
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+THRESHOLD_ENV = "FOT_MEMORY_THRESHOLD_MB"
+DEFAULT_THRESHOLD_MB = 512
+
+def get_threshold_mb(threshold_mb=DEFAULT_THRESHOLD_MB):
+    value = os.environ.get(THRESHOLD_ENV)
+    if value is None or value.strip() == "":
+        return threshold_mb
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Invalid {THRESHOLD_ENV}: '{value}', expecting megabytes, using {threshold_mb}")
+        return threshold_mb
+
+def get_device_reserved_bytes():
+    # only if ComfyUI already loaded torch, the governor must not be the one importing it
+    torch = sys.modules.get("torch")
+    try:
+        if torch is not None and torch.cuda.is_available():
+            return torch.cuda.memory_reserved()
+    except Exception:
+        pass
+    return None
+
+def empty_device_cache():
+    try:
+        import comfy.model_management
+        comfy.model_management.soft_empty_cache()
+        return
+    except ImportError:
+        pass
+    torch = sys.modules.get("torch")
+    try:
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+def format_mb(value):
+    return "n/a" if value is None else f"{value / 2**20:.0f} MB"
+
+class MemoryGovernor:
+    """
+    Runs between loop iterations: drops the references of the batch done that the next
+    iterations do not need, and once the memory grew by threshold_mb since the last
+    collection (process RSS or device cache), collects garbage and releases the device
+    cache, logging what was reclaimed. A threshold of 0 collects after every batch.
+    """
+
+    def __init__(self, threshold_mb=DEFAULT_THRESHOLD_MB):
+        self.threshold_bytes = max(0, threshold_mb) * 2**20
+        self.collections_count = 0
+        self.reset_baseline()
+
+    def reset_baseline(self):
+        self.rss_baseline = get_rss_bytes()
+        self.device_baseline = get_device_reserved_bytes()
+
+    def release_batch(self, batch):
+        """
+        Drops the references a batch done holds. Only the play's own: the inputs and outputs
+        of the executed nodes belong to ComfyUI (e.g. its cache of outputs).
+        """
+        if batch is None:
+            return
+        # its input latent was consumed, its output is kept only for batches still to continue from it
+        batch["latent_previous"] = None
+        if batch.get("dependents_count", 0) <= 0:
+            batch["latent_output"] = None
+        release_preview_latent(batch)
+
+    def grown_bytes(self):
+        grown = 0
+        rss = get_rss_bytes()
+        if rss is not None and self.rss_baseline is not None:
+            grown = max(grown, rss - self.rss_baseline)
+        device_reserved = get_device_reserved_bytes()
+        if device_reserved is not None and self.device_baseline is not None:
+            grown = max(grown, device_reserved - self.device_baseline)
+        return grown
+
+    def collect(self, reason=""):
+        rss_before = get_rss_bytes()
+        device_before = get_device_reserved_bytes()
+        objects_count = gc.collect()
+        empty_device_cache()
+        rss_after = get_rss_bytes()
+        device_after = get_device_reserved_bytes()
+        self.collections_count += 1
+        self.reset_baseline()
+
+        reclaimed = {
+            "objects": objects_count,
+            "rss_bytes": None if rss_before is None or rss_after is None else rss_before - rss_after,
+            "device_bytes": None if device_before is None or device_after is None else device_before - device_after,
+        }
+        logger.info(f"memory governor{reason}: collected {objects_count} object(s), reclaimed {format_mb(reclaimed['rss_bytes'])} RSS, {format_mb(reclaimed['device_bytes'])} device cache (RSS now {format_mb(rss_after)})")
+        return reclaimed
+
+    def after_batch(self, batch):
+        """
+        Returns what was reclaimed, or None when the threshold was not reached.
+        """
+        self.release_batch(batch)
+        grown = self.grown_bytes()
+        if grown < self.threshold_bytes:
+            logger.debug(f"memory governor: grew {format_mb(grown)} since the last collection")
+            return None
+        reclaimed = self.collect(f" after {batch['filename']}" if batch is not None else "")
+        if batch is not None:
+            batch["memory_reclaimed"] = reclaimed
+        return reclaimed
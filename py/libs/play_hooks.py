@@ -0,0 +1,37 @@
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+def register_play_finalizer(play, key, finalizer):
+    """
+    Registers a callback to run once the play loop is over.
+
+    Args:
+        play (dict): The play the finalizer belongs to.
+        key (str): Unique name of the finalizer; registering the same key twice replaces the first one.
+        finalizer (callable): Called with the play as its only argument.
+    """
+    finalizers = play.get("finalizers")
+    if finalizers is None:
+        finalizers = {}
+        play["finalizers"] = finalizers
+    finalizers[key] = finalizer
+
+def finish_play(play):
+    """
+    Runs the finalizers of a play, in registration order.
+
+    Finalizers registered while finishing (e.g. a sink opened by a late decode pass) are run as well.
+    A failing finalizer is logged and does not prevent the others from running.
+    """
+    if play is None:
+        return
+    finalizers = play.get("finalizers")
+    if not finalizers:
+        return
+    while finalizers:
+        key = next(iter(finalizers))
+        finalizer = finalizers.pop(key)
+        try:
+            finalizer(play)
+        except Exception as e:
+            logger.error(f" - Error finishing play '{play.get('title')}' ({key}): {e}")
@@ -0,0 +1,108 @@
+import cProfile
+import io
+import os
+import pstats
+import folder_paths
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+PROFILE_ENV = "FOT_PROFILE"
+PROFILE_TOP_ENV = "FOT_PROFILE_TOP"
+DEFAULT_TOP_COUNT = 25
+
+# the profiler of the iteration running, if any: a play interrupted mid-iteration (e.g. by an error
+# in the loop body) never stops it, see discard_running_profile
+_running = None
+
+def profiling_enabled(profile=False):
+    return profile or os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+def discard_running_profile():
+    """
+    Disables the profile of an iteration left running by an interrupted play, without saving it:
+    it would keep recording whatever runs next, and keep any other profile from starting.
+    """
+    if _running is not None:
+        logger.warning(f" - Discarding the profile of an unfinished iteration in {_running.profiles_dir}")
+        _running.discard()
+
+class PlayProfiler:
+    """
+    Profiles each loop iteration, from fot_PlayStart until fot_PlayContinue has expanded the next one.
+
+    Each iteration is dumped to output/<filename_base>_profiles/<batch filename>.prof
+    (for snakeviz, pstats, ...), and summary.txt keeps the top hot spots of all the
+    iterations so far, rewritten after each one.
+    """
+
+    def __init__(self, filename_base, top_count=None):
+        self.profiles_dir = os.path.join(folder_paths.get_output_directory(), filename_base + "_profiles")
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        self.summary_path = os.path.join(self.profiles_dir, "summary.txt")
+        self.top_count = top_count if top_count is not None else int(os.environ.get(PROFILE_TOP_ENV, DEFAULT_TOP_COUNT))
+        self.iterations = 0
+        self._stats = None
+        self._profile = None
+
+    @property
+    def running(self):
+        return self._profile is not None
+
+    def start(self):
+        global _running
+        if self._profile is not None:
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # another profiler is already active on this thread
+            logger.warning(f" - Cannot profile the play loop: {e}")
+            return
+        self._profile = profile
+        _running = self
+
+    def discard(self):
+        """
+        Stops profiling the current iteration, without saving it.
+        """
+        global _running
+        if self._profile is None:
+            return
+        self._profile.disable()
+        self._profile = None
+        if _running is self:
+            _running = None
+
+    def stop(self, name):
+        """
+        Stops profiling the current iteration, saving it as <name>.prof and updating the summary.
+        """
+        profile = self._profile
+        if profile is None:
+            return
+        self.discard()
+        self.iterations += 1
+
+        try:
+            profile.dump_stats(os.path.join(self.profiles_dir, os.path.basename(name) + ".prof"))
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.write_summary()
+        except (IOError, TypeError) as e:
+            logger.error(f" - Error saving profile '{name}': {e}")
+
+    def write_summary(self):
+        stream = io.StringIO()
+        stream.write(f"{self.iterations} iteration(s)\n")
+        self._stats.stream = stream
+        self._stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top_count)
+        self._stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_count)
+
+        temp_path = self.summary_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.write(stream.getvalue())
+        os.replace(temp_path, self.summary_path)
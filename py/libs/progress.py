@@ -0,0 +1,154 @@
+"""
+Live progress of the running plays, pushed to the clients of the progress route
+(server-sent events) as batches start and finish.
+
+The loop runs on the ComfyUI prompt worker thread, the route on the server event
+loop: events are handed over with call_soon_threadsafe, so publishing never waits
+on the clients.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+SUBSCRIBER_QUEUE_SIZE = 64
+THROUGHPUT_WINDOW = 8
+
+class ProgressBroker:
+
+    def __init__(self):
+        self._loop = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        # node -> last event of each running play, replayed to new subscribers
+        self._last_events = {}
+
+    def subscribe(self):
+        """
+        Registers a subscriber; call from the event loop.
+
+        Returns:
+            asyncio.Queue: The events, starting with the last one of each play.
+        """
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.add(queue)
+            for event in self._last_events.values():
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # more running plays than the queue holds, the next events will tell about the others
+                    break
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers.discard(queue)
+
+    def publish(self, event):
+        """
+        Publishes an event to all the subscribers; callable from any thread.
+        """
+        with self._lock:
+            if event["type"] == "finished":
+                # nothing to replay once the play ended
+                self._last_events.pop(event["node"], None)
+            else:
+                self._last_events[event["node"]] = event
+            loop = self._loop
+            if loop is None or not self._subscribers:
+                return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, event)
+        except RuntimeError:
+            # event loop closed
+            pass
+
+    def _dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for queue in subscribers:
+            try:
+                if queue.full():
+                    # a slow client loses its oldest events, never blocks the others
+                    queue.get_nowait()
+                queue.put_nowait(event)
+            except (asyncio.QueueFull, asyncio.QueueEmpty):
+                # dropped for this client only
+                logger.debug("progress: event dropped for a subscriber")
+
+progress_broker = ProgressBroker()
+
+class PlayProgress:
+    """
+    Tracks the frames done by a play loop, with a throughput over the last batches, and an ETA.
+    """
+
+    def __init__(self, node, sequence_batches, broker=progress_broker, cost_model=None):
+        self.node = node
+        self.broker = broker
+        self.title = sequence_batches.play["title"]
+        self.batches_count = len(sequence_batches)
+        self.frames_count = sum(batch["output_frames_count"] for batch in sequence_batches)
+        self.batches_done = 0
+        self.frames_done = 0
+        # (time, frames done) of the last batch finishes
+        self._points = deque([(time.monotonic(), 0)], maxlen=THROUGHPUT_WINDOW + 1)
+        # predicted by the cost model when planning, for an ETA before the first batches are done
+        self._predicted_secs = {}
+        if cost_model is not None:
+            self._predicted_secs = {id(batch): cost_model.predict(batch) for batch in sequence_batches}
+        self.predicted_remaining_secs = sum(self._predicted_secs.values()) if self._predicted_secs else None
+
+    def throughput(self):
+        (time_first, frames_first), (time_last, frames_last) = self._points[0], self._points[-1]
+        if time_last <= time_first:
+            return None
+        return (frames_last - frames_first) / (time_last - time_first)
+
+    def _publish(self, event_type, batch=None):
+        throughput = self.throughput()
+        frames_remaining = self.frames_count - self.frames_done
+        eta_secs = frames_remaining / throughput if throughput else self.predicted_remaining_secs
+        event = {
+            "node": str(self.node),
+            "type": event_type,
+            "title": self.title,
+            "batches_done": self.batches_done,
+            "batches_count": self.batches_count,
+            "frames_done": self.frames_done,
+            "frames_count": self.frames_count,
+            "fps": throughput,
+            "eta_secs": eta_secs,
+            "predicted_remaining_secs": self.predicted_remaining_secs,
+            "time": time.time(),
+        }
+        if batch is not None:
+            event.update({
+                "index_play": batch["index_play"],
+                "variant": batch.get("variant"),
+                "act": batch["act"]["title"],
+                "scene": batch["scene"]["title"],
+                "beat": batch["beat"]["title"],
+            })
+        self.broker.publish(event)
+
+    def batch_started(self, batch):
+        self._publish("batch_started", batch)
+
+    def batch_finished(self, batch):
+        if batch is None:
+            return
+        self.batches_done += 1
+        self.frames_done += batch["output_frames_count"]
+        if self.predicted_remaining_secs is not None:
+            self.predicted_remaining_secs = max(0.0, self.predicted_remaining_secs - self._predicted_secs.get(id(batch), 0.0))
+        self._points.append((time.monotonic(), self.frames_done))
+        self._publish("batch_finished", batch)
+
+    def finished(self):
+        self._publish("finished")
@@ -0,0 +1,176 @@
+import json
+import os
+import time
+import uuid
+import folder_paths
+
+from ..core.cost_model import batch_features
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+def get_rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def get_peak_rss_bytes():
+    try:
+        import resource
+        # kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return None
+
+def get_written_bytes():
+    # bytes passed to write() calls by the process
+    try:
+        with open("/proc/self/io", 'r') as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+def reset_device_peak():
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+    except Exception:
+        pass
+
+def get_device_peak_bytes():
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return torch.cuda.max_memory_allocated()
+    except Exception:
+        pass
+    return None
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class PlayTelemetry:
+    """
+    Per-batch records of a play loop, appended to a JSONL file, and aggregated
+    in a Prometheus text file rewritten after each batch.
+
+    The JSONL file keeps the records of the earlier runs of the play (e.g. to fit a
+    cost model from), each record has the id of its run.
+    """
+
+    def __init__(self, filename_base, batches_count):
+        output_dir = folder_paths.get_output_directory()
+        os.makedirs(output_dir, exist_ok=True)
+        self.filename_base = filename_base
+        self.run_id = uuid.uuid4().hex
+        self.jsonl_path = os.path.join(output_dir, filename_base + "_telemetry.jsonl")
+        self.metrics_path = os.path.join(output_dir, filename_base + "_metrics.prom")
+        self.batches_count = batches_count
+        self.batches_done = 0
+        self.frames_done = 0
+        self.wall_secs_total = 0.0
+        self.expansion_secs_total = 0.0
+        self.bytes_written_total = 0
+        self.last_record = None
+
+    def batch_started(self, batch):
+        batch["started_at"] = time.perf_counter()
+        batch["written_bytes_at_start"] = get_written_bytes()
+        reset_device_peak()
+
+    def batch_finished(self, batch):
+        if batch is None or batch.get("started_at") is None:
+            return None
+        written_bytes = get_written_bytes()
+        bytes_written = None
+        if written_bytes is not None and batch.get("written_bytes_at_start") is not None:
+            bytes_written = written_bytes - batch["written_bytes_at_start"]
+
+        record = {
+            "run": self.run_id,
+            "time": time.time(),
+            "play": batch["play"]["title"],
+            "variant": batch.get("variant"),
+            "index_play": batch["index_play"],
+            "position": self.batches_done + 1,
+            "batches_count": self.batches_count,
+            "act": batch["act"]["title"],
+            "scene": batch["scene"]["title"],
+            "beat": batch["beat"]["title"],
+            "index": batch["index"],
+            "frames_count": batch["frames_count"],
+            "output_frames_count": batch["output_frames_count"],
+            "pass": batch["pass"],
+            "width": batch["width"],
+            "height": batch["height"],
+            "steps": batch.get("steps"),
+            "steps_factor": batch.get("steps_factor", 1.0),
+            "transition_in": batch["transition_in"],
+            "continues": len(batch["depends_on"]) > 0,
+            "wall_secs": time.perf_counter() - batch["started_at"],
+            "expansion_secs": batch.get("expansion_secs", 0.0),
+            "nodes_count": batch.get("nodes_count"),
+            "rss_bytes": get_rss_bytes(),
+            "peak_rss_bytes": get_peak_rss_bytes(),
+            "device_peak_bytes": get_device_peak_bytes(),
+            "bytes_written": bytes_written,
+            "features": batch_features(batch),
+        }
+        batch["started_at"] = None
+
+        self.batches_done += 1
+        self.frames_done += batch["output_frames_count"]
+        self.wall_secs_total += record["wall_secs"]
+        self.expansion_secs_total += record["expansion_secs"]
+        self.bytes_written_total += bytes_written or 0
+        self.last_record = record
+
+        try:
+            with open(self.jsonl_path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+            self.write_metrics()
+        except IOError as e:
+            logger.error(f" - Error saving telemetry: {e}")
+
+        logger.info(f"batch {record['position']}/{self.batches_count} ({batch['filename']}): {record['wall_secs']:.1f}s")
+        return record
+
+    def write_metrics(self):
+        labels = f'play="{escape_label(self.filename_base)}"'
+        record = self.last_record or {}
+        metrics = [
+            ("fot_plan_batches", "gauge", "Batches in the play plan.", self.batches_count),
+            ("fot_batches_done_total", "counter", "Batches completed.", self.batches_done),
+            ("fot_frames_done_total", "counter", "Output frames completed.", self.frames_done),
+            ("fot_batch_wall_seconds_total", "counter", "Wall time spent in batches, from Play (Start) to Play (Continue).", self.wall_secs_total),
+            ("fot_expansion_seconds_total", "counter", "Time spent expanding the loop body.", self.expansion_secs_total),
+            ("fot_bytes_written_total", "counter", "Bytes written by the process during batches.", self.bytes_written_total),
+            ("fot_last_batch_wall_seconds", "gauge", "Wall time of the last batch.", record.get("wall_secs")),
+            ("fot_last_batch_nodes", "gauge", "Nodes executed by the last batch.", record.get("nodes_count")),
+            ("fot_rss_bytes", "gauge", "Resident memory after the last batch.", record.get("rss_bytes")),
+            ("fot_peak_rss_bytes", "gauge", "Peak resident memory of the process.", record.get("peak_rss_bytes")),
+            ("fot_device_peak_bytes", "gauge", "Peak device memory allocated during the last batch.", record.get("device_peak_bytes")),
+        ]
+        lines = []
+        for name, kind, help, value in metrics:
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{{{labels}}} {value}")
+
+        temp_path = self.metrics_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self.metrics_path)
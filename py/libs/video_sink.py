@@ -0,0 +1,156 @@
+import numpy as np
+import os
+import queue
+import threading
+import folder_paths
+
+from .play_hooks import register_play_finalizer
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+DEFAULT_FOURCC = "mp4v"
+DEFAULT_QUEUE_SIZE = 4
+
+_STOP = object()
+
+class VideoSink:
+    """
+    Appends frames to a single video container from a background encoder thread.
+
+    Chunks are accepted in any order and written in play frame order; the queue
+    between the caller and the encoder is bounded, and so are the chunks held back
+    waiting for an earlier one, so memory use does not grow with the length of the play.
+    """
+
+    def __init__(self, video_path, width, height, fps, first_frame=1, fourcc=DEFAULT_FOURCC, queue_size=DEFAULT_QUEUE_SIZE):
+        self.video_path = video_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.next_frame = first_frame
+        self.frames_written = 0
+
+        self._pending = {}
+        self._error = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        import cv2
+        self._writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*fourcc), float(fps), (width, height))
+        if not self._writer.isOpened():
+            raise IOError(f"Could not open video writer: {video_path} ({fourcc})")
+
+        self._thread = threading.Thread(target=self._encode, name="fot_VideoSink", daemon=True)
+        self._thread.start()
+
+    def append(self, frames_first, frames):
+        """
+        Queues a chunk of frames.
+
+        Args:
+            frames_first (int): Play frame index of the first frame of the chunk.
+            frames (np.ndarray): uint8 RGB frames in (N, H, W, 3) format.
+        """
+        if self._error is not None:
+            raise IOError(f"Video sink failed: {self._error}")
+
+        with self._lock:
+            if frames_first != self.next_frame and len(self._pending) >= self._queue.maxsize:
+                raise IOError(f"Video sink is still waiting for frame {self.next_frame}, {len(self._pending)} chunk(s) from frame {min(self._pending)} are held back: append the chunks in play frame order")
+            self._pending[frames_first] = frames
+            ready = []
+            while self.next_frame in self._pending:
+                chunk = self._pending.pop(self.next_frame)
+                ready.append(chunk)
+                self.next_frame += len(chunk)
+
+        for chunk in ready:
+            # blocks when the encoder is behind
+            self._queue.put(chunk)
+
+    def close(self):
+        """
+        Flushes the remaining chunks and finalizes the container.
+        """
+        with self._lock:
+            pending = [self._pending[k] for k in sorted(self._pending)]
+            if pending:
+                logger.warning(f" - Video sink is missing frames from {self.next_frame}, appending {len(pending)} chunk(s) as is")
+            self._pending = {}
+        for chunk in pending:
+            self._queue.put(chunk)
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._writer.release()
+        logger.info(f"Video saved: {self.video_path} ({self.frames_written} frames)")
+        if self._error is not None:
+            raise IOError(f"Video sink failed: {self._error}")
+
+    def _encode(self):
+        import cv2
+        while True:
+            chunk = self._queue.get()
+            if chunk is _STOP:
+                return
+            if self._error is not None:
+                # keep draining so producers never block on a dead encoder
+                continue
+            try:
+                for frame in chunk:
+                    if frame.shape[0] != self.height or frame.shape[1] != self.width:
+                        frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+                    self._writer.write(np.ascontiguousarray(frame[..., ::-1]))
+                    self.frames_written += 1
+            except Exception as e:
+                logger.error(f" - Error encoding video frames: {e}")
+                self._error = e
+
+def images_to_frames(images):
+    """
+    Converts a ComfyUI IMAGE tensor (B, H, W, C) into uint8 RGB frames.
+    """
+    frames = (images[..., :3].clamp(0, 1) * 255).round().byte().cpu().numpy()
+    return frames
+
+def check_batch_frames(batch, images):
+    """
+    Raises when the images of a batch are not its output frames, e.g. keyframes that were not interpolated.
+    """
+    if len(images) != batch["output_frames_count"]:
+        hint = " (interpolate its keyframes with Frame Interpolate)" if len(images) == batch["frames_count"] and batch["interpolation_factor"] > 1 else ""
+        raise ValueError(f"Batch {batch['filename']} has {batch['output_frames_count']} output frame(s), got {len(images)} image(s){hint}")
+
+def resize_images(images, width, height):
+    """
+    Resizes a ComfyUI IMAGE tensor (B, H, W, C), e.g. a batch rendered at a lower resolution to fit the deadline.
+    """
+    if images.shape[1] == height and images.shape[2] == width:
+        return images
+    import torch.nn.functional as F
+    return F.interpolate(images.movedim(-1, 1), size=(height, width), mode="bilinear", align_corners=False).movedim(1, -1)
+
+def get_play_video_sink(play, filename_suffix="", fourcc=DEFAULT_FOURCC, queue_size=DEFAULT_QUEUE_SIZE, width=None, height=None, first_frame=None):
+    """
+    Returns the video sink of a play, opening it on first use: by default at the play
+    resolution, from its first frame (a preview pass has its own size and frame numbering).
+
+    The sink is finalized when the play loop ends.
+    """
+    sinks = play.get("video_sinks")
+    if sinks is None:
+        sinks = {}
+        play["video_sinks"] = sinks
+
+    sink = sinks.get(filename_suffix)
+    if sink is None:
+        output_dir = folder_paths.get_output_directory()
+        os.makedirs(output_dir, exist_ok=True)
+        video_path = os.path.join(output_dir, play["filename_base"] + filename_suffix + ".mp4")
+        width = width or play["width"]
+        height = height or play["height"]
+        first_frame = first_frame or play.get("frames_first", 1)
+        sink = VideoSink(video_path, width, height, play["fps"], first_frame=first_frame, fourcc=fourcc, queue_size=queue_size)
+        sinks[filename_suffix] = sink
+        register_play_finalizer(play, "video_sink" + filename_suffix, lambda play: sink.close())
+
+    return sink
@@ -0,0 +1,230 @@
+"""
+Per-workspace SQLite index of the backdrops saved under scene_backdrops/.
+
+Rebuild the manifest of existing workspaces (standard library only):
+
+    python py/libs/workspace_manifest.py rebuild <ComfyUI output>/workspaces/<codename> [...]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+MANIFEST_FILENAME = "manifest.sqlite"
+
+BACKDROP_FIELDS = ["name", "positive", "negative", "seed", "image_path", "image_sha256", "image_thumbnail_path", "image_latent_path", "image_latent_sha256", "image_depthmap_path", "image_depthmap_sha256"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backdrops (
+    name TEXT PRIMARY KEY,
+    positive TEXT,
+    negative TEXT,
+    seed INTEGER,
+    image_path TEXT,
+    image_sha256 TEXT,
+    image_thumbnail_path TEXT,
+    image_latent_path TEXT,
+    image_latent_sha256 TEXT,
+    image_depthmap_path TEXT,
+    image_depthmap_sha256 TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS backdrops_seed ON backdrops (seed);
+CREATE TABLE IF NOT EXISTS manifest_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# columns added after the first manifests were created
+MIGRATED_COLUMNS = ["image_sha256", "image_latent_sha256", "image_depthmap_sha256"]
+
+# manifests whose schema was created and migrated by this process, by path
+_initialized_paths = set()
+_initialized_lock = threading.Lock()
+
+class WorkspaceManifest:
+    """
+    Resolves backdrop names, prompts, seeds and artifact paths of a workspace with indexed queries,
+    instead of walking the backdrop folders and parsing each backdrop.json.
+    """
+
+    def __init__(self, workspace_dir):
+        self.workspace_dir = workspace_dir
+        self.manifest_path = os.path.join(workspace_dir, MANIFEST_FILENAME)
+        self.backdrops_dir = os.path.join(workspace_dir, "scene_backdrops")
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def _connect(self):
+        os.makedirs(self.workspace_dir, exist_ok=True)
+        path = os.path.abspath(self.manifest_path)
+        created = not self.exists()
+        connection = sqlite3.connect(self.manifest_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        with _initialized_lock:
+            # once per process, unless the manifest was removed meanwhile
+            if created or path not in _initialized_paths:
+                self._initialize(connection)
+                _initialized_paths.add(path)
+        if created:
+            # the listing goes by the manifest once it exists: it must start with the backdrops saved before it
+            backdrops_mtime_ns = self._backdrops_mtime_ns()
+            with connection:
+                count = self._index(connection, self._scan_backdrops())
+                self._set_backdrops_mtime_ns(connection, backdrops_mtime_ns)
+            logger.info(f"Workspace manifest created: {self.manifest_path}, {count} existing backdrop(s) indexed")
+        return connection
+
+    def _initialize(self, connection):
+        connection.executescript(SCHEMA)
+        columns = [row["name"] for row in connection.execute("PRAGMA table_info(backdrops)")]
+        for column in MIGRATED_COLUMNS:
+            if column not in columns:
+                connection.execute(f"ALTER TABLE backdrops ADD COLUMN {column} TEXT")
+
+    def _backdrops_mtime_ns(self):
+        try:
+            return os.stat(self.backdrops_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _set_backdrops_mtime_ns(self, connection, mtime_ns):
+        connection.execute("INSERT OR REPLACE INTO manifest_state (key, value) VALUES ('backdrops_mtime_ns', ?)", (str(mtime_ns),))
+
+    def _sync(self, connection):
+        """
+        Indexes the backdrop folders added on disk since the last listing (e.g. copied from
+        another workspace), and forgets the removed ones; only if the backdrops folder changed.
+        """
+        backdrops_mtime_ns = self._backdrops_mtime_ns()
+        row = connection.execute("SELECT value FROM manifest_state WHERE key = 'backdrops_mtime_ns'").fetchone()
+        if row is not None and row["value"] == str(backdrops_mtime_ns):
+            return
+        names = set(self._list_backdrop_folders())
+        indexed = {row["name"] for row in connection.execute("SELECT name FROM backdrops")}
+        with connection:
+            for backdrop in self._scan_backdrops(names - indexed):
+                self._upsert(connection, backdrop)
+            for name in indexed - names:
+                connection.execute("DELETE FROM backdrops WHERE name = ?", (name,))
+            self._set_backdrops_mtime_ns(connection, backdrops_mtime_ns)
+        if names != indexed:
+            logger.info(f"Workspace manifest: {len(names - indexed)} backdrop folder(s) indexed, {len(indexed - names)} removed")
+
+    def _upsert(self, connection, backdrop):
+        values = [backdrop.get(field) for field in BACKDROP_FIELDS]
+        connection.execute(
+            f"INSERT INTO backdrops ({', '.join(BACKDROP_FIELDS)}, updated_at) VALUES ({', '.join('?' * len(BACKDROP_FIELDS))}, ?) "
+            f"ON CONFLICT(name) DO UPDATE SET {', '.join(f'{field} = excluded.{field}' for field in BACKDROP_FIELDS[1:])}, updated_at = excluded.updated_at",
+            values + [time.time()])
+
+    def upsert_backdrop(self, backdrop):
+        connection = self._connect()
+        try:
+            with connection:
+                self._upsert(connection, backdrop)
+        finally:
+            connection.close()
+
+    def get_backdrop(self, name):
+        connection = self._connect()
+        try:
+            row = connection.execute(f"SELECT {', '.join(BACKDROP_FIELDS)} FROM backdrops WHERE name = ?", (name,)).fetchone()
+        finally:
+            connection.close()
+        return None if row is None else dict(row)
+
+    def list_backdrop_names(self):
+        connection = self._connect()
+        try:
+            self._sync(connection)
+            return [row["name"] for row in connection.execute("SELECT name FROM backdrops ORDER BY name")]
+        finally:
+            connection.close()
+
+    def search_backdrops(self, text):
+        """
+        Returns the backdrops whose name or prompts contain the text.
+        """
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        connection = self._connect()
+        try:
+            self._sync(connection)
+            rows = connection.execute(
+                f"SELECT {', '.join(BACKDROP_FIELDS)} FROM backdrops "
+                "WHERE name LIKE ? ESCAPE '\\' OR positive LIKE ? ESCAPE '\\' OR negative LIKE ? ESCAPE '\\' ORDER BY name",
+                (pattern, pattern, pattern)).fetchall()
+        finally:
+            connection.close()
+        return [dict(row) for row in rows]
+
+    def _list_backdrop_folders(self):
+        if not os.path.isdir(self.backdrops_dir):
+            return []
+        with os.scandir(self.backdrops_dir) as entries:
+            return [entry.name for entry in entries if entry.is_dir() and not entry.name.startswith('.')]
+
+    def _scan_backdrops(self, names=None):
+        """
+        Reads the backdrop.json of the backdrop folders, of all of them by default.
+        """
+        backdrops = []
+        for name in sorted(self._list_backdrop_folders() if names is None else names):
+            backdrop_json_filename = os.path.join(self.backdrops_dir, name, "backdrop.json")
+            try:
+                with open(backdrop_json_filename, 'r') as f:
+                    backdrop = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.warning(f" - Skipping backdrop '{name}': {e}")
+                continue
+            # the folder name is what the nodes select backdrops by
+            backdrop["name"] = name
+            backdrops.append(backdrop)
+        return backdrops
+
+    def _index(self, connection, backdrops):
+        connection.execute("DELETE FROM backdrops")
+        for backdrop in backdrops:
+            self._upsert(connection, backdrop)
+        return len(backdrops)
+
+    def rebuild(self):
+        """
+        Re-indexes all the backdrop folders of the workspace, in one transaction.
+
+        Returns:
+            int: Number of backdrops indexed.
+        """
+        backdrops_mtime_ns = self._backdrops_mtime_ns()
+        backdrops = self._scan_backdrops()
+        connection = self._connect()
+        try:
+            with connection:
+                self._set_backdrops_mtime_ns(connection, backdrops_mtime_ns)
+                return self._index(connection, backdrops)
+        finally:
+            connection.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the backdrop manifest of play traversal workspaces.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="re-index the backdrop folders of workspaces")
+    rebuild_parser.add_argument("workspace_dirs", nargs="+", help="workspace directories (output/workspaces/<codename>)")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        for workspace_dir in args.workspace_dirs:
+            count = WorkspaceManifest(workspace_dir).rebuild()
+            print(f"{workspace_dir}: {count} backdrop(s) indexed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
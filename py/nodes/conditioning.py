@@ -0,0 +1,56 @@
+from .nodes import CATEGORY
+from ..libs.conditioning_cache import ConditioningCache
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+# #############################################################################
+class fot_BatchConditioning:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "clip": ("CLIP",),
+                "batch": ("BATCH",),
+            },
+            "optional": {
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ("CONDITIONING", "CONDITIONING", "STRING", "STRING",)
+    RETURN_NAMES = ("positive", "negative", "prompt_positive", "prompt_negative",)
+    FUNCTION = "encode"
+
+    CATEGORY = CATEGORY
+
+    def encode(self, clip, batch, **kwargs):
+        play = batch["play"]
+        beat = batch["beat"]
+
+        conditioning_cache = play.get("conditioning_cache")
+        if conditioning_cache is None:
+            conditioning_cache = ConditioningCache()
+            play["conditioning_cache"] = conditioning_cache
+
+        prompt_positive = beat["prompt_positive"]
+        prompt_negative = beat["prompt_negative"]
+        return (
+            conditioning_cache.encode(clip, prompt_positive),
+            conditioning_cache.encode(clip, prompt_negative),
+            prompt_positive,
+            prompt_negative,
+        )
+
+# #############################################################################
+NODE_CLASS_MAPPINGS = {
+    "fot_BatchConditioning": fot_BatchConditioning,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "fot_BatchConditioning": "Batch Conditioning",
+}
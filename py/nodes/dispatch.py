@@ -0,0 +1,75 @@
+import copy
+import json
+import os
+import folder_paths
+
+from .nodes import CATEGORY
+from ..core.cost_model import COST_MODEL_FILENAME, CostModel
+from ..core.planner import partition_segments, plan_play
+from ..core.play_definition import PLAY_DEFAULTS
+from ..libs.dispatcher import DEFAULT_RETRIES, DEFAULT_POLL_INTERVAL, DEFAULT_SEGMENT_TIMEOUT, ComfyWorker, dispatch_segments
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+# #############################################################################
+class fot_PlayDispatch:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "workflow_path": ("STRING", {"default": "workflows/play_api.json", "tooltip": "API-format workflow rendering the play, absolute or relative to the output directory."}),
+                "workers": ("STRING", {"default": "http://127.0.0.1:8189", "multiline": True, "tooltip": "ComfyUI worker URLs, one per line."}),
+            },
+            "optional": {
+                "play_definition": ("PLAY_DEFINITION", {"tooltip": "The play to dispatch, e.g. from Play From File: planned here, without any model."}),
+                "sequence_batches": ("BATCH", {"tooltip": "Or the plan of a Play (Start)."}),
+                "retries": ("INT", {"default": DEFAULT_RETRIES, "min": 0, "max": 100, "step": 1}),
+                "poll_interval": ("FLOAT", {"default": DEFAULT_POLL_INTERVAL, "min": 0.1, "max": 600, "step": 0.1}),
+                "segment_timeout": ("FLOAT", {"default": DEFAULT_SEGMENT_TIMEOUT, "min": 0, "max": 1e7, "step": 60, "tooltip": "Seconds after which a segment still not done counts as failed, and is retried (0: no limit)."}),
+                "workspace": ("WORKSPACE", {"tooltip": "Orders the segments by the render time predicted by the workspace cost model (see Play (Start)), instead of by keyframes."}),
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("results",)
+    FUNCTION = "dispatch"
+    OUTPUT_NODE = True
+
+    CATEGORY = CATEGORY
+
+    def dispatch(self, workflow_path, workers, play_definition=None, sequence_batches=None, retries=DEFAULT_RETRIES, poll_interval=DEFAULT_POLL_INTERVAL, segment_timeout=DEFAULT_SEGMENT_TIMEOUT, workspace=None, **kwargs):
+        if not os.path.isabs(workflow_path):
+            workflow_path = os.path.join(folder_paths.get_output_directory(), workflow_path)
+        with open(workflow_path, 'r') as f:
+            workflow = json.load(f)
+
+        if play_definition is not None:
+            # the batches render on the workers, planning needs no model here
+            play_settings = {**PLAY_DEFAULTS, **play_definition["settings"]}
+            sequence_batches = plan_play(play_acts=copy.deepcopy(play_definition["acts"]), **play_settings)
+        elif sequence_batches is None:
+            raise ValueError("Play Dispatch needs a play_definition (e.g. from Play From File) or the sequence_batches of a Play (Start)")
+        segments = partition_segments(sequence_batches.plan)
+        worker_urls = [url.strip() for url in workers.splitlines() if url.strip() != ""]
+        logger.info(f"dispatch: {len(sequence_batches.plan)} batches in {len(segments)} segment(s) on {len(worker_urls)} worker(s)")
+
+        cost_model = None
+        if workspace is not None:
+            cost_model = CostModel.load(os.path.join(folder_paths.get_output_directory(), 'workspaces', workspace["codename"], COST_MODEL_FILENAME))
+        results = dispatch_segments(workflow, segments, [ComfyWorker(url) for url in worker_urls], retries=retries, poll_interval=poll_interval, cost_model=cost_model, segment_timeout=segment_timeout)
+        return (json.dumps(results, indent=2),)
+
+# #############################################################################
+NODE_CLASS_MAPPINGS = {
+    "fot_PlayDispatch": fot_PlayDispatch,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "fot_PlayDispatch": "Play Dispatch",
+}
@@ -1,32 +1,39 @@
-from typing import Iterator, List, Tuple, Dict, Any, Union, Optional
-from _decimal import Context, getcontext
 from nodes import NODE_CLASS_MAPPINGS as ALL_NODE_CLASS_MAPPINGS
-from datetime import datetime
 import json
-import math
 import copy
 import folder_paths
 import os
+import time
 from pathlib import Path
-from PIL import Image, ImageOps, ImageSequence
-import numpy as np
-import node_helpers
-import torch
-import comfy.samplers
 
 try: # flow
     from comfy_execution.graph_utils import GraphBuilder, is_link
 except:
     GraphBuilder = None
 
-from ..libs.image_io import loadImage, loadMask, loadJson, storeImage, storeMask, storeImageLatent, loadImageLatent
+from ..libs.image_io import loadImage, storeImage, storeImageLatent, loadImageLatent, storeThumbnail
+from ..libs.play_hooks import finish_play, register_play_finalizer
+from ..libs.frame_store import create_play_frame_store
+from ..libs.latent_pass import RENDER_MODES, setup_two_phase, store_preview_latent, get_preview_latent
+from ..libs.workspace_manifest import WorkspaceManifest
+from ..libs.asset_store import AssetStore, decode_cache
+from ..libs.conditioning_cache import DEFAULT_CACHE_SIZE, ConditioningCache
+from ..libs.telemetry import PlayTelemetry
+from ..libs.profiler import PlayProfiler, discard_running_profile, profiling_enabled
+from ..libs.progress import PlayProgress
+from ..libs.memory_governor import DEFAULT_THRESHOLD_MB, MemoryGovernor, get_threshold_mb
+from ..core.play_definition import TRANSITIONS, DEFAULT_TRANSITION_SECS, SCHEDULES, DEFAULT_PREVIEW_SCALE, DEFAULT_PREVIEW_FRAMES_COUNT, DEFAULT_STEPS, DEFAULT_PRIORITY
+from ..core.planner import remove_nones, plan_play
+from ..core.cost_model import COST_MODEL_FILENAME, CostModel
 
 import logging
 logger = logging.getLogger('comfyui_play_traversal_logger')
-logger.setLevel(logging.DEBUG)
+logger.setLevel(os.environ.get("FOT_LOG_LEVEL", "INFO").upper())
 handler = logging.StreamHandler()
+handler.setFormatter(logging.Formatter("[play_traversal] %(levelname)s %(message)s"))
 
 logger.addHandler(handler)
+logger.propagate = False
 
 CATEGORY = "Feller of Trees/Play Traversal"
 
@@ -89,120 +96,6 @@ def collect_contained(node_id, upstream, contained):
 
 # end code from comfyui-easy-use
 # #############################################################################
-
-def remove_nones(list, name):
-    # ignoring trailing Nones
-    while list and list[-1] is None:
-        list.pop()
-    # need at least one remaining
-    if len(list) == 0:
-        raise ValueError(f"At least one {name} is required")
-    # Check for gaps (no Nones in the middle)
-    if None in list:
-        raise ValueError(f"Found gap in {name}s, please defragment!")
-    return list
-
-def construct_sequence_batches(model, clip, vae, title, positive, negative, seed, filename_base, fps, width, height, frames_count_per_batch, play_acts, data=None):
-    play = {
-        "data": data,
-        "model": model,
-        "clip": clip,
-        "vae": vae,
-        "title": title,
-        "filename_base": filename_base,
-        "fps": fps,
-        "width": width,
-        "height": height,
-        "frames_count_per_batch": frames_count_per_batch,
-        "positive": positive,
-        "negative": negative,
-        "seed": seed,
-    }
-    
-    play_acts = remove_nones(play_acts, "act")
-
-    print(" == traversing tree for sequencing")
-
-    sequence_batches = []
-    duration_secs_play = 0
-    index_play = 0
-
-    for play_act in play_acts:
-        print(f"  - act: {play_act['title']}")
-        play_act["filename_base"] = filename_base + "_" + play_act["filename_part"]
-        scenes = play_act.get("scenes", [])
-        for scene in scenes:
-            print(f"    - scene: {scene['title']}")
-
-            scene["filename_base"] = play_act["filename_base"] + "_" + scene["filename_part"]
-
-            scene_beats_list = scene.get("scene_beats", [])
-            frames_count_scene = 0
-            for scene_beat in scene_beats_list:
-                print(f"      * beat: {scene_beat['title']}")
-                print(f"        length: {scene_beat['duration_secs']}")
-
-                scene_beat["filename_base"] = scene["filename_base"] + "_" + scene_beat["filename_part"]
-                duration_secs_play += scene_beat["duration_secs"]
-                print(f"        duration: {scene_beat['duration_secs']}")
-                scene_beat["frames_count"] = int(fps * scene_beat["duration_secs"])
-                print(f"        frames: {scene_beat['frames_count']}")
-                batch_count = math.floor(scene_beat["frames_count"] / frames_count_per_batch)
-                print(f"        batches: {batch_count}")
-                remaining_count = scene_beat["frames_count"]
-                last_frame = 0
-                for i in range(0, batch_count):
-                    sequence_batch = {
-                        "play": play,
-                        "act": play_act,
-                        "scene": scene,
-                        "beat": scene_beat,
-                        "index_play": index_play,
-                        "index": i,
-                        "filename": scene_beat["filename_base"] + "_" + str(i) + "_" + str(index_play),
-                        "frames_count": frames_count_per_batch,
-                    }
-                    index_play += 1
-                    sequence_batch["frames_first"] = last_frame + 1
-                    last_frame = sequence_batch["frames_first"] + frames_count_per_batch - 1
-                    sequence_batch["frames_last"] = last_frame
-
-                    sequence_batches.append(sequence_batch)
-                    print(f"          -> {sequence_batch['filename']}: {sequence_batch['frames_first']} , {sequence_batch['frames_last']}")
-
-                    remaining_count = remaining_count - frames_count_per_batch
-                if remaining_count > 0:
-                    i = batch_count
-                    sequence_batch = {
-                        "play": play,
-                        "act": play_act,
-                        "scene": scene,
-                        "beat": scene_beat,
-                        "index_play": index_play,
-                        "index": i,
-                        "filename": scene_beat["filename_base"] + "_" + str(i) + "_" + str(index_play),
-                        "frames_count": remaining_count,
-                    }
-                    index_play += 1
-                    sequence_batch["frames_first"] = last_frame + 1
-                    last_frame = sequence_batch["frames_first"] + remaining_count - 1
-                    sequence_batch["frames_last"] = last_frame
-                    sequence_batches.append(sequence_batch)
-                    print(f"          +> {sequence_batch}")
-
-                frames_count_scene += scene_beat["frames_count"]
-
-            scene["frames_count"] = frames_count_scene
-        # play_act[""] = 
-
-    frames_count_total = int(fps * duration_secs_play)
-
-    play["duration_secs"] = duration_secs_play
-    play["frames_count"] = frames_count_total
-
-    return sequence_batches
-
-# #############################################################################
 # this is a modified comfyui-easy-use:whileLoopStart
 class fot_PlayStart:
     def __init__(self):
@@ -228,6 +121,22 @@ class fot_PlayStart:
             },
             "optional": {
                 "data": (any_type,),
+                "frame_store": ("BOOLEAN", {"default": False, "tooltip": "Create a memory-mapped store of all the play frames, written by the Frame Store nodes."}),
+                "interpolation_factor": ("INT", {"default": 1, "min": 1, "max": 16, "step": 1, "tooltip": "Render one keyframe every N frames, the in-betweens are synthesized by Frame Interpolate. Can be set per beat."}),
+                "variant_seeds": ("STRING", {"default": "", "tooltip": "Comma-separated seeds: renders one variant of the play per seed, in the same loop."}),
+                "batch_range": ("STRING", {"default": "", "tooltip": "Only render these batches (index_play), e.g. '0-3,7'; set by Play Dispatch on its workers."}),
+                "conditioning_cache_size": ("INT", {"default": DEFAULT_CACHE_SIZE, "min": 1, "max": 1024, "step": 1, "tooltip": "Number of distinct prompts kept encoded by Batch Conditioning."}),
+                "schedule": (SCHEDULES, {"default": "sequential", "tooltip": "preview_first: renders one short, low resolution batch per beat first, for a quick look at the whole play, then the full batches."}),
+                "preview_scale": ("FLOAT", {"default": DEFAULT_PREVIEW_SCALE, "min": 0.05, "max": 1.0, "step": 0.05, "tooltip": "Resolution of the preview batches, relative to width and height."}),
+                "preview_frames_count": ("INT", {"default": DEFAULT_PREVIEW_FRAMES_COUNT, "min": 1, "max": 100000, "step": 1, "tooltip": "Keyframes of each preview batch, from the start of its beat."}),
+                "steps": ("INT", {"default": DEFAULT_STEPS, "min": 1, "max": 10000, "step": 1, "tooltip": "Sampler steps at full quality, given to each batch by Batch Data (steps)."}),
+                "deadline_secs": ("FLOAT", {"default": 0, "min": 0, "max": 1e9, "step": 60, "tooltip": "Time budget of the play (0: none). Lowers the steps, then the resolution, of the beats with the lowest priority until the predicted render time fits."}),
+                "render_mode": (RENDER_MODES, {"default": "single_pass", "tooltip": "two_phase: the loop body only samples and stores latents (Latent Store), they are decoded once the loop is over, with the diffusion model unloaded."}),
+                "telemetry": ("BOOLEAN", {"default": False, "tooltip": "Record the time, memory and bytes written of each batch in output/<filename_base>_telemetry.jsonl (appended to, tagged with the run) and _metrics.prom."}),
+                "profile": ("BOOLEAN", {"default": False, "tooltip": "Profile each loop iteration into output/<filename_base>_profiles/ (also enabled by FOT_PROFILE=1)."}),
+                "memory_threshold_mb": ("INT", {"default": DEFAULT_THRESHOLD_MB, "min": 0, "max": 1048576, "step": 64, "tooltip": "Collect garbage and release the device cache between batches once the memory grew by this much (0: after every batch). Overridden by FOT_MEMORY_THRESHOLD_MB."}),
+                "play_definition": ("PLAY_DEFINITION", {"tooltip": "A play read by Play From File: its acts replace act_*, and the play settings it gives override these."}),
+                "workspace": ("WORKSPACE", {"tooltip": "Keeps a cost model of the batches in the workspace (cost_model.json), learnt from the telemetry (when enabled), to predict the render time."}),
             },
             "hidden": {
                 "sequence_batches": (any_type,),
@@ -254,21 +163,88 @@ class fot_PlayStart:
 
     CATEGORY = CATEGORY
 
-    def play_start(self, model, clip, vae, title, positive, negative, seed, filename_base, fps, width, height, frames_count_per_batch, data=None, latent_previous=None, sequence_batches=None, play_current=None, act_current=None, scene_current=None, beat_current=None, batch_current=None, do_continue=True, flow=None, dynprompt=None, unique_id=None, **kwargs):
-        print("\n>> fot_PlayStart")
-        print(f"* do_continue ? {do_continue}")
-        # print(f"* data = {data}")
-        print(f"* sequence_batches ? {None if sequence_batches is None else len(sequence_batches)}")
+    def play_start(self, model, clip, vae, title, positive, negative, seed, filename_base, fps, width, height, frames_count_per_batch, data=None, frame_store=False, interpolation_factor=1, variant_seeds="", batch_range="", schedule="sequential", preview_scale=DEFAULT_PREVIEW_SCALE, preview_frames_count=DEFAULT_PREVIEW_FRAMES_COUNT, steps=DEFAULT_STEPS, deadline_secs=0, conditioning_cache_size=DEFAULT_CACHE_SIZE, render_mode="single_pass", telemetry=False, profile=False, memory_threshold_mb=DEFAULT_THRESHOLD_MB, play_definition=None, workspace=None, latent_previous=None, sequence_batches=None, play_current=None, act_current=None, scene_current=None, beat_current=None, batch_current=None, do_continue=True, flow=None, dynprompt=None, unique_id=None, **kwargs):
+        logger.debug(">> fot_PlayStart")
+        logger.debug(f"* do_continue ? {do_continue}")
+        # logger.debug(f"* data = {data}")
+        logger.debug(f"* sequence_batches ? {None if sequence_batches is None else len(sequence_batches)}")
 
         if batch_current is None:
             # we're just starting, make data into sequence
-            print(f"* will construct new play")
+            logger.debug(f"* will construct new play")
+            play_settings = {
+                "title": title,
+                "positive": positive,
+                "negative": negative,
+                "seed": seed,
+                "filename_base": filename_base,
+                "fps": fps,
+                "width": width,
+                "height": height,
+                "frames_count_per_batch": frames_count_per_batch,
+                "interpolation_factor": interpolation_factor,
+                "variant_seeds": variant_seeds,
+                "batch_range": batch_range,
+                "schedule": schedule,
+                "preview_scale": preview_scale,
+                "preview_frames_count": preview_frames_count,
+                "steps": steps,
+                "deadline_secs": deadline_secs,
+            }
             play_acts = [kwargs.get("act_%d" % i, None) for i in range(1, 3)]
-            sequence_batches = construct_sequence_batches(model, clip, vae, title, positive, negative, seed, filename_base, fps, width, height, frames_count_per_batch, play_acts, data=None)
-
-            print(f"created batches: '{len(sequence_batches)}")
+            if play_definition is not None:
+                # the file replaces the acts, and overrides the play settings it gives
+                logger.debug(f"* will play {play_definition['path']}")
+                play_settings.update(play_definition["settings"])
+                play_acts = copy.deepcopy(play_definition["acts"])
+            filename_base = play_settings["filename_base"]
+
+            profiler = None
+            # a play interrupted mid-iteration left its profile running
+            discard_running_profile()
+            if profiling_enabled(profile):
+                # the first iteration includes the planning
+                profiler = PlayProfiler(filename_base)
+                profiler.start()
+            cost_model = None
+            cost_model_path = None
+            try:
+                if workspace is not None:
+                    # loaded before planning, the deadline budget predicts with it
+                    workspace_dir = os.path.join(folder_paths.get_output_directory(), 'workspaces', workspace["codename"])
+                    os.makedirs(workspace_dir, exist_ok=True)
+                    cost_model_path = os.path.join(workspace_dir, COST_MODEL_FILENAME)
+                    cost_model = CostModel.load(cost_model_path)
+                sequence_batches = plan_play(play_acts=play_acts, model=model, clip=clip, vae=vae, cost_model=cost_model, **play_settings)
+            except Exception:
+                # no iteration to profile
+                if profiler is not None:
+                    profiler.discard()
+                raise
+
+            conditioning_cache = ConditioningCache(conditioning_cache_size)
+            for play in sequence_batches.plays:
+                play["conditioning_cache"] = conditioning_cache
+            if telemetry:
+                sequence_batches.telemetry = PlayTelemetry(filename_base, len(sequence_batches))
+            if cost_model is not None:
+                sequence_batches.cost_model_path = cost_model_path
+                sequence_batches.cost_model = cost_model
+                logger.info(f"predicted render time: {sequence_batches.predicted_secs / 60:.1f} min, from {cost_model.count} batch(es) of {workspace['codename']}")
+            sequence_batches.profiler = profiler
+            sequence_batches.progress = PlayProgress(unique_id, sequence_batches, cost_model=sequence_batches.cost_model)
+            sequence_batches.memory_governor = MemoryGovernor(get_threshold_mb(memory_threshold_mb))
+
+            for play in sequence_batches.plays:
+                register_play_finalizer(play, "conditioning_cache", lambda play: conditioning_cache.clear())
+                if render_mode == "two_phase":
+                    setup_two_phase(play)
+                if frame_store:
+                    create_play_frame_store(play)
+
+            logger.info(f"created batches: {len(sequence_batches)}")
             for batch in sequence_batches:
-                print(f" - [ {batch['frames_first']} , {batch['frames_last']} ]")
+                logger.debug(f" - [ {batch['frames_first']} , {batch['frames_last']} ]")
 
             batch_current = sequence_batches.pop(0)
             beat_current = batch_current["beat"]
@@ -276,24 +252,31 @@ class fot_PlayStart:
             act_current = batch_current["act"]
             play_current = batch_current["play"]
         else:
-            print(f"* will continue existing play")
+            logger.debug(f"* will continue existing play")
+            if sequence_batches.profiler is not None:
+                sequence_batches.profiler.start()
 
         batch_current["latent_previous"] = latent_previous
+        sequence_batches.batch_running = batch_current
+        if sequence_batches.telemetry is not None:
+            sequence_batches.telemetry.batch_started(batch_current)
+        if sequence_batches.progress is not None:
+            sequence_batches.progress.batch_started(batch_current)
 
         batch_index_play = batch_current["index_play"]
-        print(f"* batch_current = {batch_index_play}")
+        logger.debug(f"* batch_current = {batch_index_play}")
         beat_title = beat_current["title"]
-        print(f"* beat_current = {beat_title}")
+        logger.debug(f"* beat_current = {beat_title}")
         scene_title = scene_current["title"]
-        print(f"* scene_current = {scene_title}")
+        logger.debug(f"* scene_current = {scene_title}")
         act_title = act_current["title"]
-        print(f"* act_current = {act_title}")
+        logger.debug(f"* act_current = {act_title}")
         play_title = play_current["title"]
-        print(f"* play_current = {play_title}")
+        logger.debug(f"* play_current = {play_title}")
 
-        print(">> END play_start")
+        logger.debug(">> END play_start")
 
-        return tuple(["stub", sequence_batches, data, model, clip, vae, play_current, act_current, scene_current, beat_current, batch_current])
+        return tuple(["stub", sequence_batches, data, model, clip, vae, play_current, act_current, scene_current, beat_current, batch_current, latent_previous])
 
 # #############################################################################
 # this is a modified comfyui-easy-use:whileLoopEnd
@@ -330,20 +313,46 @@ class fot_PlayContinue:
     CATEGORY = CATEGORY
 
     def play_continue(self, flow, sequence_batches, latent_previous=None, data=None, dynprompt=None, unique_id=None,**kwargs):
-        print("\n|| fot_PlayContinue")
-        # print(f"  unique_id = {unique_id}")
-        # print(f"* data = {data}")
-        print(f"* sequence_batches ? {None if sequence_batches is None else len(sequence_batches)}")
+        logger.debug("|| fot_PlayContinue")
+        # logger.debug(f"  unique_id = {unique_id}")
+        # logger.debug(f"* data = {data}")
+        logger.debug(f"* sequence_batches ? {None if sequence_batches is None else len(sequence_batches)}")
 
         open_node = flow[0]
         graph = GraphBuilder()
         this_node = dynprompt.get_node(unique_id)
 
         do_continue = not sequence_batches is None and len(sequence_batches) > 0
-        print(f"* do_continue ? {do_continue}")
+        logger.debug(f"* do_continue ? {do_continue}")
+
+        batch_done = getattr(sequence_batches, "batch_running", None)
+        telemetry = getattr(sequence_batches, "telemetry", None)
+        if telemetry is not None:
+            record = telemetry.batch_finished(batch_done)
+            cost_model = getattr(sequence_batches, "cost_model", None)
+            if record is not None and cost_model is not None:
+                cost_model.observe(batch_done, record["wall_secs"])
+                try:
+                    cost_model.save(sequence_batches.cost_model_path)
+                except OSError as e:
+                    logger.error(f" - Error saving cost model: {e}")
+        progress = getattr(sequence_batches, "progress", None)
+        if progress is not None:
+            progress.batch_finished(batch_done)
+        profiler = getattr(sequence_batches, "profiler", None)
+        expansion_started_at = time.perf_counter()
 
         if not do_continue:
             # We're done with the loop
+            if profiler is not None and batch_done is not None:
+                profiler.stop(batch_done["filename"])
+                profiler.start()
+            for play in getattr(sequence_batches, "plays", []):
+                finish_play(play)
+            if profiler is not None:
+                profiler.stop(sequence_batches.play["filename_base"] + "_finish")
+            if progress is not None:
+                progress.finished()
             values = [data]
 
             return tuple(values)
@@ -354,7 +363,7 @@ class fot_PlayContinue:
         parent_ids = []
         explore_upstream(unique_id, dynprompt, upstream, parent_ids)
         parent_ids = list(set(parent_ids))
-        print(f"* parent_ids = {parent_ids}")
+        logger.debug(f"* parent_ids = {parent_ids}")
 
         # Get the list of all output nodes between the open and close nodes
         prompts = dynprompt.get_original_prompt()
@@ -391,28 +400,33 @@ class fot_PlayContinue:
                 else:
                     node.set_input(k, v)
 
+        if batch_done is not None:
+            batch_done["latent_output"] = latent_previous
+            if batch_done["pass"] == "preview" and latent_previous is not None:
+                store_preview_latent(batch_done, latent_previous)
+
         batch_current = sequence_batches.pop(0)
         batch_index_play = batch_current["index_play"]
-        print(f"* batch_current = {batch_index_play}")
-        print(f"      - filename = {batch_current['filename']}")
-        # if not latent_previous is None:
+        logger.debug(f"* batch_current = {batch_index_play}")
+        logger.debug(f"      - filename = {batch_current['filename']}")
+        latent_previous = sequence_batches.take_latent_previous(batch_current)
         batch_current["latent_previous"] = latent_previous
         
         beat_current = batch_current["beat"]
         beat_title = beat_current["title"]
-        print(f"* beat_current = {beat_title}")
+        logger.debug(f"* beat_current = {beat_title}")
 
         scene_current = batch_current["scene"]
         scene_title = scene_current["title"]
-        print(f"* scene_current = {scene_title}")
+        logger.debug(f"* scene_current = {scene_title}")
 
         act_current = batch_current["act"]
         act_title = act_current["title"]
-        print(f"* act_current = {act_title}")
+        logger.debug(f"* act_current = {act_title}")
 
         play_current = batch_current["play"]
         play_title = play_current["title"]
-        print(f"* play_current = {play_title}")
+        logger.debug(f"* play_current = {play_title}")
 
         new_open = graph.lookup_node(open_node)
 
@@ -426,7 +440,15 @@ class fot_PlayContinue:
         new_open.set_input("latent_previous", latent_previous)
         my_clone = graph.lookup_node("Recurse")
 
-        print("|| END fot_PlayContinue\n")
+        batch_current["expansion_secs"] = time.perf_counter() - expansion_started_at
+        batch_current["nodes_count"] = len(contained)
+        memory_governor = getattr(sequence_batches, "memory_governor", None)
+        if memory_governor is not None and batch_done is not None:
+            memory_governor.after_batch(batch_done)
+        if profiler is not None and batch_done is not None:
+            profiler.stop(batch_done["filename"])
+
+        logger.debug("|| END fot_PlayContinue")
         return {
             "result": tuple([my_clone.out(0)]),
             "expand": graph.finalize(),
@@ -544,7 +566,7 @@ class fot_PlayActData:
     CATEGORY = CATEGORY
 
     def expose_data(self, act=None, **kwargs):
-        print("act is None ?", act is None)
+        logger.debug(f"act is None ? {act is None}")
         if act is None:
             return (None,None,None,None,None,)
         else:
@@ -571,7 +593,9 @@ class fot_Scene:
                 "filename_part": ("STRING", {"default": "#1"}),
             },
             "optional": {
-                "scene_beat_%d" % i: ("SCENE_BEAT",) for i in range(1, 3)
+                **{"scene_beat_%d" % i: ("SCENE_BEAT",) for i in range(1, 3)},
+                "transition": (TRANSITIONS, {"default": "continuous", "tooltip": "How the scene follows the previous one; only continuous carries the previous latent over."}),
+                "transition_secs": ("FLOAT", {"default": DEFAULT_TRANSITION_SECS, "min": 0, "max": 100000, "step": 0.5}),
             },
             "hidden": {
                 "scene_beat_0": ("SCENE_BEAT",),
@@ -584,7 +608,7 @@ class fot_Scene:
 
     CATEGORY = CATEGORY
 
-    def construct_data(self, title, positive, negative, filename_part, scene_beat_0=None, **kwargs):
+    def construct_data(self, title, positive, negative, filename_part, scene_beat_0=None, transition="continuous", transition_secs=DEFAULT_TRANSITION_SECS, **kwargs):
         
         scene_beats = [kwargs.get("scene_beat_%d" % i, None) for i in range(1, MAX_FLOW_NUM)]
         scene_beats = remove_nones(scene_beats, "scene beat")
@@ -595,6 +619,8 @@ class fot_Scene:
             "negative": negative,
             "filename_part": filename_part,
             "scene_beats": scene_beats,
+            "transition": transition,
+            "transition_secs": transition_secs,
         }
         return (output,)
 
@@ -677,23 +703,32 @@ class fot_SceneBackdrop:
 
         Path(scene_backdrop_dir).mkdir(parents=True, exist_ok=True)
 
+        # artifacts are stored once by content, and linked in the backdrop folder
+        asset_store = AssetStore(workspaces_dir)
+
         image_path = None
+        image_sha256 = None
+        image_thumbnail_path = None
         if not image is None:
-            print("will encode and save image")
+            logger.debug("will encode and save image")
             image_path = os.path.join(scene_backdrop_dir, "backdrop.png")
-            storeImage(image, image_path)
+            image_sha256 = asset_store.store(lambda path: storeImage(image, path), image_path)
+            image_thumbnail_path = os.path.join(scene_backdrop_dir, "backdrop_thumbnail.jpg")
+            asset_store.store(lambda path: storeThumbnail(image_path, path), image_thumbnail_path)
 
         image_latent_path = None
+        image_latent_sha256 = None
         if not image_latent is None:
-            print("will encode and save image latent")
+            logger.debug("will encode and save image latent")
             image_latent_path = os.path.join(scene_backdrop_dir, "backdrop_latent.pt")
-            storeImageLatent(image_latent, image_latent_path)
+            image_latent_sha256 = asset_store.store(lambda path: storeImageLatent(image_latent, path), image_latent_path)
 
         image_depthmap_path = None
+        image_depthmap_sha256 = None
         if not image_depthmap is None:
-            print("will encode and save image")
+            logger.debug("will encode and save image")
             image_depthmap_path = os.path.join(scene_backdrop_dir, "backdrop_depthmap.png")
-            storeImage(image_depthmap, image_depthmap_path)
+            image_depthmap_sha256 = asset_store.store(lambda path: storeImage(image_depthmap, path), image_depthmap_path)
 
         # save backdrop json
         json_path = os.path.join(scene_backdrop_dir, "backdrop.json")
@@ -703,15 +738,21 @@ class fot_SceneBackdrop:
             "negative": negative,
             "seed": seed,
             "image_path": image_path,
+            "image_sha256": image_sha256,
+            "image_thumbnail_path": image_thumbnail_path,
             "image_latent_path": image_latent_path,
+            "image_latent_sha256": image_latent_sha256,
             "image_depthmap_path": image_depthmap_path,
+            "image_depthmap_sha256": image_depthmap_sha256,
         }
         
         try:
             with open(json_path, 'w') as f:
                 json.dump(backdrop, f, indent=2)
         except IOError as e:
-            print(f" - Error saving {json_path}: {e}")
+            logger.error(f" - Error saving {json_path}: {e}")
+
+        WorkspaceManifest(workspace_dir).upsert_backdrop(backdrop)
 
         # output = {
         #     "name": name,
@@ -762,26 +803,31 @@ class fot_SceneBackdropData:
             backdrop_json_filename = os.path.join(backdrop_dir, 'backdrop.json')
 
             scene_backdrop = None
-            if os.path.exists(backdrop_json_filename):
-                try:
-                    with open(backdrop_json_filename, 'r') as f:
-                        scene_backdrop = json.load(f)
-                except (json.JSONDecodeError, IOError) as e:
-                    print(f" - Error loading workspace.json: {e}, creating new one")
-            else:
-                raise FileNotFoundError(f"Could not find backdrop file: {backdrop_json_filename}")
+            manifest = WorkspaceManifest(workspace_dir)
+            if manifest.exists():
+                scene_backdrop = manifest.get_backdrop(backdrop_name)
+            if scene_backdrop is None:
+                if os.path.exists(backdrop_json_filename):
+                    try:
+                        with open(backdrop_json_filename, 'r') as f:
+                            scene_backdrop = json.load(f)
+                    except (json.JSONDecodeError, IOError) as e:
+                        logger.error(f" - Error loading workspace.json: {e}, creating new one")
+                else:
+                    raise FileNotFoundError(f"Could not find backdrop file: {backdrop_json_filename}")
 
+            # backdrops with identical content share their decoded artifacts
             image_path = scene_backdrop["image_path"]
             if not image_path is None:
-                image, image_mask = loadImage(image_path)
+                image, image_mask = decode_cache.load(scene_backdrop.get("image_sha256"), loadImage, image_path)
 
             image_latent_path = scene_backdrop["image_latent_path"]
             if not image_latent_path is None:
-                image_latent = loadImageLatent(image_latent_path)
+                image_latent = decode_cache.load(scene_backdrop.get("image_latent_sha256"), loadImageLatent, image_latent_path)
 
             image_depthmap_path = scene_backdrop["image_depthmap_path"]
             if not image_depthmap_path is None:
-                image_depthmap, image_depthmap_mask = loadImage(image_depthmap_path)
+                image_depthmap, image_depthmap_mask = decode_cache.load(scene_backdrop.get("image_depthmap_sha256"), loadImage, image_depthmap_path)
 
             return (
                 scene_backdrop["name"],
@@ -815,6 +861,10 @@ class fot_SceneBeat:
                 "negative": ("STRING",),
             },
             "optional": {
+                "interpolation_factor": ("INT", {"default": 0, "min": 0, "max": 16, "step": 1, "tooltip": "Render one keyframe every N frames; 0 uses the play's."}),
+                "transition": (TRANSITIONS, {"default": "continuous", "tooltip": "How the beat follows the previous one; on the first beat of a scene, continuous uses the scene's transition."}),
+                "transition_secs": ("FLOAT", {"default": 0, "min": 0, "max": 100000, "step": 0.5, "tooltip": "0 uses the scene's."}),
+                "priority": ("FLOAT", {"default": DEFAULT_PRIORITY, "min": 0, "max": 1000, "step": 0.5, "tooltip": "How much the beat matters when a deadline lowers the quality: the lowest priorities lose steps and resolution first."}),
             },
             "hidden": {}
         }
@@ -825,13 +875,17 @@ class fot_SceneBeat:
 
     CATEGORY = CATEGORY
 
-    def construct_data(self, title, filename_part, duration_secs, positive, negative, **kwargs):
+    def construct_data(self, title, filename_part, duration_secs, positive, negative, interpolation_factor=0, transition="continuous", transition_secs=0, priority=DEFAULT_PRIORITY, **kwargs):
         output = {
             "title": title,
             "filename_part": filename_part,
             "duration_secs": duration_secs,
             "positive": positive,
             "negative": negative,
+            "interpolation_factor": interpolation_factor,
+            "transition": transition,
+            "transition_secs": transition_secs,
+            "priority": priority,
         }
         return (output,)
 
@@ -853,8 +907,8 @@ class fot_SceneBeatData:
             }
         }
 
-    RETURN_TYPES = ("STRING", "INT", "STRING", "STRING",)
-    RETURN_NAMES = ("title", "duration_secs", "positive", "negative",)
+    RETURN_TYPES = ("STRING", "INT", "STRING", "STRING", "STRING", "STRING",)
+    RETURN_NAMES = ("title", "duration_secs", "positive", "negative", "prompt_positive", "prompt_negative",)
     FUNCTION = "expose_data"
 
     CATEGORY = CATEGORY
@@ -867,6 +921,7 @@ class fot_SceneBeatData:
                 None,
                 None,
                 None,
+                None,
             )
         else:
             return (
@@ -874,6 +929,8 @@ class fot_SceneBeatData:
                 scene_beat["duration_secs"],
                 scene_beat["positive"],
                 scene_beat["negative"],
+                scene_beat.get("prompt_positive", scene_beat["positive"]),
+                scene_beat.get("prompt_negative", scene_beat["negative"]),
             )
 
 # #############################################################################
@@ -894,16 +951,22 @@ class fot_BatchData:
             }
         }
 
-    RETURN_TYPES = ("INT", "INT", "INT", "INT", "LATENT", "STRING",)
-    RETURN_NAMES = ("index_play", "frames_count", "frames_first", "frames_last", "latent_previous", "filename")
+    RETURN_TYPES = ("INT", "INT", "INT", "INT", "LATENT", "STRING", "INT", "INT", "STRING", "FLOAT", "FLOAT", "FLOAT", "FLOAT", "FLOAT", "FLOAT", "FLOAT", "MASK", "STRING", "INT", "INT", "LATENT", "INT",)
+    RETURN_NAMES = ("index_play", "frames_count", "frames_first", "frames_last", "latent_previous", "filename", "interpolation_factor", "output_frames_count", "transition_in", "time_secs", "beat_progress", "scene_progress", "play_progress", "secs_to_beat_end", "secs_to_scene_end", "secs_to_play_end", "frame_weights", "pass", "width", "height", "latent_preview", "steps",)
     FUNCTION = "expose_data"
 
     CATEGORY = CATEGORY
 
     def expose_data(self, batch=None, **kwargs):
         if batch is None:
-            return (None, None, None, None)
+            return (None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None,)
         else:
+            import torch
+            derived = batch["derived"]
+            if derived["frame_weights"] is None:
+                frame_weights = torch.ones((batch["frames_count"], 1, 1))
+            else:
+                frame_weights = torch.tensor(derived["frame_weights"], dtype=torch.float32).view(-1, 1, 1)
             return (
                 batch["index_play"],
                 batch["frames_count"],
@@ -911,6 +974,22 @@ class fot_BatchData:
                 batch["frames_last"],
                 batch["latent_previous"],
                 batch["filename"],
+                batch["interpolation_factor"],
+                batch["output_frames_count"],
+                batch["transition_in"],
+                derived["time_secs"],
+                derived["beat_progress"],
+                derived["scene_progress"],
+                derived["play_progress"],
+                derived["secs_to_beat_end"],
+                derived["secs_to_scene_end"],
+                derived["secs_to_play_end"],
+                frame_weights,
+                batch["pass"],
+                batch["width"],
+                batch["height"],
+                get_preview_latent(batch),
+                batch["steps"],
             )
 
 # #############################################################################
@@ -0,0 +1,258 @@
+from .nodes import CATEGORY
+import numpy as np
+
+from ..libs.video_sink import get_play_video_sink, check_batch_frames, images_to_frames, resize_images, DEFAULT_FOURCC, DEFAULT_QUEUE_SIZE
+from ..libs.latent_pass import store_batch_latent
+from ..libs.frame_interpolation import INTERPOLATION_METHODS, interpolate_keyframes
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+# #############################################################################
+class fot_PlayVideoSink:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "batch": ("BATCH",),
+                "images": ("IMAGE",),
+            },
+            "optional": {
+                "filename_suffix": ("STRING", {"default": ""}),
+                "fourcc": ("STRING", {"default": DEFAULT_FOURCC}),
+                "queue_size": ("INT", {"default": DEFAULT_QUEUE_SIZE, "min": 1, "max": 1024, "step": 1, "tooltip": "Number of batches that may wait for the encoder, or for an earlier batch."}),
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ()
+    RETURN_NAMES = ()
+    FUNCTION = "append_frames"
+    OUTPUT_NODE = True
+
+    CATEGORY = CATEGORY
+
+    def append_frames(self, batch, images, filename_suffix="", fourcc=DEFAULT_FOURCC, queue_size=DEFAULT_QUEUE_SIZE, **kwargs):
+        play = batch["play"]
+        # a preview batch has the output frames count of its preview
+        check_batch_frames(batch, images)
+        if batch["pass"] == "preview":
+            # the previews of all the beats, one after the other, in their own video
+            sink = get_play_video_sink(play, filename_suffix=filename_suffix + "_preview", fourcc=fourcc, queue_size=queue_size, width=batch["width"], height=batch["height"], first_frame=1)
+            logger.debug(f"video sink: {batch['filename']} -> {len(images)} preview frame(s) at {batch['preview_frames_first']}")
+            sink.append(batch["preview_frames_first"], images_to_frames(images))
+            return ()
+        sink = get_play_video_sink(play, filename_suffix=filename_suffix, fourcc=fourcc, queue_size=queue_size)
+        logger.debug(f"video sink: {batch['filename']} -> {len(images)} frame(s) at {batch['play_frames_first']}")
+        sink.append(batch["play_frames_first"], images_to_frames(images))
+        return ()
+
+# #############################################################################
+class fot_FrameStoreWrite:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "batch": ("BATCH",),
+                "images": ("IMAGE",),
+            },
+            "optional": {
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ()
+    RETURN_NAMES = ()
+    FUNCTION = "write_frames"
+    OUTPUT_NODE = True
+
+    CATEGORY = CATEGORY
+
+    def write_frames(self, batch, images, **kwargs):
+        store = batch["play"].get("frame_store")
+        if store is None:
+            raise ValueError("The play has no frame store, enable frame_store on Play (Start)")
+        if batch["pass"] == "preview":
+            logger.debug(f"frame store: skipping preview batch {batch['filename']}")
+            return ()
+        if batch["scale"] < 1.0:
+            images = resize_images(images, store.frames.shape[2], store.frames.shape[1])
+        frames = images_to_frames(images)
+        if frames.shape[1:3] != store.frames.shape[1:3]:
+            raise ValueError(f"Frames are {frames.shape[2]}x{frames.shape[1]}, the frame store expects {store.frames.shape[2]}x{store.frames.shape[1]}")
+        store.write(batch["play_frames_first"], frames)
+        return ()
+
+# #############################################################################
+class fot_FrameStoreRead:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "play": ("PLAY",),
+                "frames_first": ("INT", {"default": 1, "min": 1, "max": 0xffffffff, "step": 1}),
+                "frames_last": ("INT", {"default": 1, "min": 1, "max": 0xffffffff, "step": 1}),
+            },
+            "optional": {
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("images",)
+    FUNCTION = "read_frames"
+
+    CATEGORY = CATEGORY
+
+    def read_frames(self, play, frames_first, frames_last, **kwargs):
+        import torch
+        store = play.get("frame_store")
+        if store is None:
+            raise ValueError("The play has no frame store, enable frame_store on Play (Start)")
+        frames = store.read(frames_first, frames_last)
+        images = torch.from_numpy(np.asarray(frames)).float() / 255.0
+        return (images,)
+
+# #############################################################################
+class fot_LatentStore:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "batch": ("BATCH",),
+                "latent": ("LATENT",),
+            },
+            "optional": {
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ("LATENT",)
+    RETURN_NAMES = ("latent",)
+    FUNCTION = "store_latent"
+    OUTPUT_NODE = True
+
+    CATEGORY = CATEGORY
+
+    def store_latent(self, batch, latent, **kwargs):
+        store_batch_latent(batch, latent)
+        return (latent,)
+
+# #############################################################################
+class fot_FrameInterpolate:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "batch": ("BATCH",),
+                "keyframes": ("IMAGE",),
+            },
+            "optional": {
+                "method": (INTERPOLATION_METHODS, {"default": "blend"}),
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("images",)
+    FUNCTION = "interpolate"
+
+    CATEGORY = CATEGORY
+
+    def interpolate(self, batch, keyframes, method="blend", **kwargs):
+        import torch
+        factor = batch["interpolation_factor"]
+        if factor <= 1:
+            return (keyframes,)
+
+        play = batch["play"]
+        keyframes = keyframes.cpu().numpy()
+
+        # the in-betweens leading to the first keyframe need the last keyframe of the previous batch
+        keyframe_previous = None
+        tail = play.get("interpolation_tail")
+        if tail is not None and tail["beat"] is batch["beat"] and tail["index"] == batch["index"] - 1:
+            keyframe_previous = tail["keyframe"]
+        elif batch["index"] > 0:
+            logger.warning(f" - No previous keyframe for {batch['filename']}, holding its first frame")
+        if batch["pass"] == "full":
+            # preview keyframes are of another size, and continue nothing
+            play["interpolation_tail"] = {"beat": batch["beat"], "index": batch["index"], "keyframe": keyframes[-1].copy()}
+
+        frames = interpolate_keyframes(keyframes, factor, batch["output_frames_count"], keyframe_previous=keyframe_previous, method=method, continued=batch["index"] > 0)
+        return (torch.from_numpy(np.ascontiguousarray(frames)),)
+
+# #############################################################################
+class fot_ApplyFrameWeights:
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "images": ("IMAGE",),
+                "frame_weights": ("MASK",),
+            },
+            "optional": {
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("images",)
+    FUNCTION = "apply_weights"
+
+    CATEGORY = CATEGORY
+
+    def apply_weights(self, images, frame_weights, **kwargs):
+        # one weight per frame, as given by Batch Data: (frames, 1, 1)
+        weights = frame_weights.reshape(frame_weights.shape[0], -1)[:, :1].to(images.device, images.dtype)
+        if weights.shape[0] != images.shape[0]:
+            raise ValueError(f"{weights.shape[0]} frame weight(s) for {images.shape[0]} image(s)")
+        return (images * weights.view(-1, 1, 1, 1),)
+
+# #############################################################################
+NODE_CLASS_MAPPINGS = {
+    "fot_PlayVideoSink": fot_PlayVideoSink,
+    "fot_FrameStoreWrite": fot_FrameStoreWrite,
+    "fot_FrameStoreRead": fot_FrameStoreRead,
+    "fot_LatentStore": fot_LatentStore,
+    "fot_FrameInterpolate": fot_FrameInterpolate,
+    "fot_ApplyFrameWeights": fot_ApplyFrameWeights,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "fot_PlayVideoSink": "Play Video Sink",
+    "fot_FrameStoreWrite": "Frame Store (Write)",
+    "fot_FrameStoreRead": "Frame Store (Read)",
+    "fot_LatentStore": "Latent Store",
+    "fot_FrameInterpolate": "Frame Interpolate",
+    "fot_ApplyFrameWeights": "Apply Frame Weights",
+}
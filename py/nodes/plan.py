@@ -0,0 +1,145 @@
+import copy
+import json
+import os
+import folder_paths
+
+from .nodes import CATEGORY
+from ..core.planner import plan_play, summarize_plan
+from ..core.play_definition import SCHEDULES, DEFAULT_PREVIEW_SCALE, DEFAULT_PREVIEW_FRAMES_COUNT, DEFAULT_STEPS, load_play_definition
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+def get_definition_path(workspace, path):
+    workspace_dir = os.path.join(folder_paths.get_output_directory(), 'workspaces', workspace["codename"])
+    file_path = os.path.abspath(os.path.join(workspace_dir, path))
+    if os.path.commonpath([file_path, os.path.abspath(workspace_dir)]) != os.path.abspath(workspace_dir):
+        raise ValueError(f"Play definition '{path}' is outside of the workspace")
+    return file_path
+
+# #############################################################################
+class fot_PlayFromFile:
+    """
+    Reads a play definition (YAML or JSON) from the workspace, for Play (Start): plays of
+    any length, without a node per act, scene and beat.
+    """
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "workspace": ("WORKSPACE",),
+                "path": ("STRING", {"default": "play.yaml", "tooltip": "Relative to the workspace folder."}),
+            },
+            "optional": {
+            },
+            "hidden": {
+            }
+        }
+
+    RETURN_TYPES = ("PLAY_DEFINITION", "STRING", "INT",)
+    RETURN_NAMES = ("play_definition", "title", "acts_count",)
+    FUNCTION = "load_definition"
+
+    CATEGORY = CATEGORY
+
+    @classmethod
+    def IS_CHANGED(cls, workspace, path, **kwargs):
+        try:
+            stat = os.stat(get_definition_path(workspace, path))
+        except (OSError, ValueError, KeyError, TypeError):
+            return float("nan")
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def load_definition(self, workspace, path, **kwargs):
+        play_definition = load_play_definition(get_definition_path(workspace, path))
+        return (play_definition, play_definition["settings"].get("title", ""), len(play_definition["acts"]),)
+
+# #############################################################################
+class fot_PlayPlanPreview:
+    """
+    Plans a play like Play (Start) does, without any model: for checking the batches of a play tree before queueing it.
+    """
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        inputs = {
+            "required": {
+                "title": ("STRING", {"default": "Play title"}),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+                "filename_base": ("STRING", {"default": "fot_play"}),
+                "fps":  ("FLOAT", {"default": 20, "min": 1, "max": 100000, "step": 1}),
+                "width":  ("INT", {"default": 480, "min": 1, "max": 100000, "step": 8}),
+                "height":  ("INT", {"default": 832, "min": 1, "max": 100000, "step": 8}),
+                "frames_count_per_batch":  ("INT", {"default": 41, "min": 1, "max": 100000, "step": 1}),
+            },
+            "optional": {
+                "interpolation_factor": ("INT", {"default": 1, "min": 1, "max": 16, "step": 1}),
+                "variant_seeds": ("STRING", {"default": ""}),
+                "batch_range": ("STRING", {"default": ""}),
+                "schedule": (SCHEDULES, {"default": "sequential"}),
+                "preview_scale": ("FLOAT", {"default": DEFAULT_PREVIEW_SCALE, "min": 0.05, "max": 1.0, "step": 0.05}),
+                "preview_frames_count": ("INT", {"default": DEFAULT_PREVIEW_FRAMES_COUNT, "min": 1, "max": 100000, "step": 1}),
+                "steps": ("INT", {"default": DEFAULT_STEPS, "min": 1, "max": 10000, "step": 1}),
+                "deadline_secs": ("FLOAT", {"default": 0, "min": 0, "max": 1e9, "step": 60}),
+                "play_definition": ("PLAY_DEFINITION",),
+            },
+            "hidden": {
+            }
+        }
+        for i in range(1, 3):
+            inputs["optional"]["act_%d" % i] = ("PLAY_ACT",)
+        return inputs
+
+    RETURN_TYPES = ("STRING", "INT", "INT",)
+    RETURN_NAMES = ("plan", "batches_count", "frames_count",)
+    FUNCTION = "preview"
+    OUTPUT_NODE = True
+
+    CATEGORY = CATEGORY
+
+    def preview(self, title, seed, filename_base, fps, width, height, frames_count_per_batch, interpolation_factor=1, variant_seeds="", batch_range="", schedule="sequential", preview_scale=DEFAULT_PREVIEW_SCALE, preview_frames_count=DEFAULT_PREVIEW_FRAMES_COUNT, steps=DEFAULT_STEPS, deadline_secs=0, play_definition=None, **kwargs):
+        play_settings = {
+            "title": title,
+            "positive": "",
+            "negative": "",
+            "seed": seed,
+            "filename_base": filename_base,
+            "fps": fps,
+            "width": width,
+            "height": height,
+            "frames_count_per_batch": frames_count_per_batch,
+            "interpolation_factor": interpolation_factor,
+            "variant_seeds": variant_seeds,
+            "batch_range": batch_range,
+            "schedule": schedule,
+            "preview_scale": preview_scale,
+            "preview_frames_count": preview_frames_count,
+            "steps": steps,
+            "deadline_secs": deadline_secs,
+        }
+        play_acts = [kwargs.get("act_%d" % i, None) for i in range(1, 3)]
+        if play_definition is not None:
+            play_settings.update(play_definition["settings"])
+            play_acts = play_definition["acts"]
+        # the planner annotates the tree, keep the acts shared with Play (Start) untouched
+        sequence_batches = plan_play(play_acts=copy.deepcopy(play_acts), **play_settings)
+        summary = summarize_plan(sequence_batches)
+        logger.info(f"plan preview: {summary['totals']['batches']} batches, {summary['totals']['frames']} frames")
+        return (json.dumps(summary, indent=2), summary["totals"]["batches"], summary["totals"]["frames"],)
+
+# #############################################################################
+NODE_CLASS_MAPPINGS = {
+    "fot_PlayFromFile": fot_PlayFromFile,
+    "fot_PlayPlanPreview": fot_PlayPlanPreview,
+}
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "fot_PlayFromFile": "Play From File",
+    "fot_PlayPlanPreview": "Play Plan Preview",
+}
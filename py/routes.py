@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import os
+import folder_paths
+
+import server
+from aiohttp import web
+
+from .libs.image_io import storeThumbnail
+from .libs.workspace_manifest import WorkspaceManifest
+from .libs.asset_store import AssetStore
+from .libs.progress import progress_broker
+from .core.play_definition import parse_play
+from .core.planner import plan_play, summarize_plan
+
+import logging
+logger = logging.getLogger('comfyui_play_traversal_logger')
+
+THUMBNAIL_MAX_AGE = 7 * 24 * 3600
+PROGRESS_KEEPALIVE_SECS = 15
+
+# backdrops_dir -> (listing source, source mtime, backdrop names, etag)
+_backdrops_cache = {}
+
+def get_workspace_dir(workspace_codename):
+    if not workspace_codename or workspace_codename in (".", "..") or "/" in workspace_codename or "\\" in workspace_codename:
+        raise ValueError(f"Invalid workspace codename: '{workspace_codename}'")
+    home_dir = folder_paths.get_output_directory() # get_user_directory()
+    workspaces_dir = os.path.join(home_dir, 'workspaces')
+    return os.path.join(workspaces_dir, workspace_codename)
+
+def get_backdrop_dir(workspace_codename, backdrop_name):
+    if not backdrop_name or backdrop_name.startswith(".") or "/" in backdrop_name or "\\" in backdrop_name:
+        raise ValueError(f"Invalid backdrop name: '{backdrop_name}'")
+    return os.path.join(get_workspace_dir(workspace_codename), "scene_backdrops", backdrop_name)
+
+def make_etag(value):
+    return '"' + hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest() + '"'
+
+def list_backdrops(workspace_codename):
+    """
+    Lists the backdrop names of a workspace; blocking, run it off the event loop.
+
+    Names come from the workspace manifest when there is one (which indexes the folders
+    added on disk meanwhile), else from a scan of the backdrop folders. The listing is
+    cached per workspace, until the manifest or the directory mtime changes.
+    """
+    workspace_dir = get_workspace_dir(workspace_codename)
+    backdrops_dir = os.path.join(workspace_dir, "scene_backdrops")
+    manifest = WorkspaceManifest(workspace_dir)
+    source = manifest.manifest_path if manifest.exists() else backdrops_dir
+    try:
+        mtime = (os.stat(source).st_mtime_ns, os.stat(backdrops_dir).st_mtime_ns)
+    except OSError:
+        _backdrops_cache.pop(backdrops_dir, None)
+        return [], make_etag([])
+
+    cached = _backdrops_cache.get(backdrops_dir)
+    if cached is not None and cached[0] == source and cached[1] == mtime:
+        return cached[2], cached[3]
+
+    try:
+        if source == backdrops_dir:
+            with os.scandir(backdrops_dir) as entries:
+                backdrop_folders = sorted(entry.name for entry in entries
+                        if entry.is_dir() and not entry.name.startswith('.'))
+        else:
+            backdrop_folders = manifest.list_backdrop_names()
+    except Exception as e:
+        logger.error(f" - Error reading workspace backdrops: {e}")
+        return [], make_etag([])
+
+    etag = make_etag(backdrop_folders)
+    _backdrops_cache[backdrops_dir] = (source, mtime, backdrop_folders, etag)
+    return backdrop_folders, etag
+
+def json_response_with_etag(request, value, etag):
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return web.Response(status=304, headers=headers)
+    return web.json_response({"value": value}, headers=headers)
+
+@server.PromptServer.instance.routes.get("/comfyui_play_traversal/get_backdrops")
+async def get_backdrops(request):
+    """
+    Custom endpoint to fetch the backdrop names in a workspace.
+    """
+    try:
+        workspace_codename = request.query.get('workspace_codename')
+        loop = asyncio.get_running_loop()
+        backdrop_folders, etag = await loop.run_in_executor(None, list_backdrops, workspace_codename)
+        return json_response_with_etag(request, backdrop_folders, etag)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+@server.PromptServer.instance.routes.get("/comfyui_play_traversal/get_backdrops_batch")
+async def get_backdrops_batch(request):
+    """
+    Custom endpoint to fetch the backdrop names of several workspaces at once,
+    e.g. ?workspace_codename=a&workspace_codename=b; returns {"value": {codename: names}}.
+    """
+    try:
+        workspace_codenames = sorted(set(request.query.getall('workspace_codename', [])))
+        loop = asyncio.get_running_loop()
+        listings = await asyncio.gather(*[loop.run_in_executor(None, list_backdrops, codename) for codename in workspace_codenames])
+        value = {codename: listing[0] for codename, listing in zip(workspace_codenames, listings)}
+        etag = make_etag([listing[1] for listing in listings])
+        return json_response_with_etag(request, value, etag)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+@server.PromptServer.instance.routes.post("/comfyui_play_traversal/rebuild_manifest")
+async def rebuild_manifest(request):
+    """
+    Custom endpoint to re-index the backdrop folders of a workspace into its manifest.
+    """
+    try:
+        workspace_dir = get_workspace_dir(request.query.get('workspace_codename'))
+        loop = asyncio.get_running_loop()
+        count = await loop.run_in_executor(None, WorkspaceManifest(workspace_dir).rebuild)
+        return web.json_response({"value": count})
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+@server.PromptServer.instance.routes.post("/comfyui_play_traversal/gc_assets")
+async def gc_assets(request):
+    """
+    Custom endpoint to remove the stored artifacts no longer referenced by any workspace.
+    """
+    try:
+        workspaces_dir = os.path.join(folder_paths.get_output_directory(), 'workspaces')
+        loop = asyncio.get_running_loop()
+        removed, freed = await loop.run_in_executor(None, AssetStore(workspaces_dir).gc)
+        return web.json_response({"value": {"removed": removed, "freed": freed}})
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+def ensure_backdrop_thumbnail(workspace_codename, backdrop_name):
+    """
+    Returns the thumbnail path of a backdrop, generating it if missing or older
+    than the backdrop image; blocking, run it off the event loop.
+    """
+    backdrop_dir = get_backdrop_dir(workspace_codename, backdrop_name)
+    image_path = os.path.join(backdrop_dir, "backdrop.png")
+    thumbnail_path = os.path.join(backdrop_dir, "backdrop_thumbnail.jpg")
+    if not os.path.exists(image_path):
+        return None
+    if not os.path.exists(thumbnail_path) or os.path.getmtime(thumbnail_path) < os.path.getmtime(image_path):
+        asset_store = AssetStore(os.path.dirname(get_workspace_dir(workspace_codename)))
+        asset_store.store(lambda path: storeThumbnail(image_path, path), thumbnail_path)
+    return thumbnail_path
+
+@server.PromptServer.instance.routes.get("/comfyui_play_traversal/get_backdrop_thumbnail")
+async def get_backdrop_thumbnail(request):
+    """
+    Custom endpoint to fetch the thumbnail of a backdrop image.
+    """
+    try:
+        workspace_codename = request.query.get('workspace_codename')
+        backdrop_name = request.query.get('backdrop_name')
+        loop = asyncio.get_running_loop()
+        thumbnail_path = await loop.run_in_executor(None, ensure_backdrop_thumbnail, workspace_codename, backdrop_name)
+        if thumbnail_path is None:
+            return web.json_response({"error": f"No image for backdrop '{backdrop_name}'"}, status=404)
+        # FileResponse also handles Last-Modified / If-Modified-Since
+        return web.FileResponse(thumbnail_path, headers={"Cache-Control": f"public, max-age={THUMBNAIL_MAX_AGE}"})
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+def preview_plan(definition):
+    """
+    Plans a play definition (see play_definition), without any model; blocking, run it off the event loop.
+    """
+    settings, acts = parse_play(definition)
+    return summarize_plan(plan_play(play_acts=acts, **settings))
+
+@server.PromptServer.instance.routes.post("/comfyui_play_traversal/plan")
+async def plan(request):
+    """
+    Custom endpoint returning the batch plan of a play tree given as JSON, as a dry run.
+    """
+    try:
+        definition = await request.json()
+        loop = asyncio.get_running_loop()
+        summary = await loop.run_in_executor(None, preview_plan, definition)
+        return web.json_response({"value": summary})
+    except ValueError as e:
+        # also invalid JSON
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+
+@server.PromptServer.instance.routes.get("/comfyui_play_traversal/progress")
+async def get_progress(request):
+    """
+    Custom endpoint streaming the progress of the running plays, as server-sent events.
+    """
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    await response.prepare(request)
+    queue = progress_broker.subscribe()
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=PROGRESS_KEEPALIVE_SECS)
+                await response.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            except asyncio.TimeoutError:
+                # keeps proxies from closing an idle stream
+                await response.write(b": keepalive\n\n")
+    except ConnectionResetError:
+        pass
+    finally:
+        progress_broker.unsubscribe(queue)
+    return response
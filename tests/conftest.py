@@ -0,0 +1,47 @@
+"""
+Unit tests of the parts of the extension that only need the standard library
+(planning, budget, cost model, dispatcher) and numpy, run without ComfyUI:
+
+    pytest tests/
+
+The extension is imported as the package `fot_play_traversal`, without its
+__init__ (which registers the routes on the ComfyUI server).
+"""
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "fot_play_traversal"
+
+def import_extension_module(name):
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [REPOSITORY_DIR]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+
+@pytest.fixture(scope="session")
+def extension():
+    return types.SimpleNamespace(
+        planner=import_extension_module("py.core.planner"),
+        play_definition=import_extension_module("py.core.play_definition"),
+        cost_model=import_extension_module("py.core.cost_model"),
+        budget=import_extension_module("py.core.budget"),
+        dispatcher=import_extension_module("py.libs.dispatcher"),
+        frame_interpolation=import_extension_module("py.libs.frame_interpolation"),
+    )
+
+@pytest.fixture(scope="session")
+def plan_definition(extension):
+    """
+    Plans a play definition (as a dict, see play_definition), with its settings overridden by keyword.
+    """
+    def plan_definition(definition, **overrides):
+        settings, acts = extension.play_definition.parse_play(definition)
+        settings.update(overrides)
+        return extension.planner.plan_play(play_acts=acts, **settings)
+    return plan_definition
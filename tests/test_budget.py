@@ -0,0 +1,57 @@
+import logging
+
+# three chains, cut apart, of 2 batches of 10 keyframes each; the middle beat matters least
+PLAY = {
+    "fps": 10,
+    "width": 640,
+    "height": 480,
+    "frames_count_per_batch": 10,
+    "steps": 20,
+    "acts": [{"scenes": [
+        {"beats": [{"title": "important", "duration_secs": 2, "priority": 5}]},
+        {"transition": "cut", "beats": [{"title": "filler", "duration_secs": 2, "priority": 0}]},
+        {"transition": "cut", "beats": [{"title": "normal", "duration_secs": 2}]},
+    ]}],
+}
+
+def quality(sequence_batches):
+    """
+    (steps, width) of each beat, all its batches must share them.
+    """
+    beats = {}
+    for batch in sequence_batches.plan:
+        beats.setdefault(batch["beat"]["title"], set()).add((batch["steps"], batch["width"]))
+    assert all(len(values) == 1 for values in beats.values())
+    return {title: values.pop() for title, values in beats.items()}
+
+def test_no_deadline_keeps_full_quality(plan_definition):
+    sequence_batches = plan_definition(PLAY)
+    assert quality(sequence_batches) == {"important": (20, 640), "filler": (20, 640), "normal": (20, 640)}
+    # 60 keyframes at the default 2s each
+    assert sequence_batches.predicted_secs == 120
+
+def test_lowest_priority_lowered_first(plan_definition):
+    sequence_batches = plan_definition(PLAY, deadline_secs=110)
+    beats = quality(sequence_batches)
+    assert beats["important"] == (20, 640)
+    assert beats["normal"] == (20, 640)
+    assert beats["filler"] != (20, 640)
+    assert sequence_batches.predicted_secs <= 110
+
+def test_higher_priority_keeps_more_quality(extension, plan_definition):
+    budget = extension.budget
+    sequence_batches = plan_definition(PLAY, deadline_secs=60)
+    assert sequence_batches.predicted_secs <= 60
+    beats = quality(sequence_batches)
+    # the filler goes all the way down before the others lose anything much
+    assert beats["filler"] == (budget.scale_steps(20, budget.STEPS_FACTORS[-1]), budget.scale_size(640, budget.SCALES[-1]))
+    assert beats["important"][0] * beats["important"][1] >= beats["normal"][0] * beats["normal"][1]
+
+def test_warns_when_the_deadline_cannot_be_met(extension, plan_definition, caplog):
+    budget = extension.budget
+    with caplog.at_level(logging.WARNING, logger="comfyui_play_traversal_logger"):
+        sequence_batches = plan_definition(PLAY, deadline_secs=1)
+    assert "cannot fit" in caplog.text
+    lowest = (budget.scale_steps(20, budget.STEPS_FACTORS[-1]), budget.scale_size(640, budget.SCALES[-1]))
+    assert set(quality(sequence_batches).values()) == {lowest}
+    assert sequence_batches.predicted_secs > 1
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+COEFFICIENTS = {"batch": 3.0, "frames_count": 0.5, "megapixel_frames": 2.0, "beat_start": 1.5, "scene_start": 4.0, "continues": -1.0}
+
+def make_features(rng):
+    frames_count = rng.randint(1, 81)
+    beat_start = rng.random() < 0.3
+    return {
+        "batch": 1.0,
+        "frames_count": float(frames_count),
+        "megapixel_frames": rng.choice([0.2, 0.4, 0.9]) * frames_count,
+        "beat_start": 1.0 if beat_start else 0.0,
+        "scene_start": 1.0 if beat_start and rng.random() < 0.5 else 0.0,
+        # beats following continuously continue the latent chain too
+        "continues": 1.0 if not beat_start or rng.random() < 0.5 else 0.0,
+    }
+
+def secs(features):
+    return sum(COEFFICIENTS[name] * value for name, value in features.items())
+
+@pytest.fixture
+def fitted_model(extension):
+    rng = random.Random(0)
+    model = extension.cost_model.CostModel()
+    for _ in range(200):
+        features = make_features(rng)
+        model.observe_features(features, secs(features))
+    return model
+
+def test_fit_recovers_coefficients(fitted_model):
+    assert fitted_model.fitted
+    for name, value in COEFFICIENTS.items():
+        assert fitted_model.coefficients[name] == pytest.approx(value, rel=0.05, abs=0.05)
+
+def test_predicts_from_secs_per_keyframe_until_fitted(extension):
+    model = extension.cost_model.CostModel()
+    model.observe_features({**dict.fromkeys(COEFFICIENTS, 0.0), "batch": 1.0, "frames_count": 10.0}, 30.0)
+    assert not model.fitted
+    assert model.predict_features({**dict.fromkeys(COEFFICIENTS, 0.0), "frames_count": 4.0}) == pytest.approx(12.0)
+
+def test_save_load_round_trip(extension, fitted_model, tmp_path):
+    file_path = str(tmp_path / extension.cost_model.COST_MODEL_FILENAME)
+    fitted_model.save(file_path)
+    loaded = extension.cost_model.CostModel.load(file_path)
+    assert loaded.count == fitted_model.count
+    assert loaded.coefficients == pytest.approx(fitted_model.coefficients)
+
+def test_load_missing_file(extension, tmp_path):
+    model = extension.cost_model.CostModel.load(str(tmp_path / "missing.json"))
+    assert model.count == 0
+
+def test_schedule_longest_first(extension):
+    order, makespan = extension.cost_model.schedule_longest_first([3, 7, 1, 5, 4], 2)
+    assert order == [1, 3, 4, 0, 2]
+    # 7+3 and 5+4+1
+    assert makespan == 10
+
+def test_schedule_longest_first_one_worker(extension):
+    _, makespan = extension.cost_model.schedule_longest_first([3, 7, 1], 1)
+    assert makespan == 11
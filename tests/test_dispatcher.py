@@ -0,0 +1,79 @@
+import pytest
+
+WORKFLOW = {
+    "1": {"class_type": "fot_PlayStart", "inputs": {"batch_range": ""}},
+    "2": {"class_type": "fot_PlayContinue", "inputs": {"flow": ["1", 0]}},
+}
+
+# three chains, cut apart: 3, 1 and 2 batches of 10 keyframes
+PLAY = {
+    "fps": 10,
+    "frames_count_per_batch": 10,
+    "acts": [{"scenes": [
+        {"beats": [{"duration_secs": 3}]},
+        {"transition": "cut", "beats": [{"duration_secs": 1}]},
+        {"transition": "cut", "beats": [{"duration_secs": 2}]},
+    ]}],
+}
+
+@pytest.fixture
+def segments(extension, plan_definition):
+    return extension.planner.partition_segments(plan_definition(PLAY).plan)
+
+def submitted_ranges(stub):
+    return [next(node["inputs"]["batch_range"] for node in workflow.values() if node["class_type"] == "fot_PlayStart") for workflow in stub.prompts]
+
+def test_partition_segments(segments):
+    assert [[batch["index_play"] for batch in segment] for segment in segments] == [[0, 1, 2], [3], [4, 5]]
+
+def test_dispatch_renders_each_segment(extension, segments):
+    dispatcher = extension.dispatcher
+    with dispatcher.StubWorker() as stub:
+        results = dispatcher.dispatch_segments(WORKFLOW, segments, [dispatcher.ComfyWorker(stub.url)], poll_interval=0.01)
+    assert [result["batch_range"] for result in results] == ["0-2", "3", "4-5"]
+    assert [result["outputs"]["batch_range"] for result in results] == ["0-2", "3", "4-5"]
+    assert all(result["attempts"] == 1 for result in results)
+
+def test_dispatch_longest_first(extension, segments):
+    dispatcher = extension.dispatcher
+    with dispatcher.StubWorker() as stub:
+        dispatcher.dispatch_segments(WORKFLOW, segments, [dispatcher.ComfyWorker(stub.url)], poll_interval=0.01)
+    assert submitted_ranges(stub) == ["0-2", "4-5", "3"]
+
+def test_dispatch_retries_failed_segment(extension, segments):
+    dispatcher = extension.dispatcher
+    with dispatcher.StubWorker(fail_count=1) as stub:
+        results = dispatcher.dispatch_segments(WORKFLOW, segments, [dispatcher.ComfyWorker(stub.url)], retries=1, poll_interval=0.01)
+    assert len(stub.prompts) == 4
+    assert [result["attempts"] for result in results] == [2, 1, 1]
+
+def test_dispatch_fails_after_retries(extension, segments):
+    dispatcher = extension.dispatcher
+    with dispatcher.StubWorker(fail_count=1) as stub:
+        with pytest.raises(RuntimeError, match="1 segment.*0-2"):
+            dispatcher.dispatch_segments(WORKFLOW, segments, [dispatcher.ComfyWorker(stub.url)], retries=0, poll_interval=0.01)
+
+def test_dispatch_retries_hung_segment(extension, segments):
+    dispatcher = extension.dispatcher
+    with dispatcher.StubWorker(hang_count=1) as stub:
+        results = dispatcher.dispatch_segments(WORKFLOW, segments, [dispatcher.ComfyWorker(stub.url)], retries=1, poll_interval=0.01, segment_timeout=0.2)
+    assert [result["attempts"] for result in results] == [2, 1, 1]
+
+def test_dispatch_cancels_hung_prompt(extension, segments):
+    dispatcher = extension.dispatcher
+    with dispatcher.StubWorker(hang_count=1) as stub:
+        dispatcher.dispatch_segments(WORKFLOW, segments, [dispatcher.ComfyWorker(stub.url)], retries=1, poll_interval=0.01, segment_timeout=0.2)
+    assert len(stub.interrupted) == 1
+    assert stub.deleted == stub.interrupted
+
+def test_dispatch_retries_unexpected_failure(extension, segments):
+    dispatcher = extension.dispatcher
+    with dispatcher.StubWorker(malformed_count=1) as stub:
+        results = dispatcher.dispatch_segments(WORKFLOW, segments, [dispatcher.ComfyWorker(stub.url)], retries=1, poll_interval=0.01)
+    assert [result["attempts"] for result in results] == [2, 1, 1]
+
+def test_dispatch_fails_on_unexpected_failure(extension, segments):
+    dispatcher = extension.dispatcher
+    with dispatcher.StubWorker(malformed_count=1) as stub:
+        with pytest.raises(RuntimeError, match="1 segment"):
+            dispatcher.dispatch_segments(WORKFLOW, segments, [dispatcher.ComfyWorker(stub.url)], retries=0, poll_interval=0.01)
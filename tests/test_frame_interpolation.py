@@ -0,0 +1,29 @@
+import numpy as np
+
+def keyframes(*values):
+    return np.array(values, dtype=np.float32).reshape(-1, 1, 1, 1)
+
+def values(frames):
+    return [round(float(value), 3) for value in frames.reshape(-1)]
+
+def test_final_gap_has_its_real_length(extension):
+    # 10 frames at x4: keyframes on frames 1, 5, 9 and 10, the last one 1 frame after the previous
+    frames = extension.frame_interpolation.interpolate_keyframes(keyframes(0, 4, 8, 9), 4, 10)
+    assert values(frames) == list(range(10))
+
+def test_continued_batch(extension):
+    interpolate_keyframes = extension.frame_interpolation.interpolate_keyframes
+    # the second batch of the beat above: keyframes on frames 9 and 10, after the one on frame 5
+    frames = interpolate_keyframes(keyframes(8, 9), 4, 5, keyframe_previous=keyframes(4)[0])
+    assert values(frames) == [5, 6, 7, 8, 9]
+    # without the previous keyframe, its first frame is held
+    frames = interpolate_keyframes(keyframes(8, 9), 4, 5, continued=True)
+    assert values(frames) == [8, 8, 8, 8, 9]
+
+def test_full_gaps(extension):
+    frames = extension.frame_interpolation.interpolate_keyframes(keyframes(0, 4, 8), 4, 9)
+    assert values(frames) == list(range(9))
+
+def test_no_interpolation(extension):
+    frames = extension.frame_interpolation.interpolate_keyframes(keyframes(0, 1, 2), 1, 3)
+    assert values(frames) == [0, 1, 2]
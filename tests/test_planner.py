@@ -0,0 +1,102 @@
+def play(*durations_secs, interpolation_factor=1, frames_count_per_batch=10):
+    return {
+        "fps": 10,
+        "frames_count_per_batch": frames_count_per_batch,
+        "interpolation_factor": interpolation_factor,
+        "acts": [{"scenes": [{"beats": [{"title": f"beat {i}", "duration_secs": secs} for i, secs in enumerate(durations_secs)]}]}],
+    }
+
+def frames(sequence_batches):
+    return [(batch["beat"]["title"], batch["frames_count"], batch["play_frames_first"], batch["play_frames_last"]) for batch in sequence_batches.plan]
+
+def test_zero_frame_beat_skipped(plan_definition):
+    # the middle beat is shorter than a frame
+    sequence_batches = plan_definition(play(1, 0.05, 1, interpolation_factor=4))
+    assert frames(sequence_batches) == [("beat 0", 4, 1, 10), ("beat 2", 4, 11, 20)]
+    assert all(batch["output_frames_count"] > 0 for batch in sequence_batches.plan)
+    assert sequence_batches.plan[1]["depends_on"] == [0]
+
+def test_keyframes_end_on_the_last_beat_frame(plan_definition):
+    # 10 frames at x4: keyframes on frames 1, 5, 9 and 10
+    sequence_batches = plan_definition(play(1, interpolation_factor=4, frames_count_per_batch=2))
+    assert [(batch["frames_count"], batch["frames_first"], batch["frames_last"], batch["output_frames_count"]) for batch in sequence_batches.plan] == [
+        (2, 1, 5, 5),
+        (2, 6, 10, 5),
+    ]
+
+def test_variants_interleaved(plan_definition):
+    sequence_batches = plan_definition(play(2), variant_seeds="1, 2")
+    assert [(batch["variant"], batch["index"], batch["depends_on"]) for batch in sequence_batches.plan] == [
+        (0, 0, []),
+        (1, 0, []),
+        (0, 1, [0]),
+        (1, 1, [1]),
+    ]
+    assert [play["seed"] for play in sequence_batches.plays] == [1, 2]
+    assert [play["filename_base"][-3:] for play in sequence_batches.plays] == ["_v0", "_v1"]
+    # each variant only continues from its own batches
+    assert all(batch["play"] is sequence_batches.get_batch(batch["depends_on"][0])["play"] for batch in sequence_batches.plan if batch["depends_on"])
+
+def transitions_play():
+    return {
+        "fps": 10,
+        "frames_count_per_batch": 10,
+        "acts": [{"scenes": [
+            {"beats": [
+                {"title": "a", "duration_secs": 1},
+                {"title": "b", "duration_secs": 1, "transition": "crossfade", "transition_secs": 0.5},
+            ]},
+            {"transition": "fade_to_black", "transition_secs": 1, "beats": [
+                {"title": "c", "duration_secs": 1},
+                {"title": "d", "duration_secs": 1},
+            ]},
+            {"transition": "cut", "beats": [{"title": "e", "duration_secs": 1}]},
+        ]}],
+    }
+
+def test_transitions_break_the_latent_chain(plan_definition):
+    sequence_batches = plan_definition(transitions_play())
+    dag = sequence_batches.dag()
+    assert dag["batches"] == {0: [], 1: [], 2: [], 3: [2], 4: []}
+    assert dag["chains"] == [[0], [1], [2, 3], [4]]
+    assert [(transition["kind"], transition["from"], transition["to"], transition["depends_on"], transition["duration_secs"]) for transition in dag["transitions"]] == [
+        ("crossfade", 0, 1, [0, 1], 0.5),
+        ("fade_to_black", 1, 2, [1, 2], 1),
+        ("cut", 3, 4, [], sequence_batches.plan[4]["scene"]["transition_secs"]),
+    ]
+
+def test_frame_weights(plan_definition):
+    sequence_batches = plan_definition(transitions_play())
+    weights = {batch["beat"]["title"]: batch["derived"]["frame_weights"] for batch in sequence_batches.plan}
+    rounded = {title: None if values is None else [round(value, 3) for value in values] for title, values in weights.items()}
+    assert rounded["a"] is None
+    # crossfade in over 0.5s, then the fade to black: out over the last 0.5s of b, in over the first 0.5s of c
+    assert rounded["b"] == [0.0, 0.2, 0.4, 0.6, 0.8, 0.8, 0.6, 0.4, 0.2, 0.0]
+    assert rounded["c"] == [0.0, 0.2, 0.4, 0.6, 0.8, 1.0, 1.0, 1.0, 1.0, 1.0]
+    assert rounded["d"] is None
+    assert rounded["e"] is None
+
+def test_frame_weights_fade_out(plan_definition):
+    definition = transitions_play()
+    del definition["acts"][0]["scenes"][0]["beats"][1]["transition"]
+    sequence_batches = plan_definition(definition)
+    weights = sequence_batches.plan[1]["derived"]["frame_weights"]
+    assert [round(value, 3) for value in weights] == [1.0, 1.0, 1.0, 1.0, 1.0, 0.8, 0.6, 0.4, 0.2, 0.0]
+
+def test_preview_first(plan_definition):
+    definition = dict(play(2, 2), width=640, height=480)
+    sequence_batches = plan_definition(definition, schedule="preview_first", preview_scale=0.5, preview_frames_count=4)
+    assert [(batch["pass"], batch["beat"]["title"], batch["index"], batch["depends_on"]) for batch in sequence_batches.plan] == [
+        ("preview", "beat 0", 0, []),
+        ("preview", "beat 1", 0, []),
+        ("full", "beat 0", 0, []),
+        ("full", "beat 0", 1, [2]),
+        ("full", "beat 1", 0, [3]),
+        ("full", "beat 1", 1, [4]),
+    ]
+    previews = sequence_batches.plan[:2]
+    assert [(batch["frames_count"], batch["output_frames_count"], batch["preview_frames_first"]) for batch in previews] == [(4, 4, 1), (4, 4, 5)]
+    assert all((batch["width"], batch["height"]) == (320, 240) for batch in previews)
+    # previews get fewer steps than the full batches
+    assert all(batch["steps"] < sequence_batches.plan[-1]["steps"] for batch in previews)
+    assert sequence_batches.play["preview_frames_count"] == 8